@@ -5,14 +5,37 @@
 # - Export buttons shown only inside the expander (no duplicates at "footer")
 # - download_button keys unique
 
+import logging
 import time
-import requests
+from datetime import date
 import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
-import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 
+from src.cache import CACHE_SCOPE, RefreshScheduler, SharedCache
+from src.charts import CHART_CACHE, chart_estados_bar, chart_partidos_bar, render_chart
+from src.api import CircuitOpen, NotModified, get_client
+from src.data import BASE_URL, apply_filters, fetch_deputados
+from src.cube import CountCube, CubeCache
+from src.diff import DiffTracker, diff_by_id
+from src.export import EXPORT_CACHE, FORMATS, encode, export_bytes, file_name
+from src.fulltext import analyze
+from src.enrich import Enricher, merge_details
+from src.expense_cube import ExpenseCube
+from src.expenses import ExpensesIngestor
+from src.similarity import SimilarityIndex, similarity_index, votes_against_party
+from src.votes import VotesIngestor
+from src.propositions import TIPOS_PADRAO, PropositionsIngestor, proposicoes_by_author, search_proposicoes
+from src.history import HistoryIngestor, legislatura_labels, seats_by_party, uf_composition
+from src.index import FilterIndex
+from src.perf import PERF, RerunTrace
+from src.search import NameSearchIndex
+from src.schema import CATEGORY_COLUMNS, bytes_per_row, canonicalize, deputado_uri, foto_url, with_uris
+from src.snapshots import OFFLINE, WRITE_ERRORS, SnapshotStore
+
+log = logging.getLogger(__name__)
+
 
 # ----------------------------
 # Page config
@@ -24,6 +47,10 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Span timings for this run; "Perfilar" in the Performance tab samples the next run's stack.
+# Every st.stop() / full st.rerun() below calls PERF.end_rerun() first.
+PERF.begin_rerun(profile=st.session_state.pop("perf_profile_next", False))
+
 # ----------------------------
 # UI (CSS)
 # ----------------------------
@@ -122,13 +149,15 @@ a, a:visited { color: rgba(57,255,182,0.92); }
 # ----------------------------
 # Constants / Helpers
 # ----------------------------
-BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
-
-
 def _fmt_int(n: int) -> str:
     return f"{int(n):,}".replace(",", ".")
 
 
+def _fmt_brl(v: float) -> str:
+    # 1234567.8 -> "R$ 1.234.567,80"
+    return "R$ " + f"{v:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
 def _safe_int(x, default=0):
     try:
         return int(x)
@@ -136,167 +165,196 @@ def _safe_int(x, default=0):
         return default
 
 
-def _to_csv_bytes(df: pd.DataFrame) -> bytes:
-    return df.to_csv(index=False).encode("utf-8")
+def _fmt_when(ts: float | None) -> str:
+    if ts is None:
+        return "-"
+    delta = ts - time.time()
+    mins = abs(delta) / 60
+    rel = f"{mins:.0f} min" if mins >= 1 else f"{abs(delta):.0f} s"
+    return f"{time.strftime('%H:%M:%S', time.localtime(ts))} ({'em ' + rel if delta > 0 else 'há ' + rel})"
 
 
 # ----------------------------
-# Data loading (session cache w/ TTL)
+# Data loading (process-wide cache w/ TTL)
 # ----------------------------
-def fetch_deputados_from_api() -> pd.DataFrame:
-    url = f"{BASE_URL}/deputados"
-    params = {"itens": 1000, "ordem": "ASC", "ordenarPor": "nome"}
+def fetch_deputados_from_api(conditional: bool = False) -> pd.DataFrame:
+    return fetch_deputados(BASE_URL, conditional=conditional)
+
 
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
-    data = r.json().get("dados", [])
-    df = pd.DataFrame(data)
+SNAPSHOTS = SnapshotStore("deputados")
 
-    expected = ["id", "nome", "siglaPartido", "siglaUf", "uri", "uriPartido", "urlFoto"]
-    for c in expected:
-        if c not in df.columns:
-            df[c] = None
 
-    df["nome"] = df["nome"].astype(str)
-    df["siglaPartido"] = df["siglaPartido"].astype(str)
-    df["siglaUf"] = df["siglaUf"].astype(str)
+@st.cache_resource(show_spinner=False)
+def dataset_changes() -> DiffTracker:
+    return DiffTracker()
 
+
+@PERF.timed("api_fetch")
+def fetch_and_snapshot(previous: pd.DataFrame | None) -> pd.DataFrame:
+    has_previous = previous is not None and not previous.empty
+    try:
+        df = fetch_deputados_from_api(conditional=has_previous)
+    except NotModified:
+        return previous
+    except CircuitOpen:
+        # API suspended: with nothing in memory (e.g. after "Limpar"), serve the last good snapshot
+        snap = None if has_previous else SNAPSHOTS.load_latest()
+        if snap is None:
+            raise
+        return canonicalize(snap[0])
+
+    if has_previous:
+        diff = diff_by_id(previous, df)
+        if diff.empty:
+            # same content: keep the cached frame (and everything derived from it)
+            return previous
+        dataset_changes().record(diff, previous=previous, current=df)
+
+    try:
+        SNAPSHOTS.write(df)
+    except WRITE_ERRORS:
+        # a failed disk write must not discard a good fetch; SNAPSHOTS keeps the
+        # error for the sidebar, or offline boots would silently serve an old snapshot
+        log.warning("Snapshot local não gravado em %s", SNAPSHOTS.root, exc_info=True)
     return df
 
 
-def get_data(ttl_seconds: int, force_refresh: bool) -> tuple[pd.DataFrame, str]:
-    now = time.time()
+@st.cache_resource(show_spinner=False)
+def enricher() -> Enricher:
+    # Per-deputy details (/deputados/{id}), fetched in bulk and kept on disk
+    return Enricher(get_client(BASE_URL))
 
-    if "cache_df" not in st.session_state:
-        st.session_state.cache_df = pd.DataFrame()
-        st.session_state.cache_ts = 0.0
-        st.session_state.cache_error = None
 
-    expired = (now - st.session_state.cache_ts) > ttl_seconds
-    should_refresh = force_refresh or expired or st.session_state.cache_df.empty
+@st.cache_resource(show_spinner=False)
+def history() -> HistoryIngestor:
+    # All legislatures, partitioned on disk; ingested in the background on demand
+    return HistoryIngestor(get_client(BASE_URL))
 
-    if not should_refresh:
-        return st.session_state.cache_df, "cache"
 
-    try:
-        df = fetch_deputados_from_api()
-        st.session_state.cache_df = df
-        st.session_state.cache_ts = now
-        st.session_state.cache_error = None
-        return df, "api"
-    except Exception as e:
-        st.session_state.cache_error = str(e)
-        if not st.session_state.cache_df.empty:
-            return st.session_state.cache_df, "cache_stale"
-        return pd.DataFrame(), "error"
+@st.cache_resource(show_spinner=False)
+def votes() -> VotesIngestor:
+    # Plenary roll calls of the current legislature, compiled into a deputies x votes matrix
+    return VotesIngestor(get_client(BASE_URL))
 
 
-def apply_filters(df: pd.DataFrame, partidos_sel, ufs_sel, sort_by: str) -> pd.DataFrame:
-    out = df.copy()
-    if partidos_sel:
-        out = out[out["siglaPartido"].isin(partidos_sel)]
-    if ufs_sel:
-        out = out[out["siglaUf"].isin(ufs_sel)]
-    if sort_by in out.columns:
-        out = out.sort_values(sort_by, kind="stable")
-    return out.reset_index(drop=True)
+@st.cache_resource(show_spinner=False)
+def expenses() -> ExpensesIngestor:
+    # CEAP expenses of the current deputies, streamed into year/month Parquet partitions
+    return ExpensesIngestor(get_client(BASE_URL))
 
 
-def counts_table(series: pd.Series, col_name: str) -> pd.DataFrame:
-    vc = series.value_counts()
-    return pd.DataFrame({col_name: vc.index, "qtdDeputados": vc.values})
+@st.cache_resource(show_spinner=False)
+def propositions() -> PropositionsIngestor:
+    # Proposições + authors, with an on-disk full-text index over the ementas
+    return PropositionsIngestor(get_client(BASE_URL))
 
 
-# ----------------------------
-# Charts (matplotlib)
-# ----------------------------
-def _style_dark_axes(ax):
-    fg = "#E6EDF3"
-    muted = "#B6C2CF"
-    panel = "#0E141B"
-    grid = (1, 1, 1, 0.12)
+@st.cache_resource(max_entries=1, show_spinner=False)
+def expense_cube(version: int, data_version: int, _df: pd.DataFrame) -> ExpenseCube:
+    # Rollup arrays for one expenses checkpoint x deputies dataset version
+    return ExpenseCube(expenses().store.rollup(), _df)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def similarity(version: int) -> SimilarityIndex | None:
+    # Top-k neighbors, embedding and party defections for one vote-matrix version
+    return similarity_index(votes().store)
+
 
-    ax.set_facecolor(panel)
-    ax.tick_params(colors=muted, labelsize=10)
-    for spine in ax.spines.values():
-        spine.set_color((1, 1, 1, 0.16))
+def load_snapshot_only(previous: pd.DataFrame | None = None) -> pd.DataFrame:
+    snap = SNAPSHOTS.load_latest()
+    if snap is None:
+        raise RuntimeError(f"Modo offline: nenhum snapshot em {SNAPSHOTS.root}")
+    return canonicalize(snap[0])
 
-    ax.xaxis.label.set_color(muted)
-    ax.yaxis.label.set_color(muted)
-    ax.title.set_color(fg)
 
-    ax.grid(True, axis="x", color=grid, linewidth=1)
-    ax.set_axisbelow(True)
+def new_dataset_cache() -> SharedCache:
+    if OFFLINE:
+        return SharedCache(load_snapshot_only, origin="snapshot")
 
+    cache = SharedCache(fetch_and_snapshot)
+    # Boot from the latest snapshot; the expired TTL triggers a background refresh
+    snap = SNAPSHOTS.load_latest()
+    if snap is not None:
+        df_snap, written_at = snap
+        cache.seed(canonicalize(df_snap), ts=written_at, served_as="snapshot")
+    return cache
 
-def chart_partidos_bar(df: pd.DataFrame) -> Figure:
-    counts = df["siglaPartido"].value_counts().head(20).sort_values()
 
-    fig, ax = plt.subplots(figsize=(8.2, 5.2))
-    fig.patch.set_facecolor("#0B0F14")
-    _style_dark_axes(ax)
+@st.cache_resource(show_spinner=False)
+def shared_cache() -> SharedCache:
+    # One copy of the dataset per server process, shared by every session
+    return new_dataset_cache()
 
-    neon_edge = (57 / 255, 1.0, 182 / 255, 0.92)
-    fill = (57 / 255, 1.0, 182 / 255, 0.24)
 
-    bars = ax.barh(counts.index, counts.values, color=fill)
-    for b in bars:
-        b.set_edgecolor(neon_edge)
-        b.set_linewidth(1.6)
+@st.cache_resource(show_spinner=False)
+def refresh_scheduler() -> RefreshScheduler:
+    # Refreshes the shared dataset ahead of its TTL, off the request path
+    return RefreshScheduler(shared_cache()).start()
 
-    ax.set_xlabel("Quantidade")
-    ax.set_ylabel("")
-    ax.set_title("Deputados por partido (Top 20)")
 
-    maxv = counts.max() if len(counts) else 0
-    for i, v in enumerate(counts.values):
-        ax.text(v + maxv * 0.01, i, str(int(v)), va="center", color="#E6EDF3", fontsize=9)
+def dataset_cache() -> SharedCache:
+    if CACHE_SCOPE == "session":
+        if "dataset_cache" not in st.session_state:
+            st.session_state["dataset_cache"] = new_dataset_cache()
+        return st.session_state["dataset_cache"]
+    return shared_cache()
 
-    ax.set_xlim(0, maxv * 1.10 if maxv else 1)
-    fig.tight_layout()
-    return fig
 
+def get_data(ttl_seconds: int, force_refresh: bool) -> tuple[pd.DataFrame, str, int]:
+    if CACHE_SCOPE != "session":
+        # "Atualizar" only enqueues: the scheduler thread fetches, this run serves the cache
+        scheduler = refresh_scheduler()
+        scheduler.request_ttl(ttl_seconds)
+        if force_refresh:
+            scheduler.trigger()
+        force_refresh = False
+    df, source, version = dataset_cache().get_versioned(ttl_seconds=ttl_seconds, force_refresh=force_refresh)
+    if df is None:
+        return pd.DataFrame(), source, -1
+    if CACHE_SCOPE == "session":
+        # versions of per-session caches collide: keep the version-keyed shared indexes out of it
+        return df, source, -1
+    return df, source, version
 
-def chart_estados_bar(df: pd.DataFrame) -> Figure:
-    counts = df["siglaUf"].value_counts().sort_values()
 
-    fig, ax = plt.subplots(figsize=(8.2, 5.2))
-    fig.patch.set_facecolor("#0B0F14")
-    _style_dark_axes(ax)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def filter_index(version: int, _df: pd.DataFrame) -> FilterIndex:
+    # Built once per dataset version and shared by every session
+    return FilterIndex(_df, version=version)
 
-    neon_edge = (79 / 255, 142 / 255, 247 / 255, 0.92)
-    fill = (79 / 255, 142 / 255, 247 / 255, 0.24)
 
-    bars = ax.barh(counts.index, counts.values, color=fill)
-    for b in bars:
-        b.set_edgecolor(neon_edge)
-        b.set_linewidth(1.6)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def search_index(version: int, details_version: int, _df: pd.DataFrame) -> NameSearchIndex:
+    # Base + enrichment columns; rebuilt when either changes
+    return NameSearchIndex(_df)
 
-    ax.set_xlabel("Quantidade")
-    ax.set_ylabel("")
-    ax.set_title("Deputados por UF")
 
-    maxv = counts.max() if len(counts) else 0
-    for i, v in enumerate(counts.values):
-        ax.text(v + maxv * 0.01, i, str(int(v)), va="center", color="#E6EDF3", fontsize=9)
+@st.cache_resource(show_spinner=False)
+def count_cubes() -> CubeCache:
+    return CubeCache()
 
-    ax.set_xlim(0, maxv * 1.10 if maxv else 1)
-    fig.tight_layout()
-    return fig
+
+def get_cube(df: pd.DataFrame, version: int) -> CountCube:
+    # Party x UF counts, patched from the last diff when possible
+    if version < 0:
+        return CountCube.from_frame(df)
+    diff, previous = dataset_changes().transition_to(df)
+    return count_cubes().get(version, df, diff=diff, diff_base=previous)
 
 
 # ----------------------------
 # UI components
 # ----------------------------
-def kpi_row(df: pd.DataFrame):
-    total = len(df)
-    n_partidos = df["siglaPartido"].nunique(dropna=True)
-    n_ufs = df["siglaUf"].nunique(dropna=True)
+def kpi_row(cube: CountCube):
+    total = cube.total
+    n_partidos = cube.n_partidos
+    n_ufs = cube.n_ufs
 
     top_partido = "-"
     top_qtd = 0
     if total > 0:
-        vc = df["siglaPartido"].value_counts()
+        vc = cube.top(1)
         if not vc.empty:
             top_partido = vc.index[0]
             top_qtd = _safe_int(vc.iloc[0])
@@ -308,17 +366,27 @@ def kpi_row(df: pd.DataFrame):
     c4.metric("Maior partido", f"{top_partido}", delta=f"{_fmt_int(top_qtd)} deputados" if top_partido != "-" else None)
 
 
-def download_csv_button(df: pd.DataFrame, filename: str, label: str, key: str):
+def export_data(df: pd.DataFrame, fmt: str, state: tuple) -> bytes:
+    # Cached by (dataset version, filter state, format); version < 0 means unknown
+    with PERF.span(f"export:{fmt}"):
+        if state[1] < 0:
+            return encode(with_uris(df), fmt)
+        return export_bytes(df, fmt, state, prepare=with_uris)
+
+
+def download_export_button(df: pd.DataFrame, base_name: str, what: str, key: str, state: tuple, fmt: str = "csv"):
+    # `state` = (name, dataset_version, *filters); the file is encoded only on click
     st.download_button(
-        label=label,
-        data=_to_csv_bytes(df),
-        file_name=filename,
-        mime="text/csv",
+        label=f"Baixar {fmt.upper()} ({what})",
+        data=lambda: export_data(df, fmt, state),
+        file_name=file_name(base_name, fmt),
+        mime=FORMATS[fmt][1],
         use_container_width=True,
         key=key,
     )
 
 
+@PERF.timed("render_table")
 def render_table(df: pd.DataFrame, percent_col: str | None = None):
     dfx = df.copy()
     if percent_col and percent_col in dfx.columns:
@@ -339,7 +407,7 @@ def render_table(df: pd.DataFrame, percent_col: str | None = None):
 def deputy_details_card(row: dict):
     col1, col2 = st.columns([1, 2])
     with col1:
-        foto = row.get("urlFoto")
+        foto = row.get("urlFoto") or foto_url(row.get("id"))
         if foto and str(foto) != "None":
             st.image(foto, use_container_width=True)
         else:
@@ -349,17 +417,98 @@ def deputy_details_card(row: dict):
         st.markdown(f"#### {row.get('nome', '-')}")
         st.write(f"Partido: **{row.get('siglaPartido', '-')}**")
         st.write(f"UF: **{row.get('siglaUf', '-')}**")
-        uri = row.get("uri")
+
+        def _has(key):
+            v = row.get(key)
+            return v is not None and not pd.isna(v) and str(v).strip() not in ("", "None")
+
+        if _has("nomeCivil"):
+            st.write(f"Nome civil: {row['nomeCivil']}")
+        if _has("dataNascimento"):
+            nasc = str(row["dataNascimento"])
+            if _has("municipioNascimento"):
+                nasc += f" · {row['municipioNascimento']}"
+                if _has("ufNascimento"):
+                    nasc += f"/{row['ufNascimento']}"
+            st.write(f"Nascimento: {nasc}")
+        if _has("escolaridade"):
+            st.write(f"Escolaridade: {row['escolaridade']}")
+        if _has("gabineteSala"):
+            gab = f"Sala {row['gabineteSala']}"
+            if _has("gabinetePredio"):
+                gab += f", Anexo {row['gabinetePredio']}"
+            if _has("gabineteTelefone"):
+                gab += f" · Tel. {row['gabineteTelefone']}"
+            st.write(f"Gabinete: {gab}")
+        if _has("email"):
+            st.write(f"E-mail: {row['email']}")
+        if _has("redeSocial"):
+            st.markdown(" · ".join(f"[{u}]({u})" for u in str(row["redeSocial"]).split()))
+
+        uri = row.get("uri") or deputado_uri(row.get("id"))
         if uri and str(uri) != "None":
             st.link_button("Ver dados na API", uri)
 
+    deputy_votes_section(row.get("id"))
+    deputy_propositions_section(row.get("id"))
+
+
+def deputy_votes_section(dep_id):
+    store = votes().store
+    version = store.version()
+    if version < 0:
+        return
+    with PERF.span("similarity:query"):
+        index = similarity(version)
+        if index is None or dep_id not in index:
+            return
+        parecidos = index.similar(dep_id, k=10)
+        contra, total = index.against_party(dep_id)
+
+    st.markdown("##### Votações")
+    c1, c2 = st.columns(2)
+    c1.metric("Votos contra a maioria do partido", f"{100 * contra / total:.1f}%" if total else "-", delta=f"{contra} de {total}", delta_color="off")
+    if not parecidos.empty:
+        c2.metric("Vota mais parecido com", parecidos.iloc[0]["nome"], delta=f"{parecidos.iloc[0]['concordancia_%']:.1f}% de concordância", delta_color="off")
+    st.caption("Deputados que mais votam igual (Sim/Não nas votações em que ambos votaram):")
+    st.dataframe(parecidos.style.format({"concordancia_%": "{:.1f}%"}), use_container_width=True, hide_index=True)
+    if contra:
+        with st.expander(f"Votos contra a maioria do partido ({contra})", expanded=False):
+            st.dataframe(votes_against_party(store.matrix(), dep_id), use_container_width=True, hide_index=True)
+
+
+def deputy_propositions_section(dep_id):
+    index = propositions().store.index()
+    if index is None or dep_id is None or pd.isna(dep_id):
+        return
+    with PERF.span("proposicoes:autor"):
+        autoria = proposicoes_by_author(index, int(dep_id))
+    if autoria.empty:
+        return
+    with st.expander(f"Proposições de autoria ({len(autoria)})", expanded=False):
+        st.dataframe(autoria[["siglaTipo", "numero", "ano", "ementa"]], use_container_width=True, hide_index=True)
 
-def render_highlights_top5_components(df: pd.DataFrame):
+
+def render_changes(diff, ts: float):
+    st.caption(f"Atualização de {time.strftime('%d/%m/%Y %H:%M', time.localtime(ts))}: {diff.summary()}")
+    cols = ["nome", "siglaPartido", "siglaUf"]
+    if not diff.added.empty:
+        st.markdown("#### Entraram")
+        st.dataframe(diff.added[[c for c in cols if c in diff.added.columns]], use_container_width=True, hide_index=True)
+    if not diff.removed.empty:
+        st.markdown("#### Saíram")
+        st.dataframe(diff.removed[[c for c in cols if c in diff.removed.columns]], use_container_width=True, hide_index=True)
+    if not diff.changed.empty:
+        st.markdown("#### Mudaram de partido / UF")
+        st.dataframe(diff.changed.drop(columns=["id"], errors="ignore"), use_container_width=True, hide_index=True)
+
+
+def render_highlights_top5_components(cube: CountCube):
     """
     Render cards via components.html to avoid HTML appearing as code.
     """
-    total = len(df)
-    vc = df["siglaPartido"].value_counts().head(5)
+    total = cube.total
+    vc = cube.top(5)
 
     if total == 0 or vc.empty:
         st.info("Sem dados para exibir destaques.")
@@ -439,41 +588,80 @@ def render_highlights_top5_components(df: pd.DataFrame):
     components.html(html, height=260, scrolling=False)
 
 
+def render_rerun_trace(trace: RerunTrace):
+    st.markdown("#### Esta execução")
+    st.caption(f"Total: {trace.total_ms:.1f} ms")
+    spans = trace.frame()
+    spans["etapa"] = ["  " * d + name for name, d in zip(spans["etapa"], spans["nivel"])]
+    st.dataframe(spans.drop(columns="nivel").round(2), use_container_width=True, hide_index=True)
+    if trace.profile is not None:
+        st.markdown("#### Funções mais quentes (profiler)")
+        st.dataframe(trace.profile.round(1), use_container_width=True, hide_index=True)
+
+
 # ----------------------------
 # Tests
 # ----------------------------
-def run_smoke_tests(df_base: pd.DataFrame, df_filtered: pd.DataFrame) -> list[dict]:
+def run_smoke_tests(
+    df_base: pd.DataFrame,
+    df_filtered: pd.DataFrame,
+    cube_filtered: CountCube,
+    filter_state: tuple,
+) -> list[dict]:
     results = []
 
     def add(name: str, ok: bool, detail: str = ""):
         results.append({"name": name, "ok": ok, "detail": detail})
 
-    required_cols = {"id", "nome", "siglaPartido", "siglaUf", "uri", "urlFoto"}
+    required_cols = {"id", "nome", "siglaPartido", "siglaUf"}
     missing = required_cols - set(df_base.columns)
     add("Colunas essenciais presentes", ok=len(missing) == 0, detail="" if not missing else f"Faltando: {sorted(list(missing))}")
     add("Base não vazia", ok=len(df_base) > 0, detail=f"Linhas: {len(df_base)}")
+    compact = all(isinstance(df_base[c].dtype, pd.CategoricalDtype) for c in CATEGORY_COLUMNS if c in df_base.columns)
+    report = df_base.attrs.get("schema_report") or {}
+    detail = f"{bytes_per_row(df_base):.0f} bytes/linha"
+    if report:
+        detail += f" (sem compactação: {report['bytes_per_row_before']:.0f})"
+    add("Esquema compacto (categorias)", ok=compact, detail=detail)
     add("Filtro não cria linhas novas", ok=len(df_filtered) <= len(df_base), detail=f"{len(df_filtered)} <= {len(df_base)}")
 
     try:
-        f1 = chart_partidos_bar(df_filtered if len(df_filtered) else df_base)
+        f1 = chart_partidos_bar(cube_filtered.by_party())
         add("Gráfico Partidos gera Figure", ok=isinstance(f1, Figure))
     except Exception as e:
         add("Gráfico Partidos gera Figure", ok=False, detail=str(e))
 
     try:
-        f2 = chart_estados_bar(df_filtered if len(df_filtered) else df_base)
+        f2 = chart_estados_bar(cube_filtered.by_uf())
         add("Gráfico UFs gera Figure", ok=isinstance(f2, Figure))
     except Exception as e:
         add("Gráfico UFs gera Figure", ok=False, detail=str(e))
 
     try:
-        b_filtered = _to_csv_bytes(df_filtered)
-        b_full = _to_csv_bytes(df_base)
+        png = render_chart("partidos_bar", cube_filtered.by_party())
+        again = render_chart("partidos_bar", cube_filtered.by_party())
+        add("Gráfico em cache (PNG reutilizado)", ok=png is again and png[:4] == b"\x89PNG", detail=str(CHART_CACHE.stats()))
+    except Exception as e:
+        add("Gráfico em cache (PNG reutilizado)", ok=False, detail=str(e))
+
+    try:
+        # document and query terms must meet: plurals, accents and function words
+        pairs = [("leis", "Lei"), ("países", "país"), ("análises", "análise"), ("ações", "ação"), ("papéis", "papel")]
+        mismatched = [f"{a}/{b}" for a, b in pairs if analyze(a) != analyze(b)]
+        mismatched += [w for w in ("mais", "de", "para") if analyze(w)]
+        add("Analisador da busca (plurais, acentos, palavras vazias)", ok=not mismatched, detail=", ".join(mismatched))
+    except Exception as e:
+        add("Analisador da busca (plurais, acentos, palavras vazias)", ok=False, detail=str(e))
+
+    try:
+        # same cache entries as the download buttons: no re-encoding if already exported
+        b_filtered = export_data(df_filtered, "csv", ("filtrados", *filter_state))
+        b_full = export_data(df_base, "csv", ("base", filter_state[0]))
         different = b_filtered != b_full
         add(
             "CSV com filtros difere da base (se filtros ativos)",
             ok=(different or len(df_filtered) == len(df_base)),
-            detail=("Diferentes" if different else "Iguais (ok se nenhum filtro foi aplicado)"),
+            detail=("Diferentes" if different else "Iguais (ok se nenhum filtro foi aplicado)") + f" · cache {EXPORT_CACHE.stats()}",
         )
     except Exception as e:
         add("CSV diff check", ok=False, detail=str(e))
@@ -511,10 +699,10 @@ with st.sidebar:
         clear = st.button("Limpar", use_container_width=True)
 
     if clear:
-        st.session_state.cache_df = pd.DataFrame()
-        st.session_state.cache_ts = 0.0
-        st.session_state.cache_error = None
+        dataset_cache().clear()
         st.toast("Cache limpo", icon="✅")
+    if refresh and CACHE_SCOPE != "session":
+        st.toast("Atualização agendada em segundo plano", icon="🔄")
 
     st.divider()
     st.markdown("## Filtros")
@@ -523,13 +711,15 @@ with st.sidebar:
 # ----------------------------
 # Load data
 # ----------------------------
-df, source = get_data(ttl_seconds=ttl_seconds, force_refresh=refresh)
+with PERF.span("load"):
+    df, source, data_version = get_data(ttl_seconds=ttl_seconds, force_refresh=refresh)
 
 if df.empty:
-    err = st.session_state.get("cache_error")
+    err = dataset_cache().last_error
     st.error("Não foi possível carregar os dados agora.")
     if err:
         st.caption(f"Detalhe técnico: {err}")
+    PERF.end_rerun()
     st.stop()
 
 
@@ -547,6 +737,7 @@ with st.sidebar:
     st.markdown("## Exibição")
     sort_by = st.selectbox("Ordenar por", ["nome", "siglaPartido", "siglaUf"], index=0)
     page_size = st.selectbox("Linhas na tabela", [25, 50, 100, 200], index=1)
+    export_fmt = st.selectbox("Formato de exportação", list(FORMATS), index=0)
 
     st.divider()
     if source == "api":
@@ -555,89 +746,135 @@ with st.sidebar:
         st.caption("Dados do cache")
     elif source == "cache_stale":
         st.caption("Cache ativo (API indisponível no momento)")
+    elif source == "snapshot":
+        st.caption("Dados do snapshot local")
+    if OFFLINE:
+        st.caption("Modo offline: servindo apenas snapshots locais")
+    if SNAPSHOTS.last_write_error:
+        st.warning(
+            f"Snapshot local não gravado ({SNAPSHOTS.write_failures}x seguidas): {SNAPSHOTS.last_write_error}. "
+            f"Reinícios e o modo offline usarão um snapshot antigo."
+        )
+    breaker = get_client(BASE_URL).breaker
+    if breaker.state != "closed":
+        st.caption(f"API pausada pelo circuit breaker; nova tentativa às {time.strftime('%H:%M:%S', time.localtime(breaker.retry_at))}")
+    last_diff, last_diff_ts = dataset_changes().last()
+    if last_diff is not None:
+        st.caption(f"Última mudança: {last_diff.summary()}")
+    if CACHE_SCOPE != "session":
+        with st.expander("Atualização automática", expanded=False):
+            sched = refresh_scheduler().status
+            st.caption(f"Último sucesso: {_fmt_when(sched['last_success'])}")
+            if sched["running"] or dataset_cache().refreshing:
+                st.caption("Atualizando em segundo plano...")
+            else:
+                st.caption(f"Próxima execução: {_fmt_when(sched['next_run'])}")
+            if sched["failures"]:
+                st.caption(f"Falhas seguidas: {sched['failures']} (nova tentativa com backoff)")
+            if sched["last_error"]:
+                st.caption(f"Último erro: {sched['last_error']}")
     st.caption("Fonte: Dados Abertos da Câmara")
 
 
-df_f = apply_filters(df, partidos_sel=partidos_sel, ufs_sel=ufs_sel, sort_by=sort_by)
+with PERF.span("filter"):
+    f_index = filter_index(data_version, df) if data_version >= 0 else None
+    df_f = apply_filters(df, partidos_sel=partidos_sel, ufs_sel=ufs_sel, sort_by=sort_by, index=f_index)
+with PERF.span("cube"):
+    cube_f = get_cube(df, data_version).slice(partidos_sel, ufs_sel)
+# (dataset_version, partidos, ufs, sort_by): cache key for exports of the filtered data
+filter_state = (data_version, tuple(sorted(partidos_sel)), tuple(sorted(ufs_sel)), sort_by)
 
 
 # ----------------------------
-# Tabs
+# Fragments (partial reruns)
 # ----------------------------
-tabs = st.tabs(["Visão geral", "Partidos", "Estados", "Deputados", "Testes", "Sobre"])
-
-
-# --- Visão geral ---
-with tabs[0]:
-    kpi_row(df_f)
-    st.divider()
-
-    col1, col2 = st.columns(2, gap="large")
-    with col1:
-        st.markdown("### Deputados por partido")
-        st.pyplot(chart_partidos_bar(df_f), clear_figure=True)
-
-    with col2:
-        st.markdown("### Deputados por UF")
-        st.pyplot(chart_estados_bar(df_f), clear_figure=True)
-
-    # ✅ Export + Destaques apenas aqui (sem duplicar no "rodapé")
-    with st.expander("Análises avançadas", expanded=False):
-        colA, colB = st.columns([1.15, 1.35], gap="small")
-
-        with colA:
-            st.markdown("### Destaques (Top 5 partidos)")
-            st.caption("Resumo rápido com base nos filtros atuais.")
-            render_highlights_top5_components(df_f)
-
-        with colB:
-            st.markdown("### Exportação")
-            st.caption("Baixe os dados considerando os filtros atuais (não é a base completa).")
-            download_csv_button(
-                df_f,
-                "deputados_filtrados.csv",
-                "Baixar CSV (com filtros)",
-                key="dl_filtered_expander",
-            )
-
-            st.divider()
-            st.caption("Baixe a base completa (sem filtros).")
-            download_csv_button(
-                df,
-                "deputados_base_completa.csv",
-                "Baixar CSV (base completa)",
-                key="dl_full_expander",
-            )
-
-
-# --- Partidos ---
-with tabs[1]:
-    st.markdown("### Ranking de partidos")
-    cont_partidos = counts_table(df_f["siglaPartido"], "siglaPartido")
-    render_table(cont_partidos, percent_col="qtdDeputados")
-
-    st.divider()
-    download_csv_button(cont_partidos, "contagem_partidos.csv", "Baixar CSV (ranking partidos)", key="dl_rank_partidos")
-
-
-# --- Estados ---
-with tabs[2]:
-    st.markdown("### Ranking por UF")
-    cont_ufs = counts_table(df_f["siglaUf"], "siglaUf")
-    render_table(cont_ufs, percent_col="qtdDeputados")
+# Widgets inside a fragment rerun only that function, not the whole script:
+# typing a name in "Deputados" does not re-render the overview.
+@st.fragment
+def export_panel(df_f: pd.DataFrame, df: pd.DataFrame, filter_state: tuple, fmt: str):
+    st.markdown("### Exportação")
+    st.caption("Baixe os dados considerando os filtros atuais (não é a base completa).")
+    download_export_button(
+        df_f,
+        "deputados_filtrados",
+        "com filtros",
+        key="dl_filtered_expander",
+        state=("filtrados", *filter_state),
+        fmt=fmt,
+    )
 
     st.divider()
-    download_csv_button(cont_ufs, "contagem_estados.csv", "Baixar CSV (ranking UFs)", key="dl_rank_ufs")
+    st.caption("Baixe a base completa (sem filtros).")
+    download_export_button(
+        df,
+        "deputados_base_completa",
+        "base completa",
+        key="dl_full_expander",
+        state=("base", filter_state[0]),
+        fmt=fmt,
+    )
 
 
-# --- Deputados ---
-with tabs[3]:
+@st.fragment
+def deputados_explorer(df_f: pd.DataFrame, df: pd.DataFrame, page_size: int, filter_state: tuple, fmt: str):
+    data_version = filter_state[0]
     st.markdown("### Explorar deputados")
-    search = st.text_input("Buscar por nome", value="", placeholder="Digite um nome...")
+    search = st.text_input(
+        "Buscar por nome",
+        value="",
+        placeholder="Digite um nome...",
+        help="Ignora acentos e maiúsculas; tolera um erro de digitação.",
+    )
+
+    enr = enricher()
+    df_view = merge_details(df_f, enr.details())
+
+    with st.expander("Detalhes completos (enriquecimento)", expanded=False):
+        n_details = len(enr.details())
+        st.caption(f"Detalhes carregados para {_fmt_int(n_details)} de {_fmt_int(len(df))} deputados.")
+        if enr.running:
+            stt = enr.status
+            st.info(f"Buscando detalhes: {stt['done']}/{stt['total']}...")
+        elif enr.status["seconds"] is not None:
+            stt = enr.status
+            st.caption(f"Última carga: {stt['total']} deputados em {stt['seconds']:.1f}s ({stt['errors']} erros)")
+            if stt["last_error"]:
+                st.caption(f"Detalhe técnico: {stt['last_error']}")
+
+        col_e1, col_e2 = st.columns(2)
+        with col_e1:
+            if st.button("Carregar detalhes faltantes", use_container_width=True, disabled=OFFLINE or enr.running):
+                enr.start(df["id"].dropna().tolist())
+                st.rerun(scope="fragment")
+        with col_e2:
+            if st.button("Recarregar todos", use_container_width=True, disabled=OFFLINE or enr.running):
+                enr.start(df["id"].dropna().tolist(), only_missing=False)
+                st.rerun(scope="fragment")
+
+    detail_filters = {"escolaridade": "Escolaridade", "ufNascimento": "UF de nascimento", "sexo": "Sexo"}
+    detail_filters = {c: label for c, label in detail_filters.items() if c in df_view.columns}
+    explore_state = [enr.version, search.strip()]
+    if detail_filters:
+        filter_cols = st.columns(len(detail_filters))
+        for fcol, (c, label) in zip(filter_cols, detail_filters.items()):
+            with fcol:
+                sel = st.multiselect(label, sorted(df_view[c].dropna().unique().tolist()), default=[])
+            if sel:
+                df_view = df_view[df_view[c].isin(sel)]
+                explore_state.append((c, tuple(sorted(sel))))
 
-    df_view = df_f.copy()
     if search.strip():
-        df_view = df_view[df_view["nome"].str.contains(search, case=False, na=False)]
+        with PERF.span("search"):
+            details = enr.details()
+            searchable = merge_details(df, details)
+            if data_version >= 0:
+                index = search_index(data_version, enr.version, searchable)
+            else:
+                index = NameSearchIndex(searchable)
+            ranked = index.search(search)
+            df_view = df_view[df_view["id"].isin(ranked.index)]
+            df_view = df_view.assign(_score=df_view["id"].map(ranked))
+            df_view = df_view.sort_values("_score", ascending=False, kind="stable").drop(columns="_score")
 
     preferred_cols = ["nome", "siglaPartido", "siglaUf"]
     cols = [c for c in preferred_cols if c in df_view.columns]
@@ -655,16 +892,464 @@ with tabs[3]:
         deputy_details_card(row)
 
     st.divider()
-    download_csv_button(df_view, "deputados_explorados.csv", "Baixar CSV (resultado atual)", key="dl_deputados_explorados")
+    download_export_button(
+        df_view,
+        "deputados_explorados",
+        "resultado atual",
+        key="dl_deputados_explorados",
+        state=("explorados", *filter_state, *explore_state),
+        fmt=fmt,
+    )
 
 
-# --- Testes ---
-with tabs[4]:
+@st.fragment
+def votes_panel(filter_state: tuple, fmt: str):
+    _, partidos_sel, ufs_sel, _ = filter_state
+    st.markdown("### Votações nominais do Plenário")
+    st.caption("Legislatura atual. Partido e UF de cada deputado conforme o último voto registrado.")
+
+    ing = votes()
+    store = ing.store
+
+    with st.expander("Carga das votações", expanded=store.version() < 0):
+        stt = ing.status
+        if ing.running:
+            st.info(f"Buscando votos: {stt['done']}/{stt['total']} votações...")
+            if st.button("Atualizar progresso", use_container_width=True, key="votes_progress"):
+                st.rerun(scope="fragment")
+        elif stt["seconds"] is not None:
+            st.caption(f"Última carga: {stt['total']} votações novas em {stt['seconds']:.1f}s ({stt['errors']} erros)")
+            if stt["last_error"]:
+                st.caption(f"Detalhe técnico: {stt['last_error']}")
+        if st.button("Carregar votações novas", use_container_width=True, disabled=OFFLINE or ing.running):
+            ing.start()
+            st.rerun(scope="fragment")
+
+    vm = store.matrix()
+    if vm is None:
+        st.info("Nenhuma votação carregada ainda.")
+        return
+
+    rows = vm.rows(partidos_sel, ufs_sel)
+    if not len(rows) or not vm.shape[1]:
+        st.info("Nenhum deputado com votos para os filtros atuais.")
+        return
+    with PERF.span("votes:metrics"):
+        dep = vm.deputy_metrics(rows)
+        party = vm.party_metrics(rows, dep=dep)
+
+    # Rice weighted by party size, so the KPI matches the selection
+    with_rice = party["coesao_rice"].notna()
+    weight = party.loc[with_rice, "deputados"].sum()
+    rice = (party.loc[with_rice, "coesao_rice"] * party.loc[with_rice, "deputados"]).sum() / weight if weight else None
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Votações nominais", _fmt_int(vm.shape[1]))
+    c2.metric("Coesão média (Rice)", f"{rice:.2f}" if rice is not None else "–")
+    c3.metric("Alinhamento ao governo", f"{dep['alinhamento_governo_%'].mean():.1f}%")
+    c4.metric("Ausência média", f"{dep['ausencia_%'].mean():.1f}%")
+
+    st.divider()
+    col1, col2 = st.columns([1, 1.2], gap="large")
+    with col1:
+        with PERF.span("chart:coesao_bar"):
+            st.image(render_chart("coesao_bar", party.set_index("siglaPartido")["coesao_rice"]), use_container_width=True)
+    with col2:
+        st.markdown("### Por partido")
+        st.dataframe(
+            party.style.format({"coesao_rice": "{:.2f}", "alinhamento_governo_%": "{:.1f}%", "ausencia_%": "{:.1f}%"}),
+            use_container_width=True,
+            hide_index=True,
+        )
+        download_export_button(
+            party,
+            "votacoes_partidos",
+            "métricas por partido",
+            key="dl_votos_partidos",
+            state=("votos_partidos", store.version(), *filter_state[1:3]),
+            fmt=fmt,
+        )
+
+    index = similarity(store.version())
+    if index is not None:
+        st.divider()
+        col3, col4 = st.columns([1.2, 1], gap="large")
+        selected_ids = set(dep["id"])
+        with col3:
+            points = index.embedding()
+            points = points[points["id"].isin(selected_ids)]
+            with PERF.span("chart:mapa_votos"):
+                st.image(render_chart("mapa_votos", points[["x", "y", "siglaPartido"]]), use_container_width=True)
+            st.caption("Cada ponto é um deputado; quem vota parecido fica próximo.")
+        with col4:
+            st.markdown("### Votam contra o partido")
+            rebels = index.rebels()
+            rebels = rebels[rebels["id"].isin(selected_ids)].drop(columns="id")
+            st.dataframe(rebels.head(50).style.format({"contra_partido_%": "{:.1f}%"}), use_container_width=True, hide_index=True)
+
+    st.divider()
+    st.markdown("### Por deputado")
+    st.dataframe(
+        dep.drop(columns="id")
+        .sort_values("ausencia_%", ascending=False, kind="stable")
+        .style.format({"ausencia_%": "{:.1f}%", "alinhamento_governo_%": "{:.1f}%"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+    download_export_button(
+        dep,
+        "votacoes_deputados",
+        "métricas por deputado",
+        key="dl_votos_deputados",
+        state=("votos_deputados", store.version(), *filter_state[1:3]),
+        fmt=fmt,
+    )
+
+
+@st.fragment
+def history_panel(fmt: str):
+    st.markdown("### Histórico legislativo")
+    st.caption("Deputados que exerceram mandato em cada legislatura (inclui suplentes que assumiram).")
+
+    hist = history()
+    store = hist.store
+    legs_on_disk = store.partitions()
+
+    with st.expander("Carga do histórico", expanded=not legs_on_disk):
+        st.caption(f"{_fmt_int(len(legs_on_disk))} legislaturas armazenadas em {store.root}")
+        stt = hist.status
+        if hist.running:
+            atual = f" (legislatura {stt['current']})" if stt["current"] else ""
+            st.info(f"Carregando legislaturas: {stt['done']}/{stt['total']}{atual}...")
+            if st.button("Atualizar progresso", use_container_width=True):
+                st.rerun(scope="fragment")
+        elif stt["seconds"] is not None:
+            st.caption(f"Última carga: {stt['total']} legislaturas em {stt['seconds']:.1f}s ({stt['errors']} erros)")
+            if stt["last_error"]:
+                st.caption(f"Detalhe técnico: {stt['last_error']}")
+
+        col_h1, col_h2 = st.columns(2)
+        with col_h1:
+            if st.button("Carregar legislaturas faltantes", use_container_width=True, disabled=OFFLINE or hist.running):
+                hist.start()
+                st.rerun(scope="fragment")
+        with col_h2:
+            if st.button("Recarregar todas", use_container_width=True, disabled=OFFLINE or hist.running):
+                hist.start(only_missing=False)
+                st.rerun(scope="fragment")
+
+    if not legs_on_disk:
+        st.info("Nenhuma legislatura carregada ainda.")
+        return
+
+    with PERF.span("history:aggregates"):
+        agg = store.aggregates()
+    labels = legislatura_labels(store.legislaturas())
+    legs = sorted(agg["idLegislatura"].unique().tolist())
+    if not legs:
+        st.info("Nenhuma legislatura carregada ainda.")
+        return
+
+    col_r1, col_r2 = st.columns([3, 1])
+    with col_r1:
+        first, last = st.select_slider(
+            "Legislaturas",
+            options=legs,
+            value=(legs[max(0, len(legs) - 10)], legs[-1]),
+            format_func=lambda leg: labels.get(leg, f"{leg}ª"),
+        )
+    with col_r2:
+        top = st.number_input("Partidos no gráfico", min_value=3, max_value=20, value=8, step=1)
+    window = [leg for leg in legs if first <= leg <= last]
+    hist_state = (store.version(), first, last, int(top))
+
+    st.markdown("### Evolução das bancadas")
+    seats = seats_by_party(agg, window, top=int(top))
+    with PERF.span("chart:evolucao_partidos"):
+        st.image(render_chart("evolucao_partidos", seats.rename(index=labels)), use_container_width=True)
+    st.dataframe(seats.rename(index=labels), use_container_width=True)
+    download_export_button(
+        seats_by_party(agg, window).rename_axis("idLegislatura").reset_index(),
+        "historico_partidos",
+        "bancadas por legislatura",
+        key="dl_historico_partidos",
+        state=("historico_partidos", *hist_state[:3]),
+        fmt=fmt,
+    )
+
+    st.divider()
+    st.markdown("### Composição por UF")
+    ufs = sorted(agg["siglaUf"].astype(str).unique().tolist())
+    uf = st.selectbox("UF", ufs, index=ufs.index("SP") if "SP" in ufs else 0)
+    comp = uf_composition(agg, uf, window, top=int(top))
+    if comp.empty:
+        st.info("Sem deputados dessa UF no período.")
+    else:
+        with PERF.span("chart:composicao_uf"):
+            st.image(render_chart("composicao_uf", comp.rename(index=labels)), use_container_width=True)
+        st.dataframe(comp.rename(index=labels), use_container_width=True)
+
+    st.divider()
+    st.markdown("### Deputados de uma legislatura")
+    # Raw rows are read from disk only here, one partition at a time
+    leg_sel = st.selectbox(
+        "Legislatura",
+        [None] + sorted(legs_on_disk, reverse=True),
+        format_func=lambda leg: "" if leg is None else labels.get(leg, f"{leg}ª"),
+    )
+    if leg_sel is not None:
+        with PERF.span("history:partition"):
+            dep = store.load(leg_sel)
+        cols = [c for c in ["nome", "siglaPartido", "siglaUf"] if c in dep.columns]
+        st.caption(f"{_fmt_int(len(dep))} deputados")
+        st.dataframe(dep[cols].sort_values("nome", kind="stable"), use_container_width=True, hide_index=True)
+        download_export_button(
+            dep,
+            f"deputados_legislatura_{leg_sel}",
+            f"legislatura {leg_sel}",
+            key="dl_historico_legislatura",
+            state=("historico_legislatura", store.partition_path(leg_sel).stat().st_mtime_ns, leg_sel),
+            fmt=fmt,
+        )
+
+
+@st.fragment
+def expenses_panel(df: pd.DataFrame, filter_state: tuple, fmt: str):
+    st.markdown("### Despesas (cota parlamentar)")
+    st.caption("Gastos da Cota para o Exercício da Atividade Parlamentar (CEAP) dos deputados atuais, por mês.")
+
+    ing = expenses()
+    store = ing.store
+    summary = store.summary()
+    this_year = date.today().year
+
+    with st.expander("Carga das despesas", expanded=not summary["rows"]):
+        if summary["rows"]:
+            (a0, m0), (a1, m1) = summary["months"][0], summary["months"][-1]
+            st.caption(
+                f"{_fmt_int(summary['rows'])} documentos de {m0:02d}/{a0} a {m1:02d}/{a1} "
+                f"· {summary['files']} arquivos · {summary['bytes'] / 1e6:.1f} MB em {store.root}"
+            )
+        anos = st.multiselect(
+            "Anos",
+            list(range(this_year, 2007, -1)),
+            default=[this_year - 1, this_year],
+            help="Só meses fechados são carregados; o que já está em disco é pulado.",
+        )
+        stt = ing.status
+        if ing.running:
+            st.info(f"Carregando despesas: {stt['done']}/{stt['total']} deputado-ano, {_fmt_int(stt['rows'])} documentos...")
+            if st.button("Atualizar progresso", use_container_width=True, key="despesas_progresso"):
+                st.rerun(scope="fragment")
+        elif stt["seconds"] is not None:
+            st.caption(
+                f"Última carga: {_fmt_int(stt['rows'])} documentos de {stt['done']} deputado-ano em {stt['seconds']:.1f}s "
+                f"({stt['skipped']} já em disco, {stt['errors']} erros)"
+            )
+            if stt["last_error"]:
+                st.caption(f"Detalhe técnico: {stt['last_error']}")
+
+        col_e1, col_e2 = st.columns(2)
+        with col_e1:
+            if st.button("Carregar despesas", use_container_width=True, disabled=OFFLINE or ing.running or not anos):
+                ing.start(df["id"].dropna().astype(int).tolist(), anos)
+                st.rerun(scope="fragment")
+        with col_e2:
+            # Interrupted loads resume from the checkpoint on the next start
+            if st.button("Interromper", use_container_width=True, disabled=not ing.running):
+                ing.stop()
+                st.rerun(scope="fragment")
+
+    if not summary["rows"]:
+        st.info("Nenhuma despesa carregada ainda.")
+        return
+
+    with PERF.span("despesas:cube"):
+        cube = expense_cube(store.version(), filter_state[0], df)
+    if cube.empty:
+        st.info("Nenhuma despesa carregada ainda.")
+        return
+
+    labels = cube.month_labels
+    col_d1, col_d2 = st.columns([3, 2])
+    with col_d1:
+        inicio, fim = st.select_slider(
+            "Período",
+            options=list(range(len(labels))),
+            value=(max(0, len(labels) - 12), len(labels) - 1),
+            format_func=lambda i: labels[i],
+        )
+    with col_d2:
+        categorias = st.multiselect("Categorias", cube.categories, placeholder="Todas")
+
+    # Answered from the rollups: party/UF filters, period and categories are masks over small arrays
+    with PERF.span("despesas:query"):
+        sel = cube.select(filter_state[1], filter_state[2], inicio, fim, categorias)
+        total, n_dep = sel.total, sel.n_deputados
+        ranking = sel.by_deputy()
+        por_mes, por_categoria, por_partido = sel.by_month(), sel.by_category(), sel.by_party()
+    desp_state = (store.version(), *filter_state[:3], inicio, fim, tuple(sorted(categorias)))
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Total gasto", _fmt_brl(total))
+    c2.metric("Documentos", _fmt_int(sel.documentos))
+    c3.metric("Deputados", _fmt_int(n_dep))
+    c4.metric("Média por deputado", _fmt_brl(total / n_dep if n_dep else 0.0))
+
+    with PERF.span("chart:despesas_mes"):
+        st.image(render_chart("despesas_mes", por_mes), use_container_width=True)
+
+    col_c1, col_c2 = st.columns([1.4, 1], gap="large")
+    with col_c1:
+        if not por_categoria.empty:
+            with PERF.span("chart:despesas_categorias"):
+                st.image(render_chart("despesas_categorias", por_categoria), use_container_width=True)
+    with col_c2:
+        st.markdown("#### Por partido")
+        st.dataframe(
+            por_partido.rename("valorLiquido").reset_index(),
+            use_container_width=True,
+            hide_index=True,
+            column_config={"valorLiquido": st.column_config.NumberColumn("Valor líquido (R$)", format="%.2f")},
+        )
+
+    st.divider()
+    st.markdown("### Maiores gastos")
+    money = {"valorLiquido": st.column_config.NumberColumn("Valor líquido (R$)", format="%.2f")}
+    st.dataframe(
+        ranking.head(20)[["nome", "siglaPartido", "siglaUf", "valorLiquido", "documentos"]],
+        use_container_width=True,
+        hide_index=True,
+        column_config=money,
+    )
+    download_export_button(
+        ranking,
+        "despesas_deputados",
+        "despesas por deputado",
+        key="dl_despesas_deputados",
+        state=("despesas_deputados", *desp_state),
+        fmt=fmt,
+    )
+
+    st.divider()
+    st.markdown("### Documentos de um deputado")
+    # Drill-down: the only place raw documents are read (one deputy, the selected months)
+    nomes = dict(zip(ranking["id"], ranking["nome"]))
+    dep_id = st.selectbox("Deputado", [None] + list(nomes), format_func=lambda i: "" if i is None else nomes[i])
+    if dep_id is None:
+        return
+    with PERF.span("despesas:documentos"):
+        docs = store.documents([dep_id], *sel.period(), categorias=categorias).to_pandas()
+    if docs.empty:
+        st.info("Sem documentos no período.")
+        return
+    fornecedores = (
+        docs.groupby(["nomeFornecedor", "cnpjCpfFornecedor"], dropna=False)["valorLiquido"]
+        .agg(["sum", "count"])
+        .rename(columns={"sum": "valorLiquido", "count": "documentos"})
+        .sort_values("valorLiquido", ascending=False)
+        .reset_index()
+    )
+    fornecedor = st.selectbox("Fornecedor", [None] + fornecedores["nomeFornecedor"].dropna().tolist(), format_func=lambda f: "Todos" if f is None else f)
+    if fornecedor is None:
+        st.markdown("#### Fornecedores")
+        st.dataframe(fornecedores.head(20), use_container_width=True, hide_index=True, column_config=money)
+    else:
+        docs = docs[docs["nomeFornecedor"] == fornecedor]
+    cols = ["dataDocumento", "tipoDespesa", "nomeFornecedor", "tipoDocumento", "numDocumento", "valorLiquido", "valorGlosa"]
+    st.markdown("#### Documentos")
+    st.caption(f"{_fmt_int(len(docs))} documentos · {_fmt_brl(docs['valorLiquido'].sum())}")
+    st.dataframe(docs.sort_values("dataDocumento")[cols], use_container_width=True, hide_index=True, column_config=money)
+    download_export_button(
+        docs,
+        f"despesas_deputado_{dep_id}",
+        "documentos do deputado",
+        key="dl_despesas_documentos",
+        state=("despesas_documentos", *desp_state, dep_id, fornecedor),
+        fmt=fmt,
+    )
+
+
+@st.fragment
+def propositions_panel(df_f: pd.DataFrame, filter_state: tuple, fmt: str):
+    st.markdown("### Proposições")
+    st.caption("Busca nas ementas de projetos de lei e outras proposições, com os deputados autores.")
+
+    ing = propositions()
+    store = ing.store
+    index = store.index()
+    this_year = date.today().year
+
+    with st.expander("Carga das proposições", expanded=index is None or index.stale):
+        if index is not None:
+            st.caption(f"{_fmt_int(len(index))} proposições indexadas ({_fmt_int(index.n_terms)} termos) em {store.root}")
+            if index.stale:
+                st.warning("Índice criado por uma versão anterior do analisador de texto: carregue de novo para reindexar.")
+        col_a1, col_a2 = st.columns(2)
+        with col_a1:
+            anos = st.multiselect("Anos", list(range(this_year, 1999, -1)), default=[this_year - 1, this_year], key="proposicoes_anos")
+        with col_a2:
+            tipos_carga = st.multiselect("Tipos", TIPOS_PADRAO + ["REQ", "PRC", "INC"], default=TIPOS_PADRAO, key="proposicoes_tipos")
+        stt = ing.status
+        if ing.running:
+            st.info(f"Carregando autores: {stt['done']}/{stt['total']} proposições...")
+            if st.button("Atualizar progresso", use_container_width=True, key="proposicoes_progresso"):
+                st.rerun(scope="fragment")
+        elif stt["seconds"] is not None:
+            indexed = f", índice com {_fmt_int(stt['indexed'])}" if stt["indexed"] is not None else ""
+            st.caption(f"Última carga: {stt['done']} proposições novas em {stt['seconds']:.1f}s ({stt['errors']} erros{indexed})")
+            if stt["last_error"]:
+                st.caption(f"Detalhe técnico: {stt['last_error']}")
+        if st.button("Carregar proposições novas", use_container_width=True, disabled=OFFLINE or ing.running or not anos):
+            ing.start(anos, tipos_carga)
+            st.rerun(scope="fragment")
+
+    if index is None:
+        st.info("Nenhuma proposição carregada ainda.")
+        return
+
+    col_b1, col_b2 = st.columns([3, 1])
+    with col_b1:
+        consulta = st.text_input("Buscar nas ementas", placeholder="ex.: proteção de dados pessoais")
+    with col_b2:
+        tipos = st.multiselect("Tipo", sorted(set(index.columns["siglaTipo"].tolist())), placeholder="Todos")
+    if not consulta.strip():
+        return
+
+    # Sidebar party / UF filters: keep proposições with at least one author among the filtered deputies
+    facetado = bool(filter_state[1] or filter_state[2])
+    dep_ids = df_f["id"].dropna().astype(int).tolist() if facetado else None
+    t0 = time.perf_counter()
+    with PERF.span("proposicoes:busca"):
+        resultados, total = search_proposicoes(index, consulta, dep_ids=dep_ids, tipos=tipos, limit=100)
+    ms = (time.perf_counter() - t0) * 1000
+
+    filtro = " de autoria dos deputados filtrados" if facetado else ""
+    st.caption(f"{_fmt_int(total)} proposições{filtro} · {ms:.0f} ms · mostrando as {len(resultados)} mais relevantes")
+    if resultados.empty:
+        st.info("Nenhuma proposição encontrada.")
+        return
+    st.dataframe(
+        resultados[["siglaTipo", "numero", "ano", "ementa", "autores"]],
+        use_container_width=True,
+        hide_index=True,
+    )
+    download_export_button(
+        resultados,
+        "proposicoes_busca",
+        "resultados da busca",
+        key="dl_proposicoes_busca",
+        state=("proposicoes_busca", filter_state[0], store.version(), *filter_state[1:3], consulta, tuple(sorted(tipos))),
+        fmt=fmt,
+    )
+
+
+@st.fragment
+def smoke_tests_panel(df: pd.DataFrame, df_f: pd.DataFrame, cube_f: CountCube, filter_state: tuple):
     st.markdown("### Testes automatizados (smoke tests)")
     st.caption("Valida automaticamente: carregamento, filtros, gráficos e exportação.")
 
     if st.button("Rodar testes agora", use_container_width=True):
-        results = run_smoke_tests(df_base=df, df_filtered=df_f)
+        results = run_smoke_tests(df_base=df, df_filtered=df_f, cube_filtered=cube_f, filter_state=filter_state)
         ok_count = sum(1 for r in results if r["ok"])
         total = len(results)
 
@@ -679,14 +1364,220 @@ with tabs[4]:
                 st.caption(r["detail"])
 
 
-# --- Sobre ---
+@st.fragment
+def performance_panel():
+    st.markdown("### Performance")
+    st.caption(
+        f"Tempo por etapa (ms), somando todas as sessões; quantis sobre as últimas {PERF.window} execuções de cada etapa."
+    )
+
+    stats = PERF.stats()
+    if stats.empty:
+        st.info("Ainda não há medições.")
+    else:
+        st.dataframe(
+            stats.round(2).sort_values("p95_ms", ascending=False, kind="stable"),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    col_p1, col_p2, col_p3 = st.columns(3)
+    with col_p1:
+        st.download_button(
+            "Baixar Prometheus",
+            data=PERF.to_prometheus,
+            file_name="deputados_metrics.prom",
+            mime="text/plain",
+            use_container_width=True,
+            key="dl_perf_prom",
+        )
+    with col_p2:
+        st.download_button(
+            "Baixar JSON",
+            data=PERF.to_json,
+            file_name="deputados_metrics.json",
+            mime="application/json",
+            use_container_width=True,
+            key="dl_perf_json",
+        )
+    with col_p3:
+        if st.button("Zerar métricas", use_container_width=True):
+            PERF.reset()
+            st.rerun(scope="fragment")
+
+    st.divider()
+    st.markdown("#### Cliente da API")
+    m = get_client(BASE_URL).metrics()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Requisições", _fmt_int(m["requests"]), delta=f"{_fmt_int(m['attempts'])} tentativas HTTP", delta_color="off")
+    c2.metric("Retentativas", _fmt_int(m["retries"]), delta=f"{_fmt_int(m['failures'])} falhas", delta_color="off")
+    c3.metric("Hedges", _fmt_int(m["hedges"]), delta=f"{_fmt_int(m['hedge_wins'])} venceram", delta_color="off")
+    c4.metric("Circuit breaker", m["breaker_state"], delta=f"aberto {m['breaker_opens']}x", delta_color="off")
+    st.caption(
+        " · ".join(
+            f"{label}: {m[key]:.0f} ms"
+            for label, key in [("p50", "latency_p50_ms"), ("p95", "latency_p95_ms"), ("hedge após", "hedge_delay_ms")]
+            if m[key] is not None
+        )
+        or "Sem requisições medidas ainda."
+    )
+
+    st.divider()
+    st.markdown("#### Profiler")
+    st.caption("Amostra a pilha do script a cada 5 ms durante uma única execução e lista as funções mais quentes.")
+    if st.button("Perfilar a próxima execução", use_container_width=True):
+        st.session_state["perf_profile_next"] = True
+        PERF.end_rerun()
+        st.rerun()
+
+
+# ----------------------------
+# Tabs
+# ----------------------------
+# on_change="rerun" makes tab state known to the script: only the open tab runs
+tabs = st.tabs(
+    ["Visão geral", "Partidos", "Estados", "Deputados", "Votações", "Despesas", "Proposições", "Histórico", "Testes", "Performance", "Sobre"],
+    key="aba",
+    on_change="rerun",
+)
+
+
+# --- Visão geral ---
+with tabs[0]:
+    if tabs[0].open:
+        with PERF.span("tab:Visão geral"):
+            kpi_row(cube_f)
+            st.divider()
+
+            col1, col2 = st.columns(2, gap="large")
+            with col1:
+                st.markdown("### Deputados por partido")
+                with PERF.span("chart:partidos_bar"):
+                    st.image(render_chart("partidos_bar", cube_f.by_party()), use_container_width=True)
+
+            with col2:
+                st.markdown("### Deputados por UF")
+                with PERF.span("chart:estados_bar"):
+                    st.image(render_chart("estados_bar", cube_f.by_uf()), use_container_width=True)
+
+            if last_diff is not None:
+                with st.expander("Mudanças desde a atualização anterior", expanded=False):
+                    render_changes(last_diff, last_diff_ts)
+
+            # ✅ Export + Destaques apenas aqui (sem duplicar no "rodapé")
+            with st.expander("Análises avançadas", expanded=False):
+                colA, colB = st.columns([1.15, 1.35], gap="small")
+
+                with colA:
+                    st.markdown("### Destaques (Top 5 partidos)")
+                    st.caption("Resumo rápido com base nos filtros atuais.")
+                    render_highlights_top5_components(cube_f)
+
+                with colB:
+                    export_panel(df_f, df, filter_state, export_fmt)
+
+
+# --- Partidos ---
+with tabs[1]:
+    if tabs[1].open:
+        with PERF.span("tab:Partidos"):
+            st.markdown("### Ranking de partidos")
+            cont_partidos = cube_f.table("siglaPartido")
+            render_table(cont_partidos, percent_col="qtdDeputados")
+
+            st.divider()
+            download_export_button(
+                cont_partidos,
+                "contagem_partidos",
+                "ranking partidos",
+                key="dl_rank_partidos",
+                state=("rank_partidos", *filter_state[:3]),
+                fmt=export_fmt,
+            )
+
+
+# --- Estados ---
+with tabs[2]:
+    if tabs[2].open:
+        with PERF.span("tab:Estados"):
+            st.markdown("### Ranking por UF")
+            cont_ufs = cube_f.table("siglaUf")
+            render_table(cont_ufs, percent_col="qtdDeputados")
+
+            st.divider()
+            download_export_button(
+                cont_ufs,
+                "contagem_estados",
+                "ranking UFs",
+                key="dl_rank_ufs",
+                state=("rank_ufs", *filter_state[:3]),
+                fmt=export_fmt,
+            )
+
+
+# --- Deputados ---
+with tabs[3]:
+    if tabs[3].open:
+        with PERF.span("tab:Deputados"):
+            deputados_explorer(df_f, df, page_size, filter_state, export_fmt)
+
+
+# --- Votações ---
+with tabs[4]:
+    if tabs[4].open:
+        with PERF.span("tab:Votações"):
+            votes_panel(filter_state, export_fmt)
+
+
+# --- Despesas ---
 with tabs[5]:
+    if tabs[5].open:
+        with PERF.span("tab:Despesas"):
+            expenses_panel(df, filter_state, export_fmt)
+
+
+# --- Proposições ---
+with tabs[6]:
+    if tabs[6].open:
+        with PERF.span("tab:Proposições"):
+            propositions_panel(df_f, filter_state, export_fmt)
+
+
+# --- Histórico ---
+with tabs[7]:
+    if tabs[7].open:
+        with PERF.span("tab:Histórico"):
+            history_panel(export_fmt)
+
+
+# --- Testes ---
+with tabs[8]:
+    if tabs[8].open:
+        with PERF.span("tab:Testes"):
+            smoke_tests_panel(df, df_f, cube_f, filter_state)
+
+
+# --- Performance ---
+perf_slot = None
+with tabs[9]:
+    if tabs[9].open:
+        performance_panel()
+        # filled after the run ends, with this run's spans
+        perf_slot = st.container()
+
+
+# --- Sobre ---
+with tabs[10]:
     st.markdown(
         """
 ### Sobre
 Interface para análise da composição atual da Câmara dos Deputados, com foco em:
 - distribuição por partido
 - distribuição por UF
+- votações nominais: coesão partidária, alinhamento ao governo e ausências
+- despesas da cota parlamentar (CEAP)
+- busca nas ementas das proposições e seus autores
+- histórico de bancadas por legislatura
 - filtros e exportação
 
 Stack: Python · Pandas · Streamlit · Matplotlib  
@@ -694,3 +1585,9 @@ Fonte: API de Dados Abertos da Câmara dos Deputados
 """
     )
     st.info("Sugestão: mantenha cache entre 30 e 120 min para melhor performance na cloud.")
+
+
+finished = PERF.end_rerun()
+if finished is not None and perf_slot is not None:
+    with perf_slot:
+        render_rerun_trace(finished)
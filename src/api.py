@@ -0,0 +1,383 @@
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TypedDict
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_WORKERS = int(os.environ.get("CAMARA_API_MAX_WORKERS", "4"))
+DEFAULT_RETRIES = int(os.environ.get("CAMARA_API_RETRIES", "3"))
+# Hedge a request once it is slower than this quantile of recent latencies ("0" disables)
+DEFAULT_HEDGE_QUANTILE = float(os.environ.get("CAMARA_API_HEDGE_QUANTILE", "0.95"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class NotModified(Exception):
+    """Raised by conditional fetches when the server answered 304 for every page."""
+
+
+class CircuitOpen(Exception):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive failed requests (retries
+    exhausted); after `cooldown` seconds one probe request is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opens = 0
+        self.opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self.opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    @property
+    def retry_at(self) -> float | None:
+        """Wall-clock time when the next probe is allowed (None when closed)."""
+        with self._lock:
+            if self.opened_at is None:
+                return None
+            return time.time() + max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self.opened_at >= self.cooldown:
+                self._probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (self.opened_at is None and self.failures >= self.threshold):
+                if not self._probing:
+                    self.opens += 1
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+class Deputado(TypedDict, total=False):
+    id: int
+    uri: str
+    nome: str
+    siglaPartido: str
+    uriPartido: str
+    siglaUf: str
+    idLegislatura: int
+    urlFoto: str
+    email: str | None
+
+
+def _close_response(fut):
+    if not fut.cancelled() and fut.exception() is None:
+        fut.result().close()
+
+
+def _link(payload: dict, rel: str) -> str | None:
+    for link in payload.get("links") or []:
+        if link.get("rel") == rel:
+            return link.get("href")
+    return None
+
+
+def _page_number(href: str | None) -> int | None:
+    if not href:
+        return None
+    values = parse_qs(urlparse(href).query).get("pagina")
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+class CamaraClient:
+    """
+    Client for the Dados Abertos da Câmara API.
+
+    One pooled requests.Session per client (keep-alive, no TLS handshake per
+    call). Paginated endpoints follow the API `links`: once the first page
+    reveals the `last` page, the remaining ones are fetched concurrently.
+
+    Conditional requests: ETag / Last-Modified of each URL are remembered
+    together with the last body, so a 304 reuses the body without a download.
+
+    Resilience, per request: connection errors, timeouts, 429 and 5xx are
+    retried with exponential backoff (full jitter, Retry-After honored); a
+    request slower than `hedge_quantile` of recent latencies gets a second,
+    hedged copy and the first answer wins; a CircuitBreaker stops calling
+    the API after repeated failures (CircuitOpen is raised instead).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = 30,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        hedge_quantile: float | None = DEFAULT_HEDGE_QUANTILE,
+        hedge_min_samples: int = 20,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_quantile = hedge_quantile or None
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+
+        self._latencies: deque = deque(maxlen=256)
+        self._counts: Counter = Counter()
+        self._counts_lock = threading.Lock()
+        # primary + hedge run here only once hedging is active; threads are created lazily
+        self._hedge_pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix="camara-hedge")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, self.max_workers * 2))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+        # url -> (etag, last_modified, payload)
+        self._validators: dict[str, tuple[str | None, str | None, dict]] = {}
+        self._validators_lock = threading.Lock()
+
+    def _url(self, path: str) -> str:
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _get(self, path: str, params: dict | None = None, conditional: bool = False) -> tuple[dict, bool]:
+        """Return (payload, modified). `modified` is False only for a 304."""
+        url = self._url(path)
+        key = requests.Request("GET", url, params=params).prepare().url
+
+        headers = {}
+        cached = None
+        if conditional:
+            with self._validators_lock:
+                cached = self._validators.get(key)
+            if cached is not None:
+                etag, last_modified, _ = cached
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+        r = self._request(url, params, headers or None)
+        if r.status_code == 304 and cached is not None:
+            return cached[2], False
+        r.raise_for_status()
+        payload = r.json()
+
+        # only conditional callers read validators back: other payloads (ingestion)
+        # are not kept, or the client would hold a copy of everything fetched
+        etag = r.headers.get("ETag") if conditional else None
+        last_modified = r.headers.get("Last-Modified") if conditional else None
+        if etag or last_modified:
+            with self._validators_lock:
+                self._validators[key] = (etag, last_modified, payload)
+        return payload, True
+
+    def _count(self, key: str, n: int = 1):
+        with self._counts_lock:
+            self._counts[key] += n
+
+    def _send(self, url: str, params: dict | None, headers: dict | None, stream: bool = False) -> requests.Response:
+        self._count("attempts")
+        t0 = time.perf_counter()
+        r = self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=stream)
+        if r.status_code not in RETRY_STATUS:
+            self._latencies.append(time.perf_counter() - t0)
+        return r
+
+    def hedge_delay(self) -> float | None:
+        """Seconds after which a request is hedged (None: not enough samples yet, or disabled)."""
+        if not self.hedge_quantile or len(self._latencies) < self.hedge_min_samples:
+            return None
+        samples = sorted(self._latencies)
+        return samples[min(len(samples) - 1, int(self.hedge_quantile * len(samples)))]
+
+    def _send_hedged(self, url: str, params: dict | None, headers: dict | None) -> requests.Response:
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._send(url, params, headers)
+
+        first = self._hedge_pool.submit(self._send, url, params, headers)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = self._hedge_pool.submit(self._send, url, params, headers)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    r = fut.result()
+                except requests.RequestException as e:
+                    error = e
+                    continue
+                if fut is second:
+                    self._count("hedge_wins")
+                # the slower copy gives its pooled connection back as soon as it lands
+                for loser in ({first, second} - {fut}):
+                    loser.add_done_callback(_close_response)
+                return r
+        raise error
+
+    def _retry_wait(self, attempt: int, r: requests.Response | None) -> float:
+        if r is not None and r.headers.get("Retry-After", "").isdigit():
+            return min(self.max_backoff, float(r.headers["Retry-After"]))
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def _request(self, url: str, params: dict | None, headers: dict | None, stream: bool = False) -> requests.Response:
+        """GET with retries, hedging and the circuit breaker. Non-retryable statuses (404...) are returned as is."""
+        self._count("requests")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpen(f"API suspensa pelo circuit breaker após {self.breaker.failures} falhas seguidas")
+
+        try:
+            for attempt in range(self.retries + 1):
+                r = None
+                try:
+                    # streamed bodies are consumed by the caller: no hedged duplicate
+                    r = self._send(url, params, headers, stream=True) if stream else self._send_hedged(url, params, headers)
+                    if r.status_code not in RETRY_STATUS:
+                        self.breaker.success()
+                        return r
+                    r.close()
+                    error: Exception = requests.HTTPError(f"{r.status_code} para {r.url}", response=r)
+                except requests.RequestException as e:
+                    error = e
+                if attempt < self.retries:
+                    self._count("retries")
+                    time.sleep(self._retry_wait(attempt, r))
+        except BaseException:
+            # every exit settles the breaker, or a half-open probe would never end
+            self._count("failures")
+            self.breaker.failure()
+            raise
+
+        self._count("failures")
+        self.breaker.failure()
+        raise error
+
+    def metrics(self) -> dict:
+        with self._counts_lock:
+            out = {k: self._counts[k] for k in ("requests", "attempts", "retries", "hedges", "hedge_wins", "failures", "short_circuited")}
+        samples = sorted(self._latencies)
+        delay = self.hedge_delay()
+        out.update(
+            breaker_state=self.breaker.state,
+            breaker_opens=self.breaker.opens,
+            breaker_failures=self.breaker.failures,
+            latency_p50_ms=samples[len(samples) // 2] * 1e3 if samples else None,
+            latency_p95_ms=samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1e3 if samples else None,
+            hedge_delay_ms=delay * 1e3 if delay is not None else None,
+        )
+        return out
+
+    def open_stream(self, path: str, params: dict | None = None) -> requests.Response:
+        """
+        GET with retries and the circuit breaker whose body is not read yet:
+        iterate r.iter_content() and close the response when done.
+        """
+        r = self._request(self._url(path), params, None, stream=True)
+        try:
+            r.raise_for_status()
+        except requests.HTTPError:
+            r.close()
+            raise
+        return r
+
+    def get_json(self, path: str, params: dict | None = None) -> dict:
+        return self._get(path, params)[0]
+
+    def get_paginated(self, path: str, params: dict | None = None, conditional: bool = False) -> list[dict]:
+        """
+        Fetch every page of `path`. With conditional=True, raise NotModified
+        when all pages came back 304.
+        """
+        base_params = dict(params or {})
+        base_params.setdefault("itens", self.page_size)
+
+        first, modified = self._get(path, {**base_params, "pagina": 1}, conditional)
+        pages = [first.get("dados", [])]
+
+        last = _page_number(_link(first, "last"))
+        if last and last > 1:
+            numbers = range(2, last + 1)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(numbers))) as pool:
+                results = pool.map(lambda n: self._get(path, {**base_params, "pagina": n}, conditional), numbers)
+                for payload, page_modified in results:
+                    pages.append(payload.get("dados", []))
+                    modified = modified or page_modified
+        else:
+            # No `last` link: walk `next` sequentially
+            href = _link(first, "next")
+            while href:
+                payload, page_modified = self._get(href, conditional=conditional)
+                pages.append(payload.get("dados", []))
+                modified = modified or page_modified
+                href = _link(payload, "next")
+
+        if conditional and not modified:
+            raise NotModified(path)
+        return [item for page in pages for item in page]
+
+    def fetch_deputados(self, conditional: bool = False, **params) -> list[Deputado]:
+        query = {"ordem": "ASC", "ordenarPor": "nome", **params}
+        return self.get_paginated("deputados", query, conditional=conditional)
+
+
+_clients: dict[str, CamaraClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: str, **kwargs) -> CamaraClient:
+    """Process-wide client per base URL (shares the connection pool)."""
+    with _clients_lock:
+        client = _clients.get(base_url)
+        if client is None:
+            client = CamaraClient(base_url, **kwargs)
+            _clients[base_url] = client
+        return client
@@ -0,0 +1,288 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+# "shared": one dataset copy per server process (default); "session": one per
+# browser session, the pre-SharedCache behavior, kept to compare in load tests
+CACHE_SCOPE = os.environ.get("DEPUTADOS_CACHE_SCOPE", "shared").strip().lower()
+
+
+class SharedCache:
+    """
+    Process-wide cache for a single dataset.
+
+    - TTL is checked per call (each session may use its own TTL)
+    - stale-while-revalidate: an expired value keeps being served while one
+      background refresh runs
+    - single-flight: concurrent callers share the same in-flight fetch
+
+    The loader receives the current value (or None) and may return that same
+    object to signal "unchanged": only the timestamp is renewed and `version`
+    stays the same, so anything derived from it stays valid.
+    """
+
+    def __init__(self, loader, origin: str = "api"):
+        self._loader = loader
+        # label reported for values that were just loaded by this call
+        self._origin = origin
+        # label reported for values served from memory
+        self._served_as = "cache"
+        self._lock = threading.Lock()
+        self._value = None
+        self._ts = 0.0
+        self._error = None
+        self._inflight: Future | None = None
+        self._generation = 0
+        self._version = 0
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def version(self) -> int:
+        """Incremented every time the cached value is replaced."""
+        return self._version
+
+    @property
+    def timestamp(self) -> float:
+        return self._ts
+
+    @property
+    def last_error(self) -> str | None:
+        return self._error
+
+    @property
+    def refreshing(self) -> bool:
+        return self._inflight is not None
+
+    def seed(self, value, ts: float, served_as: str = "cache"):
+        """Preload a value (e.g. from a disk snapshot) without calling the loader."""
+        with self._lock:
+            if self._value is None:
+                self._value = value
+                self._ts = ts
+                self._served_as = served_as
+                self._version += 1
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+            self._ts = 0.0
+            self._error = None
+            self._version += 1
+            # an in-flight fetch started before clear() must not repopulate
+            self._generation += 1
+
+    def refresh(self) -> Future:
+        """Start a refresh (or join the one already running) and return its future."""
+        with self._lock:
+            if self._inflight is not None:
+                return self._inflight
+            fut: Future = Future()
+            self._inflight = fut
+            generation = self._generation
+            previous = self._value
+
+        threading.Thread(target=self._run, args=(fut, generation, previous), daemon=True, name="shared-cache-refresh").start()
+        return fut
+
+    def _run(self, fut: Future, generation: int, previous):
+        try:
+            value = self._loader(previous)
+        except Exception as e:
+            with self._lock:
+                if generation == self._generation:
+                    self._error = str(e)
+                self._inflight = None
+            fut.set_exception(e)
+            return
+
+        with self._lock:
+            if generation == self._generation:
+                if value is not self._value:
+                    self._value = value
+                    self._version += 1
+                    self._served_as = "cache"
+                self._ts = time.time()
+                self._error = None
+            self._inflight = None
+        fut.set_result(value)
+
+    def _version_of(self, value) -> int:
+        with self._lock:
+            return self._version if value is self._value else -1
+
+    def get_versioned(self, ttl_seconds: int, force_refresh: bool = False):
+        """
+        Like get(), plus the version of the returned value (-1 if it is no
+        longer the cached one, e.g. after clear()). Use the version as a
+        cache key for anything derived from the value.
+        """
+        with self._lock:
+            value, ts, version = self._value, self._ts, self._version
+
+        if value is None or force_refresh:
+            try:
+                fresh = self.refresh().result()
+                return fresh, self._origin, self._version_of(fresh)
+            except Exception:
+                if value is not None:
+                    return value, "cache_stale", version
+                return None, "error", -1
+
+        if (time.time() - ts) > ttl_seconds:
+            self.refresh()
+            return value, ("cache_stale" if self._error else self._served_as), version
+
+        return value, self._served_as, version
+
+    def get(self, ttl_seconds: int, force_refresh: bool = False):
+        """
+        Return (value, source) where source is one of:
+        the loader origin (default "api"), "cache", "cache_stale", "error",
+        or the label given to seed() while the seeded value is served.
+        """
+        value, source, _ = self.get_versioned(ttl_seconds, force_refresh)
+        return value, source
+
+
+class RefreshScheduler:
+    """
+    One background thread per process that refreshes a SharedCache before
+    its TTL expires, so no page load waits for the API.
+
+    - runs at `lead` x TTL after each success, +/- `jitter` (spreads load
+      across server processes started together)
+    - on failure retries with exponential backoff (full jitter), capped at
+      `max_backoff`; the cached value keeps being served meanwhile
+    - the TTL is the smallest one requested by a session in the last
+      `ttl_window` seconds (each session picks its own in the sidebar)
+    """
+
+    def __init__(
+        self,
+        cache: SharedCache,
+        ttl_seconds: float = 3600,
+        lead: float = 0.8,
+        jitter: float = 0.1,
+        backoff: float = 15.0,
+        max_backoff: float = 1800.0,
+        ttl_window: float = 3600.0,
+    ):
+        self.cache = cache
+        self.default_ttl = ttl_seconds
+        self.lead = lead
+        self.jitter = jitter
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.ttl_window = ttl_window
+        self._ttls: dict[float, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        # trigger() during a refresh: run again right after it instead of at its reschedule
+        self._triggered = False
+        self._thread: threading.Thread | None = None
+        # read and written by the scheduler thread and by sessions: only under _lock
+        self._status = {
+            "running": False,
+            "runs": 0,
+            "failures": 0,
+            "last_attempt": None,
+            "last_success": None,
+            "last_error": None,
+            "last_seconds": None,
+            "next_run": None,
+        }
+
+    @property
+    def status(self) -> dict:
+        """Snapshot of the scheduler state, safe to read from any session."""
+        with self._lock:
+            return dict(self._status)
+
+    @property
+    def ttl(self) -> float:
+        now = time.time()
+        with self._lock:
+            self._ttls = {t: seen for t, seen in self._ttls.items() if now - seen < self.ttl_window}
+            return min(self._ttls, default=self.default_ttl)
+
+    def _after_success(self, ts: float) -> float:
+        return ts + self.ttl * self.lead * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def request_ttl(self, ttl_seconds: float):
+        """Register a session's TTL; a shorter one pulls the next run earlier."""
+        with self._lock:
+            self._ttls[float(ttl_seconds)] = time.time()
+        due = self.cache.timestamp + self.ttl * self.lead
+        with self._lock:
+            # check and set together, or a failure backoff set meanwhile would be overwritten
+            next_run = self._status["next_run"]
+            if next_run is None or due >= next_run or self._status["failures"]:
+                return
+            self._status["next_run"] = due
+        self._wake.set()
+
+    def trigger(self):
+        """Enqueue an immediate refresh and return without waiting for it."""
+        with self._lock:
+            self._status["next_run"] = time.time()
+            if self._status["running"]:
+                self._triggered = True
+        self._wake.set()
+
+    def start(self) -> "RefreshScheduler":
+        if self._thread is None:
+            ts = self.cache.timestamp
+            # nothing cached (or a seeded snapshot): refresh right away
+            next_run = self._after_success(ts) if ts and self.cache.value is not None else time.time()
+            with self._lock:
+                self._status["next_run"] = next_run
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="refresh-scheduler")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stopping:
+            with self._lock:
+                delay = self._status["next_run"] - time.time()
+            if delay > 0:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue
+            self._refresh_once()
+
+    def _refresh_once(self):
+        t0 = time.time()
+        with self._lock:
+            self._status.update(running=True, last_attempt=t0)
+            # triggers made before this point are served by this run
+            self._triggered = False
+        error = None
+        try:
+            self.cache.refresh().result()
+        except Exception as e:
+            error = e
+        now = time.time()
+        next_run = self._after_success(now) if error is None else None
+        with self._lock:
+            if error is None:
+                self._status.update(failures=0, last_success=now, last_error=None)
+            else:
+                failures = self._status["failures"] + 1
+                next_run = now + min(self.max_backoff, self.backoff * 2 ** (failures - 1)) * random.uniform(0.5, 1.0)
+                self._status.update(failures=failures, last_error=str(error))
+            if self._triggered:
+                # "Atualizar" clicked while this run was in flight
+                next_run, self._triggered = now, False
+            self._status.update(next_run=next_run, running=False, runs=self._status["runs"] + 1, last_seconds=now - t0)
@@ -1,31 +1,293 @@
-import matplotlib.pyplot as plt
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
 import pandas as pd
+from matplotlib.figure import Figure
+
+# Figures are created with matplotlib.figure.Figure (not pyplot), so they are
+# never registered in pyplot's global figure manager and cannot leak.
+
+BG = "#0B0F14"
+NEON = (57 / 255, 1.0, 182 / 255)
+BLUE = (79 / 255, 142 / 255, 247 / 255)
+
+
+def _style_dark_axes(ax):
+    fg = "#E6EDF3"
+    muted = "#B6C2CF"
+    panel = "#0E141B"
+    grid = (1, 1, 1, 0.12)
+
+    ax.set_facecolor(panel)
+    ax.tick_params(colors=muted, labelsize=10)
+    for spine in ax.spines.values():
+        spine.set_color((1, 1, 1, 0.16))
+
+    ax.xaxis.label.set_color(muted)
+    ax.yaxis.label.set_color(muted)
+    ax.title.set_color(fg)
+
+    ax.grid(True, axis="x", color=grid, linewidth=1)
+    ax.set_axisbelow(True)
+
 
-def chart_partidos_bar(df: pd.DataFrame):
-    counts = df["siglaPartido"].value_counts().head(20)
-    fig, ax = plt.subplots()
-    counts.sort_values().plot(kind="barh", ax=ax)
-    ax.set_xlabel("Quantidade de deputados")
-    ax.set_ylabel("Partido")
-    ax.set_title("Top 20 partidos")
+def _barh(counts: pd.Series, title: str, rgb: tuple) -> Figure:
+    fig = Figure(figsize=(8.2, 5.2))
+    ax = fig.subplots()
+    fig.patch.set_facecolor(BG)
+    _style_dark_axes(ax)
+
+    labels = [str(i) for i in counts.index]
+    ax.barh(labels, counts.values, color=(*rgb, 0.24), edgecolor=(*rgb, 0.92), linewidth=1.6)
+
+    ax.set_xlabel("Quantidade")
+    ax.set_ylabel("")
+    ax.set_title(title)
+
+    maxv = counts.max() if len(counts) else 0
+    for i, v in enumerate(counts.values):
+        ax.text(v + maxv * 0.01, i, str(int(v)), va="center", color="#E6EDF3", fontsize=9)
+
+    ax.set_xlim(0, maxv * 1.10 if maxv else 1)
     fig.tight_layout()
     return fig
 
-def chart_estados_bar(df: pd.DataFrame):
-    counts = df["siglaUf"].value_counts()
-    fig, ax = plt.subplots()
-    counts.sort_values().plot(kind="barh", ax=ax)
-    ax.set_xlabel("Quantidade de deputados")
-    ax.set_ylabel("UF")
-    ax.set_title("Deputados por UF")
+
+def chart_partidos_bar(counts: pd.Series) -> Figure:
+    counts = counts.sort_values(ascending=False, kind="stable").head(20).sort_values()
+    return _barh(counts, "Deputados por partido (Top 20)", NEON)
+
+
+def chart_estados_bar(counts: pd.Series) -> Figure:
+    return _barh(counts.sort_values(), "Deputados por UF", BLUE)
+
+
+def _legend_dark(ax):
+    leg = ax.legend(loc="upper left", bbox_to_anchor=(1.01, 1.0), frameon=False, fontsize=9)
+    for text in leg.get_texts():
+        text.set_color("#E6EDF3")
+
+
+def chart_coesao_bar(rice: pd.Series) -> Figure:
+    # Rice index (0-1) per party, shown as 0-100
+    scores = (rice.dropna() * 100).round().sort_values()
+    return _barh(scores, "Coesão partidária (índice de Rice x 100)", NEON)
+
+
+def chart_mapa_votos(points: pd.DataFrame, top: int = 8) -> Figure:
+    # points: x, y, siglaPartido (one row per deputy); largest parties get their own color
+    fig = Figure(figsize=(8.2, 6.0))
+    ax = fig.subplots()
+    fig.patch.set_facecolor(BG)
+    _style_dark_axes(ax)
+
+    party = points["siglaPartido"].astype(str)
+    main = party.value_counts().head(top).index
+    rest = ~party.isin(main)
+    if rest.any():
+        ax.scatter(points.loc[rest, "x"], points.loc[rest, "y"], s=14, color=(1, 1, 1, 0.25), label="Outros")
+    for sigla in main:
+        sel = party == sigla
+        ax.scatter(points.loc[sel, "x"], points.loc[sel, "y"], s=16, alpha=0.85, label=sigla)
+
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.grid(False)
+    ax.set_title("Mapa de votações (componentes principais)")
+    _legend_dark(ax)
     fig.tight_layout()
     return fig
 
-def chart_top5_pizza(df: pd.DataFrame):
-    counts = df["siglaPartido"].value_counts().head(5)
-    fig, ax = plt.subplots()
-    ax.pie(counts.values, labels=counts.index, autopct="%1.1f%%", startangle=90)
+
+def chart_top5_pizza(counts: pd.Series) -> Figure:
+    counts = counts.sort_values(ascending=False, kind="stable").head(5)
+    fig = Figure()
+    ax = fig.subplots()
+    ax.pie(counts.values, labels=[str(i) for i in counts.index], autopct="%1.1f%%", startangle=90)
     ax.set_title("Top 5 partidos (share)")
     fig.tight_layout()
     return fig
 
+
+def chart_evolucao_partidos(table: pd.DataFrame) -> Figure:
+    # table: one row per legislature (index = label), one column per party
+    fig = Figure(figsize=(9.6, 5.2))
+    ax = fig.subplots()
+    fig.patch.set_facecolor(BG)
+    _style_dark_axes(ax)
+
+    x = range(len(table.index))
+    for party in table.columns:
+        ax.plot(x, table[party].values, marker="o", markersize=3.5, linewidth=1.6, label=str(party))
+
+    ax.set_xticks(list(x), [str(i) for i in table.index], rotation=45, ha="right")
+    ax.set_ylabel("Deputados")
+    ax.set_title("Deputados por partido em cada legislatura")
+    ax.grid(True, axis="y", color=(1, 1, 1, 0.12), linewidth=1)
+    _legend_dark(ax)
+    fig.tight_layout()
+    return fig
+
+
+def chart_composicao_uf(table: pd.DataFrame) -> Figure:
+    # Stacked share (%) of each party in one UF, per legislature
+    fig = Figure(figsize=(9.6, 5.2))
+    ax = fig.subplots()
+    fig.patch.set_facecolor(BG)
+    _style_dark_axes(ax)
+
+    totals = table.sum(axis=1).replace(0, 1)
+    shares = table.div(totals, axis=0) * 100
+    x = range(len(shares.index))
+    bottom = pd.Series(0.0, index=shares.index)
+    for party in shares.columns:
+        ax.bar(x, shares[party].values, bottom=bottom.values, label=str(party), width=0.8)
+        bottom += shares[party]
+
+    ax.set_xticks(list(x), [str(i) for i in shares.index], rotation=45, ha="right")
+    ax.set_ylim(0, 100)
+    ax.set_ylabel("% dos deputados da UF")
+    ax.set_title("Composição partidária por legislatura")
+    _legend_dark(ax)
+    fig.tight_layout()
+    return fig
+
+
+def _brl_short(v: float) -> str:
+    # 1234567 -> "R$ 1,2 mi"
+    for div, suffix in ((1e9, " bi"), (1e6, " mi"), (1e3, " mil")):
+        if abs(v) >= div:
+            return f"R$ {v / div:.1f}{suffix}".replace(".", ",")
+    return f"R$ {v:.0f}"
+
+
+def chart_despesas_categorias(valores: pd.Series) -> Figure:
+    # Net amount (R$) per expense category, largest on top
+    valores = valores.sort_values(ascending=False, kind="stable").head(12).sort_values()
+    fig = Figure(figsize=(8.2, 5.2))
+    ax = fig.subplots()
+    fig.patch.set_facecolor(BG)
+    _style_dark_axes(ax)
+
+    labels = [str(i) if len(str(i)) <= 38 else str(i)[:37] + "…" for i in valores.index]
+    ax.barh(labels, valores.values, color=(*BLUE, 0.24), edgecolor=(*BLUE, 0.92), linewidth=1.6)
+    maxv = valores.max() if len(valores) else 0
+    for i, v in enumerate(valores.values):
+        ax.text(v + maxv * 0.01, i, _brl_short(v), va="center", color="#E6EDF3", fontsize=9)
+
+    ax.set_xlim(0, maxv * 1.18 if maxv else 1)
+    ax.set_xticks([])
+    ax.tick_params(axis="y", labelsize=8)
+    ax.set_title("Despesas por categoria")
+    fig.tight_layout()
+    return fig
+
+
+def chart_despesas_mes(valores: pd.Series) -> Figure:
+    # Net amount (R$) per month (index = "MM/AAAA" labels, in order)
+    fig = Figure(figsize=(9.6, 4.4))
+    ax = fig.subplots()
+    fig.patch.set_facecolor(BG)
+    _style_dark_axes(ax)
+
+    x = list(range(len(valores)))
+    ax.plot(x, valores.values / 1e6, color=NEON, linewidth=1.8, marker="o", markersize=3)
+    ax.fill_between(x, valores.values / 1e6, color=(*NEON, 0.10))
+
+    step = max(1, len(x) // 16)
+    ax.set_xticks(x[::step], [str(i) for i in valores.index[::step]], rotation=45, ha="right")
+    ax.set_ylim(bottom=0)
+    ax.set_ylabel("R$ milhões")
+    ax.set_title("Despesas por mês")
+    ax.grid(True, axis="y", color=(1, 1, 1, 0.12), linewidth=1)
+    fig.tight_layout()
+    return fig
+
+
+CHARTS = {
+    "partidos_bar": chart_partidos_bar,
+    "estados_bar": chart_estados_bar,
+    "top5_pizza": chart_top5_pizza,
+    "coesao_bar": chart_coesao_bar,
+    "mapa_votos": chart_mapa_votos,
+    "evolucao_partidos": chart_evolucao_partidos,
+    "composicao_uf": chart_composicao_uf,
+    "despesas_categorias": chart_despesas_categorias,
+    "despesas_mes": chart_despesas_mes,
+}
+
+
+def figure_bytes(fig: Figure, fmt: str = "png", dpi: int = 160) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, facecolor=fig.get_facecolor())
+    return buf.getvalue()
+
+
+def chart_key(kind: str, counts: pd.Series | pd.DataFrame, fmt: str, dpi: int) -> str:
+    h = hashlib.sha1()
+    h.update(f"{kind}|{fmt}|{dpi}|".encode())
+    h.update("\x1f".join(str(i) for i in counts.index).encode())
+    h.update(b"|")
+    if isinstance(counts, pd.DataFrame):
+        h.update("\x1f".join(str(c) for c in counts.columns).encode())
+        h.update(b"|")
+        h.update(pd.util.hash_pandas_object(counts, index=False).to_numpy().tobytes())
+    else:
+        h.update(pd.util.hash_array(counts.to_numpy()).tobytes())
+    return h.hexdigest()
+
+
+class ChartCache:
+    """Rendered chart bytes, LRU-evicted by total size. Thread-safe, process-wide."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes and len(self._items) > 1:
+                _, old = self._items.popitem(last=False)
+                self._size -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._items), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+CHART_CACHE = ChartCache()
+
+
+def render_chart(kind: str, counts: pd.Series | pd.DataFrame, fmt: str = "png", dpi: int = 160, cache: ChartCache = CHART_CACHE) -> bytes:
+    """Rendered chart for `counts`; identical inputs skip Matplotlib entirely."""
+    key = chart_key(kind, counts, fmt, dpi)
+    data = cache.get(key)
+    if data is None:
+        data = figure_bytes(CHARTS[kind](counts), fmt=fmt, dpi=dpi)
+        cache.put(key, data)
+    return data
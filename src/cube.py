@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.diff import DatasetDiff
+
+PARTY_COL = "siglaPartido"
+UF_COL = "siglaUf"
+
+
+def _labels_and_codes(s: pd.Series) -> tuple[list[str], np.ndarray]:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return [str(c) for c in s.cat.categories], s.cat.codes.to_numpy()
+    codes, uniques = pd.factorize(s.astype(str), sort=True)
+    return [str(u) for u in uniques], codes
+
+
+def _ranked(labels: list[str], values: np.ndarray) -> pd.Series:
+    # Like value_counts(): descending by count (ties alphabetical), no zero rows
+    s = pd.Series(values, index=pd.Index(labels), dtype="int64")
+    s = s[s > 0].sort_index()
+    return s.sort_values(ascending=False, kind="stable")
+
+
+class CountCube:
+    """
+    Party x UF deputy counts for one dataset version.
+
+    KPIs, rankings, top-N and chart series for any sidebar selection are
+    obtained by slicing and summing this small array instead of rescanning rows.
+    """
+
+    def __init__(self, parties: list[str], ufs: list[str], counts: np.ndarray):
+        self.parties = list(parties)
+        self.ufs = list(ufs)
+        self.counts = counts
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CountCube":
+        parties, p_codes = _labels_and_codes(df[PARTY_COL])
+        ufs, u_codes = _labels_and_codes(df[UF_COL])
+        valid = (p_codes >= 0) & (u_codes >= 0)
+        flat = p_codes[valid].astype(np.int64) * len(ufs) + u_codes[valid]
+        counts = np.bincount(flat, minlength=len(parties) * len(ufs)).reshape(len(parties), len(ufs))
+        return cls(parties, ufs, counts.astype(np.int32))
+
+    def slice(self, partidos_sel=None, ufs_sel=None) -> "CountCube":
+        counts = self.counts
+        parties, ufs = self.parties, self.ufs
+        if partidos_sel:
+            wanted = set(partidos_sel)
+            rows = [i for i, p in enumerate(parties) if p in wanted]
+            counts, parties = counts[rows, :], [parties[i] for i in rows]
+        if ufs_sel:
+            wanted = set(ufs_sel)
+            cols = [j for j, u in enumerate(ufs) if u in wanted]
+            counts, ufs = counts[:, cols], [ufs[j] for j in cols]
+        return CountCube(parties, ufs, counts)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def by_party(self) -> pd.Series:
+        return _ranked(self.parties, self.counts.sum(axis=1))
+
+    def by_uf(self) -> pd.Series:
+        return _ranked(self.ufs, self.counts.sum(axis=0))
+
+    def series(self, column: str) -> pd.Series:
+        return self.by_party() if column == PARTY_COL else self.by_uf()
+
+    @property
+    def n_partidos(self) -> int:
+        return int((self.counts.sum(axis=1) > 0).sum())
+
+    @property
+    def n_ufs(self) -> int:
+        return int((self.counts.sum(axis=0) > 0).sum())
+
+    def top(self, k: int = 5) -> pd.Series:
+        return self.by_party().head(k)
+
+    def table(self, column: str) -> pd.DataFrame:
+        """Same shape as counts_table(): <column>, qtdDeputados."""
+        vc = self.series(column)
+        return pd.DataFrame({column: vc.index, "qtdDeputados": vc.values})
+
+    def apply_diff(self, diff: DatasetDiff) -> "CountCube":
+        """Return a patched copy: -1 for removed/old cells, +1 for added/new cells."""
+        parties, ufs = list(self.parties), list(self.ufs)
+        p_pos = {p: i for i, p in enumerate(parties)}
+        u_pos = {u: j for j, u in enumerate(ufs)}
+        deltas: list[tuple[str, str, int]] = []
+
+        def take(frame: pd.DataFrame, p_col: str, u_col: str, sign: int):
+            if frame.empty or p_col not in frame.columns or u_col not in frame.columns:
+                return
+            deltas.extend((str(p), str(u), sign) for p, u in zip(frame[p_col], frame[u_col]))
+
+        take(diff.added, PARTY_COL, UF_COL, +1)
+        take(diff.removed, PARTY_COL, UF_COL, -1)
+        take(diff.changed, f"{PARTY_COL}_antes", f"{UF_COL}_antes", -1)
+        take(diff.changed, f"{PARTY_COL}_depois", f"{UF_COL}_depois", +1)
+
+        for p, u, _ in deltas:
+            if p not in p_pos:
+                p_pos[p] = len(parties)
+                parties.append(p)
+            if u not in u_pos:
+                u_pos[u] = len(ufs)
+                ufs.append(u)
+
+        counts = np.zeros((len(parties), len(ufs)), dtype=np.int32)
+        counts[: len(self.parties), : len(self.ufs)] = self.counts
+        for p, u, sign in deltas:
+            counts[p_pos[p], u_pos[u]] += sign
+
+        # keep labels sorted, like from_frame()
+        p_order = np.argsort(parties, kind="stable")
+        u_order = np.argsort(ufs, kind="stable")
+        return CountCube(
+            [parties[i] for i in p_order],
+            [ufs[j] for j in u_order],
+            counts[np.ix_(p_order, u_order)],
+        )
+
+
+class CubeCache:
+    """
+    Cubes per dataset version. When the new version came from a known diff
+    against a cached frame, the cube is patched instead of rebuilt.
+
+    Entries hold the frame itself (bounded by max_entries) so the previous
+    version stays identifiable when the next diff arrives.
+    """
+
+    def __init__(self, max_entries: int = 2):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[pd.DataFrame, CountCube]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: int, df: pd.DataFrame, diff: DatasetDiff | None = None, diff_base=None) -> CountCube:
+        with self._lock:
+            hit = self._entries.get(version)
+            if hit is not None and hit[0] is df:
+                return hit[1]
+
+            cube = None
+            if diff is not None and diff_base is not None:
+                for base_df, base_cube in self._entries.values():
+                    if base_df is diff_base:
+                        cube = base_cube.apply_diff(diff)
+                        break
+            if cube is None:
+                cube = CountCube.from_frame(df)
+
+            self._entries[version] = (df, cube)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return cube
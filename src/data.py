@@ -1,53 +1,66 @@
-import requests
-import pandas as pd
-import streamlit as st
-
-BASE_URL = "https://dadosabertos.camara.leg.br/api/v2"
+import os
 
-@st.cache_data(show_spinner=False)
-def fetch_deputados_df(ttl_seconds: int = 3600, force_refresh: bool = False) -> pd.DataFrame:
-    # truque: quando force_refresh muda, o cache invalida
-    _ = force_refresh
+import pandas as pd
 
-    # TTL do cache (Streamlit recomenda ttl p/ chamadas de API) :contentReference[oaicite:4]{index=4}
-    # OBS: o TTL é aplicado pelo decorator via parâmetros de cache do Streamlit,
-    # então usamos st.cache_data e controlamos invalidando com force_refresh.
-    # Se quiser TTL real por tempo, dá pra colocar @st.cache_data(ttl=ttl_seconds),
-    # mas aí ttl_seconds vira parte da assinatura.
+from src.api import Deputado, get_client
+from src.index import FilterIndex
+from src.schema import CATEGORY_COLUMNS, canonicalize, schema_report
 
-    url = f"{BASE_URL}/deputados"
-    params = {"itens": 1000, "ordem": "ASC", "ordenarPor": "nome"}
+# CAMARA_API_URL aponta o app para outra API (ex.: python -m tools.mock_api)
+BASE_URL = os.environ.get("CAMARA_API_URL", "https://dadosabertos.camara.leg.br/api/v2").rstrip("/")
 
-    try:
-        r = requests.get(url, params=params, timeout=30)
-        r.raise_for_status()
-        data = r.json().get("dados", [])
-    except Exception:
-        return pd.DataFrame()
+EXPECTED_COLUMNS = ["id", "nome", "siglaPartido", "siglaUf", "uri", "uriPartido", "urlFoto"]
 
-    if not data:
-        return pd.DataFrame()
 
-    df = pd.DataFrame(data)
+def build_deputados_df(records: list[Deputado]) -> pd.DataFrame:
+    df = pd.DataFrame(records)
 
     # Normalização mínima (garante colunas esperadas)
-    expected = ["id", "nome", "siglaPartido", "siglaUf", "uri", "uriPartido", "urlFoto"]
-    for c in expected:
+    for c in EXPECTED_COLUMNS:
         if c not in df.columns:
             df[c] = None
 
-    return df
+    df["nome"] = df["nome"].astype(str)
+    df["siglaPartido"] = df["siglaPartido"].astype(str)
+    df["siglaUf"] = df["siglaUf"].astype(str)
+
+    # Esquema compacto (categorias, ids int32, URIs derivadas do id)
+    compact = canonicalize(df)
+    compact.attrs["schema_report"] = schema_report(df, compact)
+    return compact
+
 
-def apply_filters(df: pd.DataFrame, partidos_sel, ufs_sel, sort_by: str) -> pd.DataFrame:
-    out = df.copy()
+def fetch_deputados(base_url: str = BASE_URL, conditional: bool = False) -> pd.DataFrame:
+    # Caminho único de busca (App.py, src/ui.py e tools/ usam o mesmo cliente)
+    # conditional=True: levanta NotModified se a API responder 304
+    return build_deputados_df(get_client(base_url).fetch_deputados(conditional=conditional))
+
+
+def apply_filters(df: pd.DataFrame, partidos_sel, ufs_sel, sort_by: str, index: FilterIndex | None = None) -> pd.DataFrame:
+    # Com índice pré-computado (mesma versão da base): interseção de máscaras
+    # + take na ordem pré-ordenada, sem copiar a base inteira
+    if index is not None:
+        return index.filter(partidos_sel, ufs_sel, sort_by)
+
+    out = df
 
     if partidos_sel:
         out = out[out["siglaPartido"].isin(partidos_sel)]
     if ufs_sel:
         out = out[out["siglaUf"].isin(ufs_sel)]
 
+    # categorias sem linhas não devem aparecer em value_counts / gráficos
+    for c in CATEGORY_COLUMNS:
+        if c in out.columns and isinstance(out[c].dtype, pd.CategoricalDtype):
+            out = out.assign(**{c: out[c].cat.remove_unused_categories()})
+
     if sort_by in out.columns:
         out = out.sort_values(sort_by, kind="stable")
 
     return out.reset_index(drop=True)
 
+
+def counts_table(series: pd.Series, col_name: str) -> pd.DataFrame:
+    vc = series.value_counts()
+    vc = vc[vc > 0]
+    return pd.DataFrame({col_name: vc.index, "qtdDeputados": vc.values})
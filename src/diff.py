@@ -0,0 +1,88 @@
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+TRACKED_COLUMNS = ("siglaPartido", "siglaUf")
+
+
+def _empty() -> pd.DataFrame:
+    return pd.DataFrame()
+
+
+@dataclass
+class DatasetDiff:
+    """Row-level difference between two versions of the deputados table, keyed on `id`."""
+
+    added: pd.DataFrame = field(default_factory=_empty)
+    removed: pd.DataFrame = field(default_factory=_empty)
+    # one row per changed deputy: id, nome, <col>_antes, <col>_depois
+    changed: pd.DataFrame = field(default_factory=_empty)
+
+    @property
+    def empty(self) -> bool:
+        return self.added.empty and self.removed.empty and self.changed.empty
+
+    def summary(self) -> str:
+        return f"+{len(self.added)} entradas · -{len(self.removed)} saídas · {len(self.changed)} alterações"
+
+
+def diff_by_id(old: pd.DataFrame, new: pd.DataFrame, key: str = "id", tracked=TRACKED_COLUMNS) -> DatasetDiff:
+    if old.empty or key not in old.columns or key not in new.columns:
+        return DatasetDiff(added=new.copy())
+
+    old_i = old.drop_duplicates(key).set_index(key)
+    new_i = new.drop_duplicates(key).set_index(key)
+
+    added = new_i.loc[new_i.index.difference(old_i.index, sort=False)].reset_index()
+    removed = old_i.loc[old_i.index.difference(new_i.index, sort=False)].reset_index()
+
+    common = new_i.index.intersection(old_i.index, sort=False)
+    cols = [c for c in tracked if c in old_i.columns and c in new_i.columns]
+    before = old_i.loc[common, cols].astype(str)
+    after = new_i.loc[common, cols].astype(str)
+    mask = (before != after).any(axis=1)
+
+    changed = pd.DataFrame({key: common[mask.values]})
+    if "nome" in new_i.columns:
+        changed["nome"] = new_i.loc[changed[key], "nome"].astype(str).values
+    for c in cols:
+        changed[f"{c}_antes"] = before.loc[mask, c].values
+        changed[f"{c}_depois"] = after.loc[mask, c].values
+
+    return DatasetDiff(added=added, removed=removed, changed=changed)
+
+
+class DiffTracker:
+    """Keeps the last non-empty diff so every session can show what changed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._diff: DatasetDiff | None = None
+        self._ts = 0.0
+        # weak refs to the frames the diff goes from/to (for patching aggregates)
+        self._previous = None
+        self._current = None
+
+    def record(self, diff: DatasetDiff, previous: pd.DataFrame | None = None, current: pd.DataFrame | None = None):
+        if diff.empty:
+            return
+        with self._lock:
+            self._diff = diff
+            self._ts = time.time()
+            self._previous = weakref.ref(previous) if previous is not None else None
+            self._current = weakref.ref(current) if current is not None else None
+
+    def transition_to(self, df: pd.DataFrame) -> tuple[DatasetDiff | None, pd.DataFrame | None]:
+        """(diff, previous frame) if the last diff produced `df`, else (None, None)."""
+        with self._lock:
+            if self._current is None or self._current() is not df:
+                return None, None
+            previous = self._previous() if self._previous is not None else None
+            return (self._diff, previous) if previous is not None else (None, None)
+
+    def last(self) -> tuple[DatasetDiff | None, float]:
+        with self._lock:
+            return self._diff, self._ts
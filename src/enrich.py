@@ -0,0 +1,207 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.api import CamaraClient
+from src.snapshots import DATA_DIR
+
+DETAILS_PATH = DATA_DIR / "enrichment" / "deputados_detalhes.parquet"
+
+DETAIL_COLUMNS = [
+    "id",
+    "nomeCivil",
+    "sexo",
+    "dataNascimento",
+    "ufNascimento",
+    "municipioNascimento",
+    "escolaridade",
+    "gabineteNome",
+    "gabinetePredio",
+    "gabineteSala",
+    "gabineteAndar",
+    "gabineteTelefone",
+    "email",
+    "urlWebsite",
+    "redeSocial",
+]
+
+
+def flatten_detail(payload: dict) -> dict:
+    dados = payload.get("dados") or {}
+    status = dados.get("ultimoStatus") or {}
+    gabinete = status.get("gabinete") or {}
+    redes = dados.get("redeSocial") or []
+    return {
+        "id": dados.get("id"),
+        "nomeCivil": dados.get("nomeCivil"),
+        "sexo": dados.get("sexo"),
+        "dataNascimento": dados.get("dataNascimento"),
+        "ufNascimento": dados.get("ufNascimento"),
+        "municipioNascimento": dados.get("municipioNascimento"),
+        "escolaridade": dados.get("escolaridade"),
+        "gabineteNome": gabinete.get("nome"),
+        "gabinetePredio": gabinete.get("predio"),
+        "gabineteSala": gabinete.get("sala"),
+        "gabineteAndar": gabinete.get("andar"),
+        "gabineteTelefone": gabinete.get("telefone"),
+        "email": gabinete.get("email") or status.get("email"),
+        "urlWebsite": dados.get("urlWebsite"),
+        "redeSocial": " ".join(r for r in redes if r),
+    }
+
+
+class AsyncRateLimiter:
+    """Token bucket: at most `rate` acquisitions per second (bursts up to `rate`)."""
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def _fetch_details(
+    client: CamaraClient,
+    ids: list[int],
+    concurrency: int,
+    rate: float,
+    on_progress=None,
+) -> tuple[list[dict], dict[int, str]]:
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(concurrency)
+    limiter = AsyncRateLimiter(rate)
+    rows: list[dict] = []
+    errors: dict[int, str] = {}
+
+    # requests is blocking: the pooled session runs on a sized thread pool,
+    # asyncio only schedules, bounds and paces the calls (retries and
+    # backoff happen inside the client)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+
+        async def one(dep_id: int):
+            async with sem:
+                await limiter.acquire()
+                try:
+                    payload = await loop.run_in_executor(pool, client.get_json, f"deputados/{dep_id}")
+                    rows.append(flatten_detail(payload))
+                except Exception as e:
+                    errors[dep_id] = str(e)
+            if on_progress:
+                on_progress(len(rows) + len(errors))
+
+        await asyncio.gather(*(one(i) for i in ids))
+
+    return rows, errors
+
+
+def fetch_details(
+    client: CamaraClient,
+    ids: list[int],
+    concurrency: int = 32,
+    rate: float = 100.0,
+    on_progress=None,
+) -> tuple[pd.DataFrame, dict[int, str]]:
+    """Fetch /deputados/{id} for every id concurrently. Returns (details, errors)."""
+    rows, errors = asyncio.run(_fetch_details(client, ids, concurrency, rate, on_progress))
+    df = pd.DataFrame(rows, columns=DETAIL_COLUMNS)
+    return df, errors
+
+
+class DetailsStore:
+    """Per-deputy details persisted locally (Parquet), merged by id."""
+
+    def __init__(self, path: Path | str = DETAILS_PATH):
+        self.path = Path(path)
+
+    def load(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame(columns=DETAIL_COLUMNS)
+        return pd.read_parquet(self.path, memory_map=True)
+
+    def save(self, df: pd.DataFrame):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp, index=False)
+        tmp.replace(self.path)
+
+    def merge(self, new: pd.DataFrame) -> pd.DataFrame:
+        old = self.load()
+        merged = pd.concat([old, new], ignore_index=True) if not old.empty else new
+        merged = merged.drop_duplicates("id", keep="last").reset_index(drop=True)
+        self.save(merged)
+        return merged
+
+
+class Enricher:
+    """
+    Process-wide enrichment job: runs in a background thread, keeps the
+    details in memory and on disk, and exposes progress for the UI.
+    """
+
+    def __init__(self, client: CamaraClient, store: DetailsStore | None = None):
+        self.client = client
+        self.store = store or DetailsStore()
+        self._lock = threading.Lock()
+        self._details = self.store.load()
+        # bumped whenever the details are replaced: cache key for exports and search
+        self.version = 0
+        self._thread: threading.Thread | None = None
+        self.status = {"running": False, "done": 0, "total": 0, "errors": 0, "seconds": None, "last_error": None}
+
+    def details(self) -> pd.DataFrame:
+        return self._details
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, ids: list[int], only_missing: bool = True) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            if only_missing and not self._details.empty:
+                known = set(self._details["id"].dropna().astype(int))
+                ids = [i for i in ids if int(i) not in known]
+            ids = [int(i) for i in ids]
+            self.status.update(running=True, done=0, total=len(ids), errors=0, seconds=None, last_error=None)
+            self._thread = threading.Thread(target=self._run, args=(ids,), daemon=True, name="deputados-enrichment")
+            self._thread.start()
+            return True
+
+    def _run(self, ids: list[int]):
+        t0 = time.perf_counter()
+        try:
+            if ids:
+                new, errors = fetch_details(self.client, ids, on_progress=lambda n: self.status.update(done=n))
+                self.status["errors"] = len(errors)
+                if errors:
+                    self.status["last_error"] = next(iter(errors.values()))
+                if not new.empty:
+                    self._details = self.store.merge(new)
+                    self.version += 1
+        except Exception as e:
+            self.status["last_error"] = str(e)
+        finally:
+            self.status.update(running=False, seconds=time.perf_counter() - t0)
+
+
+def merge_details(df: pd.DataFrame, details: pd.DataFrame) -> pd.DataFrame:
+    if details is None or details.empty or "id" not in df.columns:
+        return df
+    extra = details[[c for c in details.columns if c == "id" or c not in df.columns]]
+    return df.merge(extra, on="id", how="left")
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.cube import PARTY_COL, UF_COL
+from src.history import SEM_PARTIDO, SEM_UF
+
+SEM_CATEGORIA = "Não informado"
+
+
+def month_label(ano: int, mes: int) -> str:
+    return f"{mes:02d}/{ano}"
+
+
+class ExpenseCube:
+    """
+    CEAP expenses of one rollup version as flat arrays:
+
+    - the store's deputy x month x category rollup (one row per cell)
+    - a party x UF x month array of sums, enough for every sidebar
+      selection that does not pick categories
+
+    Deputies take their current party / UF from `deputados`. Raw documents
+    are only read for drill-down (ExpensesStore.documents).
+    """
+
+    def __init__(self, rollup: pa.Table, deputados: pd.DataFrame):
+        ids = rollup["idDeputado"].to_numpy()
+        dep_ids = np.unique(ids)
+        info = deputados.drop_duplicates("id").set_index("id").reindex(dep_ids)
+        self.deputados = pd.DataFrame(
+            {
+                "id": dep_ids,
+                "nome": info["nome"].astype(object).where(info["nome"].notna(), [f"Deputado {i}" for i in dep_ids]).to_numpy(),
+                PARTY_COL: info[PARTY_COL].astype(object).fillna(SEM_PARTIDO).astype(str).to_numpy(),
+                UF_COL: info[UF_COL].astype(object).fillna(SEM_UF).astype(str).to_numpy(),
+            }
+        )
+        self.dep = np.searchsorted(dep_ids, ids).astype(np.int32)
+
+        # continuous month axis, so months without documents show up as zero
+        key = rollup["ano"].to_numpy().astype(np.int32) * 12 + rollup["mes"].to_numpy().astype(np.int32) - 1
+        first = int(key.min()) if len(key) else 0
+        last = int(key.max()) if len(key) else -1
+        self.months = [(k // 12, k % 12 + 1) for k in range(first, last + 1)]
+        self.month = (key - first).astype(np.int32)
+
+        cat_codes, categories = pd.factorize(rollup["tipoDespesa"].to_pandas().fillna(SEM_CATEGORIA), sort=True)
+        self.categories = [str(c) for c in categories]
+        self.cat = cat_codes.astype(np.int32)
+        self.valor = np.nan_to_num(rollup["valorLiquido"].to_numpy(zero_copy_only=False).astype(np.float64))
+        self.docs = rollup["documentos"].to_numpy().astype(np.int64)
+
+        p_codes, parties = pd.factorize(self.deputados[PARTY_COL], sort=True)
+        u_codes, ufs = pd.factorize(self.deputados[UF_COL], sort=True)
+        self.parties, self.ufs = [str(p) for p in parties], [str(u) for u in ufs]
+        self.dep_party, self.dep_uf = p_codes.astype(np.int32), u_codes.astype(np.int32)
+
+        shape = (len(self.parties), len(self.ufs), len(self.months))
+        flat = (self.dep_party[self.dep].astype(np.int64) * shape[1] + self.dep_uf[self.dep]) * shape[2] + self.month
+        size = int(np.prod(shape))
+        self.party_uf_month = np.bincount(flat, weights=self.valor, minlength=size).reshape(shape)
+        self.party_uf_month_docs = np.bincount(flat, weights=self.docs, minlength=size).reshape(shape).astype(np.int64)
+
+    @property
+    def empty(self) -> bool:
+        return not self.months
+
+    @property
+    def month_labels(self) -> list[str]:
+        return [month_label(a, m) for a, m in self.months]
+
+    def select(self, partidos_sel=None, ufs_sel=None, inicio: int = 0, fim: int | None = None, categorias=None) -> "ExpenseSlice":
+        """`inicio` / `fim`: positions in `months` (both included)."""
+        return ExpenseSlice(self, partidos_sel, ufs_sel, inicio, len(self.months) - 1 if fim is None else fim, categorias)
+
+
+def _keep(labels: list[str], wanted) -> np.ndarray:
+    if not wanted:
+        return np.ones(len(labels), dtype=bool)
+    wanted = set(wanted)
+    return np.array([lbl in wanted for lbl in labels], dtype=bool)
+
+
+class ExpenseSlice:
+    """One sidebar + tab selection over an ExpenseCube; every answer is a mask and a bincount."""
+
+    def __init__(self, cube: ExpenseCube, partidos_sel, ufs_sel, inicio: int, fim: int, categorias):
+        self.cube = cube
+        self.inicio, self.fim = inicio, fim
+        self.by_rollup_only = not categorias
+        self.party_ok = _keep(cube.parties, partidos_sel)
+        self.uf_ok = _keep(cube.ufs, ufs_sel)
+        self.dep_ok = self.party_ok[cube.dep_party] & self.uf_ok[cube.dep_uf]
+        self.cat_ok = _keep(cube.categories, categorias)
+        self._mask = None
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Rollup rows in the selection."""
+        if self._mask is None:
+            c = self.cube
+            mask = self.dep_ok[c.dep] & (c.month >= self.inicio) & (c.month <= self.fim)
+            if not self.by_rollup_only:
+                mask &= self.cat_ok[c.cat]
+            self._mask = mask
+        return self._mask
+
+    def _party_uf_month(self, docs: bool = False) -> np.ndarray:
+        arr = self.cube.party_uf_month_docs if docs else self.cube.party_uf_month
+        return arr[np.ix_(self.party_ok, self.uf_ok, np.arange(self.inicio, self.fim + 1))]
+
+    @property
+    def dep_ids(self) -> np.ndarray:
+        return self.cube.deputados["id"].to_numpy()[self.dep_ok]
+
+    @property
+    def total(self) -> float:
+        if self.by_rollup_only:
+            return float(self._party_uf_month().sum())
+        return float(self.cube.valor[self.mask].sum())
+
+    @property
+    def documentos(self) -> int:
+        if self.by_rollup_only:
+            return int(self._party_uf_month(docs=True).sum())
+        return int(self.cube.docs[self.mask].sum())
+
+    def by_month(self) -> pd.Series:
+        labels = self.cube.month_labels[self.inicio : self.fim + 1]
+        if self.by_rollup_only:
+            values = self._party_uf_month().sum(axis=(0, 1))
+        else:
+            c, m = self.cube, self.mask
+            values = np.bincount(c.month[m] - self.inicio, weights=c.valor[m], minlength=len(labels))
+        return pd.Series(values, index=pd.Index(labels, name="mes"), name="valorLiquido")
+
+    def by_party(self) -> pd.Series:
+        c = self.cube
+        if self.by_rollup_only:
+            values = np.zeros(len(c.parties))
+            values[self.party_ok] = self._party_uf_month().sum(axis=(1, 2))
+        else:
+            m = self.mask
+            values = np.bincount(c.dep_party[c.dep[m]], weights=c.valor[m], minlength=len(c.parties))
+        s = pd.Series(values, index=pd.Index(c.parties, name=PARTY_COL), name="valorLiquido")
+        return s[s > 0].sort_values(ascending=False, kind="stable")
+
+    def by_category(self) -> pd.Series:
+        c, m = self.cube, self.mask
+        values = np.bincount(c.cat[m], weights=c.valor[m], minlength=len(c.categories))
+        s = pd.Series(values, index=pd.Index(c.categories, name="tipoDespesa"), name="valorLiquido")
+        return s[s > 0].sort_values(ascending=False, kind="stable")
+
+    def by_deputy(self, top: int | None = None) -> pd.DataFrame:
+        """id, nome, siglaPartido, siglaUf, valorLiquido, documentos; biggest spenders first."""
+        c, m = self.cube, self.mask
+        n = len(c.deputados)
+        valor = np.bincount(c.dep[m], weights=c.valor[m], minlength=n)
+        docs = np.bincount(c.dep[m], weights=c.docs[m], minlength=n).astype(np.int64)
+        out = c.deputados.assign(valorLiquido=valor, documentos=docs)
+        out = out[docs > 0].sort_values("valorLiquido", ascending=False, kind="stable")
+        return (out.head(top) if top else out).reset_index(drop=True)
+
+    @property
+    def n_deputados(self) -> int:
+        c, m = self.cube, self.mask
+        return int(np.count_nonzero(np.bincount(c.dep[m], minlength=len(c.deputados))))
+
+    def period(self) -> tuple[tuple[int, int], tuple[int, int]]:
+        """(ano, mes) of the first and last month, for ExpensesStore.documents()."""
+        return self.cube.months[self.inicio], self.cube.months[self.fim]
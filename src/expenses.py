@@ -0,0 +1,486 @@
+import codecs
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.api import CamaraClient
+from src.snapshots import DATA_DIR
+
+DESPESAS_DIR = DATA_DIR / "despesas"
+
+# Columns kept per document; `ano` / `mes` live in the partition path (ano=YYYY/mes=MM)
+FILE_SCHEMA = pa.schema(
+    [
+        ("idDeputado", pa.int32()),
+        ("tipoDespesa", pa.string()),
+        ("codDocumento", pa.int64()),
+        ("tipoDocumento", pa.string()),
+        ("dataDocumento", pa.string()),
+        ("numDocumento", pa.string()),
+        ("nomeFornecedor", pa.string()),
+        ("cnpjCpfFornecedor", pa.string()),
+        ("valorDocumento", pa.float64()),
+        ("valorGlosa", pa.float64()),
+        ("valorLiquido", pa.float64()),
+        ("urlDocumento", pa.string()),
+    ]
+)
+DATASET_SCHEMA = FILE_SCHEMA.append(pa.field("ano", pa.int16())).append(pa.field("mes", pa.int8()))
+PARTITIONING = ds.partitioning(pa.schema([("ano", pa.int16()), ("mes", pa.int8())]), flavor="hive")
+
+# deputy x month x category sums: what every dashboard view reads instead of raw documents
+ROLLUP_SCHEMA = pa.schema(
+    [
+        ("idDeputado", pa.int32()),
+        ("ano", pa.int16()),
+        ("mes", pa.int8()),
+        ("tipoDespesa", pa.string()),
+        ("valorLiquido", pa.float64()),
+        ("documentos", pa.int32()),
+    ]
+)
+
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Text cursor over a JSON document arriving in byte chunks; keeps only the unread tail."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos :] + text
+                self.pos = 0
+                return True
+        self.eof = True
+        tail = self._utf8.decode(b"", final=True)
+        if tail:
+            self.buf = self.buf[self.pos :] + tail
+            self.pos = 0
+            return True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError(f"JSON inesperado: {c!r} (esperado um de {chars!r})")
+        self.pos += 1
+        return c
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+                # a number at the very end of the buffer may still be incomplete
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._more()
+
+
+def iter_array(chunks, key: str = "dados", meta: dict | None = None):
+    """
+    Yield the items of `payload[key]` from a JSON object given as byte
+    chunks, one at a time, without holding the whole document. Other
+    top-level keys (e.g. `links`) are stored in `meta`.
+    """
+    s = _JsonStream(chunks)
+    s.expect("{")
+    if s.peek() == "}":
+        return
+    while True:
+        k = s.value()
+        s.expect(":")
+        if k == key and s.peek() == "[":
+            s.expect("[")
+            if s.peek() == "]":
+                s.expect("]")
+            else:
+                while True:
+                    yield s.value()
+                    if s.expect(",]") == "]":
+                        break
+        else:
+            v = s.value()
+            if meta is not None:
+                meta[k] = v
+        if s.expect(",}") == "}":
+            return
+
+
+def _next_href(meta: dict) -> str | None:
+    for link in meta.get("links") or []:
+        if link.get("rel") == "next":
+            return link.get("href")
+    return None
+
+
+def iter_despesas(client: CamaraClient, dep_id: int, ano: int, meses: list[int] | None = None, itens: int = 100):
+    """Expense items of one deputy and year (optionally some months), streamed page by page."""
+    path = f"deputados/{int(dep_id)}/despesas"
+    params = {"ano": ano, "itens": itens, "pagina": 1, "ordem": "ASC"}
+    if meses and len(meses) < 12:
+        params["mes"] = list(meses)
+    while path:
+        meta: dict = {}
+        with closing(client.open_stream(path, params)) as r:
+            yield from iter_array(r.iter_content(chunk_size=16 * 1024), "dados", meta)
+        path, params = _next_href(meta), None
+
+
+def closed_months(ano: int, today: date | None = None) -> list[int]:
+    """Months of `ano` whose expenses can be considered final (the current month is not)."""
+    today = today or date.today()
+    if ano < today.year:
+        return list(range(1, 13))
+    if ano == today.year:
+        return list(range(1, today.month))
+    return []
+
+
+class _Buffer:
+    """Column lists per (ano, mes) partition: far lighter than one dict per row."""
+
+    def __init__(self):
+        self.parts: dict[tuple[int, int], dict[str, list]] = {}
+        self.rows = 0
+
+    def add(self, dep_id: int, item: dict):
+        key = (int(item.get("ano") or 0), int(item.get("mes") or 0))
+        cols = self.parts.get(key)
+        if cols is None:
+            cols = self.parts[key] = {name: [] for name in FILE_SCHEMA.names}
+        cols["idDeputado"].append(dep_id)
+        for name in FILE_SCHEMA.names[1:]:
+            cols[name].append(item.get(name))
+        self.rows += 1
+
+    def tables(self):
+        for key, cols in self.parts.items():
+            yield key, pa.Table.from_pydict(cols, schema=FILE_SCHEMA)
+
+    def clear(self):
+        self.parts.clear()
+        self.rows = 0
+
+
+class ExpensesStore:
+    """
+    CEAP expenses as Parquet under despesas/ano=YYYY/mes=MM/.
+
+    Writes happen in batches: a batch's part files are named after it and
+    only count once its line is appended to checkpoint.jsonl (together with
+    the (deputado, ano, meses) units it completes). Files of a batch that
+    never got its checkpoint line (interrupted run) are deleted on resume,
+    so a re-fetched unit is never stored twice.
+    """
+
+    def __init__(self, root: Path | str = DESPESAS_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.root / "checkpoint.jsonl"
+
+    def _checkpoints(self) -> list[dict]:
+        if not self.checkpoint_path.exists():
+            return []
+        out = []
+        for line in self.checkpoint_path.read_text(encoding="utf-8").splitlines():
+            try:
+                out.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # torn last line of an interrupted append
+        return out
+
+    def done_months(self) -> dict[tuple[int, int], set[int]]:
+        """(idDeputado, ano) -> months already stored."""
+        done: dict[tuple[int, int], set[int]] = defaultdict(set)
+        for cp in self._checkpoints():
+            for dep_id, ano, meses in cp.get("units", []):
+                done[(dep_id, ano)].update(meses)
+        return done
+
+    def version(self) -> int:
+        try:
+            return self.checkpoint_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return -1
+
+    def part_files(self) -> list[Path]:
+        if not self.root.exists():
+            return []
+        return sorted(self.root.glob("ano=*/mes=*/*.parquet"))
+
+    def discard_uncommitted(self) -> int:
+        committed = {cp["batch"] for cp in self._checkpoints()}
+        removed = 0
+        for path in self.part_files():
+            if path.name.split("-")[1] not in committed:
+                path.unlink(missing_ok=True)
+                removed += 1
+        for tmp in self.root.glob("ano=*/mes=*/*.tmp"):
+            tmp.unlink(missing_ok=True)
+        return removed
+
+    def commit(self, buffer: _Buffer, units: list[tuple[int, int, list[int]]]):
+        """Write every buffered partition as one file each, then the checkpoint line."""
+        batch = uuid.uuid4().hex[:12]
+        with self._lock:
+            for (ano, mes), table in buffer.tables():
+                path = self.root / f"ano={ano}" / f"mes={mes:02d}" / f"part-{batch}-{ano}{mes:02d}.parquet"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                pq.write_table(table, tmp, compression="zstd")
+                os.replace(tmp, path)
+            self.root.mkdir(parents=True, exist_ok=True)
+            line = json.dumps({"batch": batch, "ts": time.time(), "rows": buffer.rows, "units": units})
+            with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _month_of(path: Path) -> tuple[int, int]:
+        return int(path.parent.parent.name[4:]), int(path.parent.name[4:])
+
+    def dataset(self, inicio: tuple[int, int] | None = None, fim: tuple[int, int] | None = None) -> ds.Dataset | None:
+        """Documents of the (ano, mes) range, both ends included; other partitions are not opened."""
+        files = [
+            p
+            for p in self.part_files()
+            if (inicio is None or self._month_of(p) >= inicio) and (fim is None or self._month_of(p) <= fim)
+        ]
+        if not files:
+            return None
+        return ds.dataset(
+            [str(p) for p in files], schema=DATASET_SCHEMA, format="parquet", partitioning=PARTITIONING, partition_base_dir=str(self.root)
+        )
+
+    def documents(
+        self,
+        dep_ids,
+        inicio: tuple[int, int] | None = None,
+        fim: tuple[int, int] | None = None,
+        categorias=None,
+        columns: list[str] | None = None,
+    ) -> pa.Table:
+        """Raw documents of some deputies (drill-down): partition pruning + predicate pushdown."""
+        dataset = self.dataset(inicio, fim)
+        if dataset is None:
+            empty = DATASET_SCHEMA.empty_table()
+            return empty.select(columns) if columns is not None else empty
+        predicate = ds.field("idDeputado").isin(pa.array([int(i) for i in dep_ids], pa.int32()))
+        if categorias:
+            predicate &= ds.field("tipoDespesa").isin(pa.array(list(categorias), pa.string()))
+        return dataset.to_table(columns=columns, filter=predicate)
+
+    @property
+    def rollup_path(self) -> Path:
+        return self.root / "rollup_deputado_mes_categoria.parquet"
+
+    def rollup(self) -> pa.Table:
+        """
+        Deputy x month x category sums for the committed data, rebuilt when
+        the checkpoint moved. Built one month partition at a time, reading
+        three columns, so it stays cheap and flat in memory.
+        """
+        version = self.version()
+        if self.rollup_path.exists():
+            table = pq.read_table(self.rollup_path)
+            if (table.schema.metadata or {}).get(b"version") == str(version).encode():
+                return table
+        with self._lock:
+            by_month = defaultdict(list)
+            for path in self.part_files():
+                by_month[self._month_of(path)].append(str(path))
+            parts = []
+            for (ano, mes), files in sorted(by_month.items()):
+                t = pq.read_table(files, columns=["idDeputado", "tipoDespesa", "valorLiquido"], schema=FILE_SCHEMA)
+                g = t.group_by(["idDeputado", "tipoDespesa"]).aggregate([("valorLiquido", "sum"), ("valorLiquido", "count")])
+                n = g.num_rows
+                parts.append(
+                    pa.table(
+                        {
+                            "idDeputado": g["idDeputado"],
+                            "ano": pa.array([ano] * n, pa.int16()),
+                            "mes": pa.array([mes] * n, pa.int8()),
+                            "tipoDespesa": g["tipoDespesa"],
+                            "valorLiquido": g["valorLiquido_sum"],
+                            "documentos": g["valorLiquido_count"].cast(pa.int32()),
+                        },
+                        schema=ROLLUP_SCHEMA,
+                    )
+                )
+            table = pa.concat_tables(parts) if parts else ROLLUP_SCHEMA.empty_table()
+            table = table.replace_schema_metadata({"version": str(version)})
+            if parts:
+                tmp = self.rollup_path.with_suffix(".tmp")
+                pq.write_table(table, tmp)
+                os.replace(tmp, self.rollup_path)
+        return table
+
+    def summary(self) -> dict:
+        """Rows / files / bytes / months on disk, without opening any data file."""
+        files = self.part_files()
+        rows = sum(cp.get("rows", 0) for cp in self._checkpoints())
+        months = sorted({self._month_of(p) for p in files})
+        return {"rows": rows, "files": len(files), "bytes": sum(p.stat().st_size for p in files), "months": months}
+
+
+class ExpensesIngestor:
+    """
+    Background job: streams /deputados/{id}/despesas for every (deputy,
+    year) still missing, a few units concurrently, and commits to the
+    ExpensesStore every `buffer_rows` rows. Memory is bounded by the buffer
+    plus the units in flight, however many years are loaded.
+    """
+
+    def __init__(self, client: CamaraClient, store: ExpensesStore | None = None, buffer_rows: int = 50_000):
+        self.client = client
+        self.store = store or ExpensesStore()
+        self.buffer_rows = buffer_rows
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.status = {
+            "running": False,
+            "done": 0,
+            "total": 0,
+            "skipped": 0,
+            "rows": 0,
+            "batches": 0,
+            "errors": 0,
+            "seconds": None,
+            "last_error": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, ids: list[int], anos: list[int]) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self.status.update(running=True, done=0, total=0, skipped=0, rows=0, batches=0, errors=0, seconds=None, last_error=None)
+            args = ([int(i) for i in ids], sorted(int(a) for a in anos))
+            self._thread = threading.Thread(target=self._run, args=args, daemon=True, name="despesas-ingest")
+            self._thread.start()
+            return True
+
+    def stop(self):
+        """Stop after the units in flight; everything fetched so far is committed."""
+        self._stop.set()
+
+    def _units(self, ids: list[int], anos: list[int]) -> list[tuple[int, int, list[int]]]:
+        done = self.store.done_months()
+        units, skipped = [], 0
+        for ano in anos:
+            wanted = closed_months(ano)
+            for dep_id in ids:
+                missing = [m for m in wanted if m not in done.get((dep_id, ano), ())]
+                if missing:
+                    units.append((dep_id, ano, missing))
+                elif wanted:
+                    skipped += 1
+        self.status["skipped"] = skipped
+        return units
+
+    def _fetch_unit(self, unit: tuple[int, int, list[int]]) -> _Buffer:
+        dep_id, ano, meses = unit
+        part = _Buffer()
+        wanted = set(meses)
+        for item in iter_despesas(self.client, dep_id, ano, meses):
+            if int(item.get("mes") or 0) in wanted:
+                part.add(dep_id, item)
+        return part
+
+    def _run(self, ids: list[int], anos: list[int]):
+        t0 = time.perf_counter()
+        buffer, pending_units = _Buffer(), []
+
+        def commit():
+            if pending_units:
+                self.store.commit(buffer, list(pending_units))
+                self.status["batches"] += 1
+            buffer.clear()
+            pending_units.clear()
+
+        try:
+            self.store.discard_uncommitted()
+            units = self._units(ids, anos)
+            self.status["total"] = len(units)
+            todo = iter(units)
+            workers = self.client.max_workers
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # bounded submission: at most 2 x workers units (and their rows) in flight
+                inflight = {}
+                while True:
+                    while len(inflight) < 2 * workers and not self._stop.is_set():
+                        unit = next(todo, None)
+                        if unit is None:
+                            break
+                        inflight[pool.submit(self._fetch_unit, unit)] = unit
+                    if not inflight:
+                        break
+                    finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        unit = inflight.pop(fut)
+                        self.status["done"] += 1
+                        try:
+                            part = fut.result()
+                        except Exception as e:
+                            self.status["errors"] += 1
+                            self.status["last_error"] = f"deputado {unit[0]}, {unit[1]}: {e}"
+                            continue
+                        for key, cols in part.parts.items():
+                            target = buffer.parts.setdefault(key, {name: [] for name in FILE_SCHEMA.names})
+                            for name, values in cols.items():
+                                target[name].extend(values)
+                        buffer.rows += part.rows
+                        self.status["rows"] += part.rows
+                        pending_units.append(list(unit[:2]) + [unit[2]])
+                    if buffer.rows >= self.buffer_rows:
+                        commit()
+            commit()
+            # ready before the dashboard asks for it
+            self.store.rollup()
+        except Exception as e:
+            self.status["last_error"] = str(e)
+        finally:
+            self.status.update(running=False, seconds=time.perf_counter() - t0)
@@ -0,0 +1,104 @@
+import gzip
+import importlib.util
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+
+# format -> (file extension, mime type)
+FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+# XLSX is optional: only offered when openpyxl is installed
+if importlib.util.find_spec("openpyxl") is not None:
+    FORMATS["xlsx"] = ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS):
+    """CSV as UTF-8 byte chunks (header first), never the whole table as one string."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        part = df.iloc[start : start + chunk_rows]
+        yield part.to_csv(index=False, header=(start == 0)).encode("utf-8")
+
+
+def _for_export(df: pd.DataFrame) -> pd.DataFrame:
+    # categoricals -> plain text so every format/reader sees the same values
+    cats = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    return df.astype({c: str for c in cats}) if cats else df
+
+
+def encode(df: pd.DataFrame, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "csv":
+        for chunk in iter_csv_chunks(df):
+            buf.write(chunk)
+    elif fmt == "csv.gz":
+        with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=6, mtime=0) as gz:
+            for chunk in iter_csv_chunks(df):
+                gz.write(chunk)
+    elif fmt == "parquet":
+        df.to_parquet(buf, index=False)
+    elif fmt == "xlsx" and "xlsx" in FORMATS:
+        _for_export(df).to_excel(buf, index=False, engine="openpyxl")
+    else:
+        raise ValueError(f"Formato de exportação não suportado: {fmt}")
+    return buf.getvalue()
+
+
+def file_name(base: str, fmt: str) -> str:
+    return f"{base}.{FORMATS[fmt][0]}"
+
+
+class ExportCache:
+    """
+    Encoded exports keyed by (dataset_version, filter state, format),
+    LRU-evicted by total size. Built on demand, shared across sessions.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[tuple, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: tuple, build) -> bytes:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        data = build()
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = data
+                self._size += len(data)
+                while self._size > self.max_bytes and len(self._items) > 1:
+                    _, old = self._items.popitem(last=False)
+                    self._size -= len(old)
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._items), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+EXPORT_CACHE = ExportCache()
+
+
+def export_bytes(df: pd.DataFrame, fmt: str, key: tuple, prepare=None, cache: ExportCache = EXPORT_CACHE) -> bytes:
+    """Encoded `df` for `key`; `prepare` (e.g. re-attaching URIs) only runs on a miss."""
+
+    def build():
+        return encode(prepare(df) if prepare else df, fmt)
+
+    return cache.get_or_build((*key, fmt), build)
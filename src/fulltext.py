@@ -0,0 +1,280 @@
+import json
+import os
+import shutil
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.search import fold
+
+# Function words that carry no meaning in an ementa
+STOPWORDS = frozenset(
+    """
+    a ao aos as com como da das de do dos e em entre mais na nas no nos o os ou para pela pelas pelo pelos
+    por que se sem sob sobre sua suas seu seus um uma umas uns outras outros outra outro
+    """.split()
+)
+
+# Bump when stem() / analyze() change: indexes built with another version must be rebuilt
+ANALYZER_VERSION = 2
+
+# Plural endings -> singular, longest first ("ações" -> "acao", "papéis" -> "papel", "países" -> "pais")
+_PLURALS = [
+    ("oes", "ao"),
+    ("aes", "ao"),
+    ("ais", "al"),
+    ("eis", "el"),
+    ("ois", "ol"),
+    ("res", "r"),
+    ("zes", "z"),
+    ("ses", "s"),
+    ("ns", "m"),
+]
+
+
+def stem(token: str) -> str:
+    """Light Portuguese normalization: plural -> singular on folded tokens."""
+    if len(token) <= 3 or token.isdigit():
+        return token
+    # short stems: "leis" -> "lei", "reis" -> "rei" (not "lel")
+    if token.endswith("eis") and len(token) == 4:
+        return token[:-1]
+    for suffix, repl in _PLURALS:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[: -len(suffix)] + repl
+    # "-se" singulars meet their "-ses" plurals: "análise" / "análises" -> "analis"
+    if token.endswith("se"):
+        return token[:-1]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def analyze(text) -> list[str]:
+    """Folded, stopword-free, plural-normalized terms of `text` (same for documents and queries)."""
+    return [stem(t) for t in fold(text).split() if t not in STOPWORDS]
+
+
+class _TextWriter:
+    """Append-only UTF-8 blob + int64 offsets: one string per document, random access on read."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = open(path.with_suffix(".bin"), "wb")
+        self.offsets = [0]
+
+    def add(self, text: str):
+        data = (text or "").encode("utf-8")
+        self._f.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def close(self):
+        self._f.close()
+        np.save(self.path.with_suffix(".idx.npy"), np.asarray(self.offsets, dtype=np.int64))
+
+
+class _TextReader:
+    def __init__(self, path: Path):
+        self._offsets = np.load(path.with_suffix(".idx.npy"), mmap_mode="r")
+        self._blob = np.memmap(path.with_suffix(".bin"), dtype=np.uint8, mode="r") if self._offsets[-1] else None
+
+    def __getitem__(self, doc: int) -> str:
+        start, end = int(self._offsets[doc]), int(self._offsets[doc + 1])
+        return bytes(self._blob[start:end]).decode("utf-8") if end > start else ""
+
+
+class TextIndexWriter:
+    """
+    Builds a TextIndex directory from documents added one at a time.
+
+    Only postings (term -> docs, term frequencies) are kept in memory while
+    building; stored text goes straight to disk.
+    """
+
+    def __init__(self, path: Path | str, stored: tuple[str, ...] = ()):
+        self.path = Path(path)
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True)
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._lengths: list[int] = []
+        self._keys: list[int] = []
+        self._stored = {name: _TextWriter(self.path / name) for name in stored}
+
+    def add(self, key: int, text: str, **stored: str) -> int:
+        doc = len(self._keys)
+        terms = analyze(text)
+        counts: dict[str, int] = defaultdict(int)
+        for t in terms:
+            counts[t] += 1
+        for t, tf in counts.items():
+            self._postings[t].append((doc, min(tf, 65535)))
+        self._lengths.append(len(terms))
+        self._keys.append(int(key))
+        for name, writer in self._stored.items():
+            writer.add(stored.get(name, ""))
+        return doc
+
+    def close(self, columns: dict[str, np.ndarray] | None = None):
+        """Write postings, term table and per-document arrays; `columns` are extra arrays kept with the index (facets)."""
+        terms = sorted(self._postings)
+        df = np.fromiter((len(self._postings[t]) for t in terms), dtype=np.int64, count=len(terms))
+        offsets = np.zeros(len(terms), dtype=np.int64)
+        if len(terms):
+            offsets[1:] = np.cumsum(df)[:-1]
+        docs = np.empty(int(df.sum()), dtype=np.int32)
+        tfs = np.empty(int(df.sum()), dtype=np.uint16)
+        for t, off in zip(terms, offsets):
+            plist = self._postings[t]
+            docs[off : off + len(plist)] = [d for d, _ in plist]
+            tfs[off : off + len(plist)] = [f for _, f in plist]
+        np.save(self.path / "postings_docs.npy", docs)
+        np.save(self.path / "postings_tf.npy", tfs)
+        pq.write_table(
+            pa.table({"term": pa.array(terms, pa.string()), "df": pa.array(df, pa.int32()), "offset": pa.array(offsets, pa.int64())}),
+            self.path / "termos.parquet",
+        )
+        np.save(self.path / "doclen.npy", np.asarray(self._lengths, dtype=np.int32))
+        np.save(self.path / "keys.npy", np.asarray(self._keys, dtype=np.int64))
+        for name, values in (columns or {}).items():
+            np.save(self.path / f"col_{name}.npy", np.asarray(values))
+        for writer in self._stored.values():
+            writer.close()
+        (self.path / "meta.json").write_text(
+            json.dumps(
+                {
+                    "docs": len(self._keys),
+                    "terms": len(terms),
+                    "stored": list(self._stored),
+                    "analyzer": ANALYZER_VERSION,
+                    "built": time.time(),
+                }
+            )
+        )
+        self._postings.clear()
+
+
+class TextIndex:
+    """
+    Read side of an on-disk inverted index with BM25 ranking.
+
+    In memory: the term table and per-document lengths / keys / facet
+    columns. Postings and stored text are memory-mapped, so a query only
+    touches the postings of its own terms and the text of the hits shown.
+    """
+
+    def __init__(self, path: Path | str, k1: float = 1.2, b: float = 0.75):
+        self.path = Path(path)
+        self.k1, self.b = k1, b
+        meta = json.loads((self.path / "meta.json").read_text())
+        self.analyzer = meta.get("analyzer", 1)
+        terms = pq.read_table(self.path / "termos.parquet")
+        self._terms = dict(zip(terms["term"].to_pylist(), zip(terms["offset"].to_pylist(), terms["df"].to_pylist())))
+        self._docs = np.load(self.path / "postings_docs.npy", mmap_mode="r")
+        self._tfs = np.load(self.path / "postings_tf.npy", mmap_mode="r")
+        self.doclen = np.load(self.path / "doclen.npy")
+        self.keys = np.load(self.path / "keys.npy")
+        self.avgdl = float(self.doclen.mean()) if len(self.doclen) else 0.0
+        self._norm = (self.k1 * (1 - self.b + self.b * self.doclen / self.avgdl)).astype(np.float32) if self.avgdl else None
+        self.columns = {p.stem[4:]: np.load(p) for p in self.path.glob("col_*.npy")}
+        self._stored = {name: _TextReader(self.path / name) for name in meta["stored"]}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def n_terms(self) -> int:
+        return len(self._terms)
+
+    @property
+    def stale(self) -> bool:
+        """Built by another analyzer version: queries would not match its terms."""
+        return self.analyzer != ANALYZER_VERSION
+
+    def stored(self, name: str, doc: int) -> str:
+        return self._stored[name][doc]
+
+    def search(self, query: str, limit: int = 50, allowed: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        (doc numbers, BM25 scores, total matches), best first. Any query
+        term may match (OR); documents with more and rarer terms rank higher.
+        `allowed`: boolean mask over documents (facets).
+        """
+        n = len(self.keys)
+        terms = list(dict.fromkeys(analyze(query)))
+        hits = [self._terms[t] for t in terms if t in self._terms]
+        if not hits or not n:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), 0
+
+        parts_docs, parts_scores = [], []
+        for offset, df in hits:
+            docs = np.asarray(self._docs[offset : offset + df])
+            tf = np.asarray(self._tfs[offset : offset + df], dtype=np.float32)
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            parts_docs.append(docs)
+            parts_scores.append(idf * tf * (self.k1 + 1) / (tf + self._norm[docs]))
+        docs = np.concatenate(parts_docs)
+        scores = np.concatenate(parts_scores)
+        if len(parts_docs) > 1:
+            docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=scores).astype(np.float32)
+        if allowed is not None:
+            keep = allowed[docs]
+            docs, scores = docs[keep], scores[keep]
+
+        total = len(docs)
+        if limit and total > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        order = np.lexsort((docs, -scores))
+        return docs[order].astype(np.int64), scores[order], total
+
+
+class IndexDirectory:
+    """
+    Versioned index builds under `root`: each build goes to its own folder
+    and CURRENT is switched atomically, so readers never see a half-written
+    index. Older builds are removed once replaced.
+    """
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._open: tuple[str, TextIndex] | None = None
+
+    @property
+    def current_path(self) -> Path:
+        return self.root / "CURRENT"
+
+    def current(self) -> str | None:
+        try:
+            return self.current_path.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def new_writer(self, stored: tuple[str, ...] = ()) -> TextIndexWriter:
+        name = "indice-" + time.strftime("%Y%m%dT%H%M%S") + f"{time.perf_counter_ns() % 1_000_000:06d}"
+        return TextIndexWriter(self.root / name, stored)
+
+    def publish(self, writer: TextIndexWriter):
+        tmp = self.current_path.with_suffix(".tmp")
+        tmp.write_text(writer.path.name)
+        os.replace(tmp, self.current_path)
+        for old in self.root.glob("indice-*"):
+            if old.name != writer.path.name:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def open(self) -> TextIndex | None:
+        name = self.current()
+        if name is None:
+            return None
+        with self._lock:
+            if self._open is None or self._open[0] != name:
+                self._open = (name, TextIndex(self.root / name))
+            return self._open[1]
+
@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.api import CamaraClient
+from src.data import build_deputados_df
+from src.snapshots import DATA_DIR
+
+HISTORY_DIR = DATA_DIR / "history"
+
+AGGREGATE_COLUMNS = ["idLegislatura", "siglaPartido", "siglaUf", "qtdDeputados"]
+LEGISLATURA_COLUMNS = ["id", "dataInicio", "dataFim"]
+
+# Early legislatures have no party / UF for some deputies
+SEM_PARTIDO = "Sem partido"
+SEM_UF = "ND"
+
+
+def fetch_legislaturas(client: CamaraClient) -> pd.DataFrame:
+    records = client.get_paginated("legislaturas", {"ordem": "DESC", "ordenarPor": "id"})
+    df = pd.DataFrame(records)
+    for c in LEGISLATURA_COLUMNS:
+        if c not in df.columns:
+            df[c] = None
+    df = df[LEGISLATURA_COLUMNS].dropna(subset=["id"])
+    df["id"] = df["id"].astype("int16")
+    return df.drop_duplicates("id").sort_values("id").reset_index(drop=True)
+
+
+def fetch_legislatura(client: CamaraClient, legislatura: int) -> pd.DataFrame:
+    """Every deputy who served in `legislatura` (one row per deputy)."""
+    records = client.fetch_deputados(idLegislatura=legislatura)
+    for r in records:
+        r["siglaPartido"] = r.get("siglaPartido") or SEM_PARTIDO
+        r["siglaUf"] = r.get("siglaUf") or SEM_UF
+        r["idLegislatura"] = legislatura
+    if not records:
+        return pd.DataFrame()
+    df = build_deputados_df(records)
+    return df.drop_duplicates("id", keep="last").reset_index(drop=True)
+
+
+def aggregate_partition(df: pd.DataFrame, legislatura: int) -> pd.DataFrame:
+    """Party x UF counts of one legislature: the only rows cross-legislature views read."""
+    if df.empty:
+        return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+    counts = df.groupby(["siglaPartido", "siglaUf"], observed=True).size()
+    out = counts[counts > 0].rename("qtdDeputados").reset_index()
+    out.insert(0, "idLegislatura", legislatura)
+    out["siglaPartido"] = out["siglaPartido"].astype(str)
+    out["siglaUf"] = out["siglaUf"].astype(str)
+    return out.astype({"idLegislatura": "int16", "qtdDeputados": "int32"})[AGGREGATE_COLUMNS]
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+class HistoryStore:
+    """
+    Deputies of every legislature on disk, one Parquet partition per
+    legislature (history/legislatura=NN/deputados.parquet), plus a small
+    party x UF aggregate table covering all of them.
+
+    Partitions are read lazily (memory-mapped, a few kept in memory);
+    cross-legislature queries only touch the aggregates.
+    """
+
+    def __init__(self, root: Path | str = HISTORY_DIR, max_partitions: int = 4):
+        self.root = Path(root)
+        self.max_partitions = max_partitions
+        self._lock = threading.Lock()
+        self._partitions: OrderedDict[int, tuple[int, pd.DataFrame]] = OrderedDict()
+        self._aggregates: tuple[int, pd.DataFrame] | None = None
+
+    @property
+    def aggregates_path(self) -> Path:
+        return self.root / "agregados.parquet"
+
+    @property
+    def legislaturas_path(self) -> Path:
+        return self.root / "legislaturas.parquet"
+
+    def partition_path(self, legislatura: int) -> Path:
+        return self.root / f"legislatura={int(legislatura):02d}" / "deputados.parquet"
+
+    def partitions(self) -> list[int]:
+        if not self.root.exists():
+            return []
+        legs = []
+        for path in self.root.glob("legislatura=*/deputados.parquet"):
+            try:
+                legs.append(int(path.parent.name.split("=", 1)[1]))
+            except ValueError:
+                continue
+        return sorted(legs)
+
+    def version(self) -> int:
+        """Changes whenever the aggregates are rewritten; -1 while empty."""
+        try:
+            return self.aggregates_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return -1
+
+    # --- writes (ingestion) ---
+
+    def write_legislaturas(self, df: pd.DataFrame):
+        _write_parquet(df, self.legislaturas_path)
+
+    def write_partition(self, legislatura: int, df: pd.DataFrame):
+        legislatura = int(legislatura)
+        with self._lock:
+            _write_parquet(df, self.partition_path(legislatura))
+            self._partitions.pop(legislatura, None)
+            agg = self._read_aggregates()
+            agg = agg[agg["idLegislatura"] != legislatura]
+            fresh = aggregate_partition(df, legislatura)
+            agg = pd.concat([agg, fresh], ignore_index=True) if not agg.empty else fresh
+            _write_parquet(agg.sort_values(["idLegislatura", "siglaPartido", "siglaUf"]), self.aggregates_path)
+            self._aggregates = None
+
+    def rebuild_aggregates(self) -> pd.DataFrame:
+        """Recompute the aggregates from the partitions on disk (e.g. after a manual copy)."""
+        with self._lock:
+            parts = [aggregate_partition(self._read_partition(leg), leg) for leg in self.partitions()]
+            parts = [p for p in parts if not p.empty]
+            agg = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=AGGREGATE_COLUMNS)
+            _write_parquet(agg, self.aggregates_path)
+            self._aggregates = None
+        return self.aggregates()
+
+    # --- reads ---
+
+    def _read_partition(self, legislatura: int) -> pd.DataFrame:
+        return pq.read_table(self.partition_path(legislatura), memory_map=True).to_pandas()
+
+    def _read_aggregates(self) -> pd.DataFrame:
+        if not self.aggregates_path.exists():
+            return pd.DataFrame(columns=AGGREGATE_COLUMNS)
+        return pq.read_table(self.aggregates_path, memory_map=True).to_pandas()
+
+    def load(self, legislatura: int) -> pd.DataFrame:
+        """Deputies of one legislature, read on first use (LRU of `max_partitions`)."""
+        legislatura = int(legislatura)
+        path = self.partition_path(legislatura)
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            hit = self._partitions.get(legislatura)
+            if hit is not None and hit[0] == mtime:
+                self._partitions.move_to_end(legislatura)
+                return hit[1]
+        df = self._read_partition(legislatura)
+        with self._lock:
+            self._partitions[legislatura] = (mtime, df)
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+        return df
+
+    def aggregates(self) -> pd.DataFrame:
+        version = self.version()
+        if version < 0 and self.partitions():
+            return self.rebuild_aggregates()
+        with self._lock:
+            if self._aggregates is not None and self._aggregates[0] == version:
+                return self._aggregates[1]
+            agg = self._read_aggregates()
+            for c in ("siglaPartido", "siglaUf"):
+                agg[c] = agg[c].astype("category")
+            self._aggregates = (version, agg)
+            return agg
+
+    def legislaturas(self) -> pd.DataFrame:
+        if not self.legislaturas_path.exists():
+            return pd.DataFrame({"id": self.partitions()}, columns=LEGISLATURA_COLUMNS)
+        return pd.read_parquet(self.legislaturas_path)
+
+
+def _pivot(agg: pd.DataFrame, column: str, legislaturas=None, top: int | None = None) -> pd.DataFrame:
+    if legislaturas is not None:
+        agg = agg[agg["idLegislatura"].isin(list(legislaturas))]
+    table = agg.groupby(["idLegislatura", column], observed=True)["qtdDeputados"].sum().unstack(fill_value=0)
+    table = table.loc[:, table.sum() > 0]
+    if top and table.shape[1] > top:
+        keep = table.sum().nlargest(top).index
+        rest = table.drop(columns=keep).sum(axis=1)
+        table = table[keep]
+        table["Outros"] = rest
+    table.columns = [str(c) for c in table.columns]
+    return table.sort_index()
+
+
+def seats_by_party(agg: pd.DataFrame, legislaturas=None, top: int | None = None) -> pd.DataFrame:
+    """Legislature x party deputy counts (largest `top` parties in the period, rest as "Outros")."""
+    return _pivot(agg, "siglaPartido", legislaturas, top)
+
+
+def uf_composition(agg: pd.DataFrame, uf: str, legislaturas=None, top: int | None = None) -> pd.DataFrame:
+    """Legislature x party deputy counts for one UF."""
+    return _pivot(agg[agg["siglaUf"] == uf], "siglaPartido", legislaturas, top)
+
+
+def legislatura_labels(legislaturas: pd.DataFrame) -> dict[int, str]:
+    """57 -> "57ª (2023–2027)"; just "57ª" when the dates are unknown."""
+    labels = {}
+    for row in legislaturas.itertuples(index=False):
+        inicio, fim = str(row.dataInicio or "")[:4], str(row.dataFim or "")[:4]
+        period = f" ({inicio}–{fim})" if inicio.isdigit() and fim.isdigit() else ""
+        labels[int(row.id)] = f"{int(row.id)}ª{period}"
+    return labels
+
+
+class HistoryIngestor:
+    """
+    Background job that fills the HistoryStore, one legislature at a time.
+
+    Past legislatures are immutable: only missing partitions are fetched,
+    except the most recent one, which is always refreshed.
+    """
+
+    def __init__(self, client: CamaraClient, store: HistoryStore | None = None):
+        self.client = client
+        self.store = store or HistoryStore()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.status = {
+            "running": False,
+            "done": 0,
+            "total": 0,
+            "errors": 0,
+            "current": None,
+            "seconds": None,
+            "last_error": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, only_missing: bool = True) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self.status.update(running=True, done=0, total=0, errors=0, current=None, seconds=None, last_error=None)
+            self._thread = threading.Thread(target=self._run, args=(only_missing,), daemon=True, name="history-ingest")
+            self._thread.start()
+            return True
+
+    def _run(self, only_missing: bool):
+        t0 = time.perf_counter()
+        try:
+            legs_df = fetch_legislaturas(self.client)
+            self.store.write_legislaturas(legs_df)
+            legs = legs_df["id"].astype(int).tolist()
+            if only_missing and legs:
+                have = set(self.store.partitions())
+                newest = max(legs)
+                legs = [leg for leg in legs if leg not in have or leg == newest]
+            # newest first: the views are useful before the old legislatures arrive
+            legs = sorted(legs, reverse=True)
+            self.status["total"] = len(legs)
+            for leg in legs:
+                self.status["current"] = leg
+                try:
+                    df = fetch_legislatura(self.client, leg)
+                    if not df.empty:
+                        self.store.write_partition(leg, df)
+                except Exception as e:
+                    self.status["errors"] += 1
+                    self.status["last_error"] = f"legislatura {leg}: {e}"
+                self.status["done"] += 1
+        except Exception as e:
+            self.status["last_error"] = str(e)
+        finally:
+            self.status.update(running=False, current=None, seconds=time.perf_counter() - t0)
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.schema import CATEGORY_COLUMNS
+
+FILTER_COLUMNS = ("siglaPartido", "siglaUf")
+SORT_COLUMNS = ("nome", "siglaPartido", "siglaUf")
+
+
+def _value_masks(s: pd.Series) -> dict[str, np.ndarray]:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        return {str(cat): codes == i for i, cat in enumerate(s.cat.categories)}
+    values = s.astype(str).to_numpy()
+    return {v: values == v for v in pd.unique(values)}
+
+
+class FilterIndex:
+    """
+    Filter/sort index for one dataset version, built once:
+    - one boolean mask per party and per UF
+    - presorted (stable) row positions for each `sort_by` option
+    - memoized results with LRU eviction
+
+    Filtering becomes OR within a column, AND across columns, then a take
+    on the presorted order: the full frame is never copied.
+    """
+
+    def __init__(self, df: pd.DataFrame, version: int = 0, max_entries: int = 64):
+        self.df = df.reset_index(drop=True)
+        self.version = version
+        self.max_entries = max_entries
+
+        self._masks = {c: _value_masks(self.df[c]) for c in FILTER_COLUMNS if c in self.df.columns}
+        self._orders = {
+            c: self.df[c].argsort(kind="stable").to_numpy()
+            for c in SORT_COLUMNS
+            if c in self.df.columns
+        }
+        self._lru: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _mask(self, column: str, selected) -> np.ndarray | None:
+        if not selected or column not in self._masks:
+            return None
+        by_value = self._masks[column]
+        masks = [by_value[v] for v in selected if v in by_value]
+        if not masks:
+            return np.zeros(len(self.df), dtype=bool)
+        return np.logical_or.reduce(masks) if len(masks) > 1 else masks[0]
+
+    def positions(self, partidos_sel, ufs_sel, sort_by: str) -> np.ndarray:
+        mask = None
+        for column, selected in (("siglaPartido", partidos_sel), ("siglaUf", ufs_sel)):
+            m = self._mask(column, selected)
+            if m is not None:
+                mask = m if mask is None else (mask & m)
+
+        order = self._orders.get(sort_by)
+        if order is None:
+            return np.arange(len(self.df)) if mask is None else np.flatnonzero(mask)
+        return order if mask is None else order[mask[order]]
+
+    def filter(self, partidos_sel, ufs_sel, sort_by: str) -> pd.DataFrame:
+        key = (self.version, frozenset(partidos_sel or ()), frozenset(ufs_sel or ()), sort_by)
+        with self._lock:
+            hit = self._lru.get(key)
+            if hit is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+
+        out = self.df.take(self.positions(partidos_sel, ufs_sel, sort_by)).reset_index(drop=True)
+        # categories without rows must not show up in value_counts / charts
+        for c in CATEGORY_COLUMNS:
+            if c in out.columns and isinstance(out[c].dtype, pd.CategoricalDtype):
+                out[c] = out[c].cat.remove_unused_categories()
+
+        with self._lock:
+            self._lru[key] = out
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return out
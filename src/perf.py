@@ -0,0 +1,250 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _short_path(filename: str) -> str:
+    # site-packages/pandas/core/frame.py -> pandas/core/frame.py; repo files relative to cwd
+    _, sep, tail = filename.rpartition("site-packages" + os.sep)
+    if sep:
+        return tail
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        return filename
+
+
+class RerunTrace:
+    """Spans of one script run, in completion order: (name, depth, ms)."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.spans: list[tuple[str, int, float]] = []
+        self.total_ms: float | None = None
+        self.profile: pd.DataFrame | None = None
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.spans, columns=["etapa", "nivel", "ms"])
+
+
+class PerfRecorder:
+    """
+    Span timings per stage, aggregated across sessions in a rolling window
+    (last `window` samples per stage) for p50/p95/p99.
+
+    Spans opened between begin_rerun() and end_rerun() on the same thread are
+    also kept in that run's RerunTrace; spans from other threads (background
+    refresh, lazy downloads) only feed the aggregates.
+    """
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self._samples: dict[str, deque] = {}
+        self._count: Counter = Counter()
+        self._sum: Counter = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._count[name] += 1
+            self._sum[name] += seconds
+
+    @contextmanager
+    def span(self, name: str):
+        trace = getattr(self._local, "trace", None)
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self._local.depth = depth
+            self.record(name, elapsed)
+            if trace is not None:
+                trace.spans.append((name, depth, elapsed * 1e3))
+
+    def timed(self, name: str):
+        """Decorator form of span()."""
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+
+            return inner
+
+        return wrap
+
+    def begin_rerun(self, profile: bool = False) -> RerunTrace:
+        # a previous run on this thread that never reached end_rerun (script
+        # exception): its timing is meaningless now, but its profiler must stop
+        leftover = getattr(self._local, "profiler", None)
+        if leftover is not None:
+            leftover.stop()
+        trace = RerunTrace()
+        self._local.trace = trace
+        self._local.depth = 0
+        self._local.t0 = time.perf_counter()
+        self._local.profiler = SamplingProfiler().start() if profile else None
+        return trace
+
+    def end_rerun(self) -> RerunTrace | None:
+        trace = getattr(self._local, "trace", None)
+        if trace is None:
+            return None
+        elapsed = time.perf_counter() - self._local.t0
+        self.record("script", elapsed)
+        trace.total_ms = elapsed * 1e3
+        profiler = self._local.profiler
+        if profiler is not None:
+            trace.profile = profiler.stop().top()
+        self._local.trace = None
+        self._local.profiler = None
+        return trace
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._count.clear()
+            self._sum.clear()
+
+    def stats(self) -> pd.DataFrame:
+        """One row per stage: total count plus window quantiles, in ms."""
+        with self._lock:
+            snap = {name: (np.fromiter(s, dtype=np.float64), self._count[name]) for name, s in self._samples.items()}
+
+        rows = []
+        for name, (samples, count) in sorted(snap.items()):
+            q = np.quantile(samples, QUANTILES) * 1e3 if len(samples) else [np.nan] * len(QUANTILES)
+            rows.append(
+                {
+                    "etapa": name,
+                    "n": count,
+                    "p50_ms": q[0],
+                    "p95_ms": q[1],
+                    "p99_ms": q[2],
+                    "media_ms": samples.mean() * 1e3 if len(samples) else np.nan,
+                    "ultima_ms": samples[-1] * 1e3 if len(samples) else np.nan,
+                }
+            )
+        return pd.DataFrame(rows, columns=["etapa", "n", "p50_ms", "p95_ms", "p99_ms", "media_ms", "ultima_ms"])
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"window": self.window, "stages": self.stats().round(3).to_dict(orient="records")},
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    def to_prometheus(self, metric: str = "deputados_stage_seconds") -> str:
+        """Prometheus text exposition: one summary, labelled by stage."""
+        with self._lock:
+            snap = {name: np.fromiter(s, dtype=np.float64) for name, s in self._samples.items()}
+            counts = dict(self._count)
+            sums = dict(self._sum)
+
+        lines = [
+            f"# HELP {metric} Duração das etapas do app (quantis sobre as últimas {self.window} amostras).",
+            f"# TYPE {metric} summary",
+        ]
+        for name, samples in sorted(snap.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            if len(samples):
+                for q, v in zip(QUANTILES, np.quantile(samples, QUANTILES)):
+                    lines.append(f'{metric}{{stage="{label}",quantile="{q}"}} {v:.6f}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {sums[name]:.6f}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {counts[name]}')
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Stack sampler for one thread: a daemon thread reads the target's current
+    frame every `interval` seconds. No tracing hooks, so the profiled code
+    runs at (almost) full speed. Sampling ends by itself after `max_seconds`,
+    in case nobody calls stop() (a script that raised).
+    """
+
+    def __init__(self, thread_id: int | None = None, interval: float = 0.005, max_seconds: float = 120.0):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples = 0
+        self._self: Counter = Counter()
+        self._total: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None or self._stop.is_set():
+            return
+        self.samples += 1
+        seen = set()
+        leaf = True
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+            if leaf:
+                self._self[key] += 1
+                leaf = False
+            if key not in seen:
+                seen.add(key)
+                self._total[key] += 1
+            frame = frame.f_back
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self._sample()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="perf-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def top(self, n: int = 25) -> pd.DataFrame:
+        """Hottest functions by own samples, with inclusive share."""
+        cols = ["funcao", "arquivo", "linha", "proprio_%", "total_%", "amostras"]
+        if not self.samples:
+            return pd.DataFrame(columns=cols)
+        keys = set(self._self) | {k for k, _ in self._total.most_common(n)}
+        rows = [
+            {
+                "funcao": name,
+                "arquivo": _short_path(filename),
+                "linha": line,
+                "proprio_%": 100.0 * self._self[(name, filename, line)] / self.samples,
+                "total_%": 100.0 * self._total[(name, filename, line)] / self.samples,
+                "amostras": self._self[(name, filename, line)],
+            }
+            for name, filename, line in keys
+        ]
+        out = pd.DataFrame(rows, columns=cols)
+        return out.sort_values(["proprio_%", "total_%"], ascending=False, kind="stable").head(n).reset_index(drop=True)
+
+
+PERF = PerfRecorder()
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.api import CamaraClient
+from src.fulltext import IndexDirectory, TextIndex
+from src.snapshots import DATA_DIR
+
+PROPOSICOES_DIR = DATA_DIR / "proposicoes"
+
+# Bills and the like; requerimentos (REQ) are numerous and rarely what analysts look for
+TIPOS_PADRAO = ["PL", "PLP", "PEC", "PDL", "MPV"]
+
+PROPOSICAO_COLUMNS = ["id", "siglaTipo", "numero", "ano", "ementa"]
+AUTOR_COLUMNS = ["idProposicao", "idDeputado", "nome", "ordemAssinatura"]
+
+
+def fetch_proposicoes(client: CamaraClient, ano: int, tipos: list[str]) -> list[dict]:
+    params = {"ano": ano, "ordem": "ASC", "ordenarPor": "id"}
+    if tipos:
+        params["siglaTipo"] = list(tipos)
+    return client.get_paginated("proposicoes", params)
+
+
+def _deputado_id(uri) -> int | None:
+    # ".../api/v2/deputados/204554" -> 204554; other authors (Executivo, comissões) have no deputy id
+    if not uri or "/deputados/" not in uri:
+        return None
+    tail = uri.rstrip("/").rsplit("/", 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+def fetch_autores(client: CamaraClient, prop_id: int) -> list[dict]:
+    out = []
+    for i, a in enumerate(client.get_json(f"proposicoes/{int(prop_id)}/autores").get("dados") or []):
+        out.append(
+            {
+                "idProposicao": int(prop_id),
+                "idDeputado": _deputado_id(a.get("uri")),
+                "nome": a.get("nome"),
+                "ordemAssinatura": a.get("ordemAssinatura") or i + 1,
+            }
+        )
+    return out
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+class PropositionsStore:
+    """
+    Proposições and their authors on disk, appended in batches
+    (proposicoes/lotes/*.parquet; a batch's authors are written before the
+    proposições that mark them as done), plus the full-text index over the
+    ementas (proposicoes/indice/, see IndexDirectory).
+    """
+
+    def __init__(self, root: Path | str = PROPOSICOES_DIR):
+        self.root = Path(root)
+        self.index_dir = IndexDirectory(self.root / "indice")
+
+    def _files(self, kind: str) -> list[Path]:
+        # newest first: a proposição fetched again overrides older rows
+        return sorted((self.root / "lotes").glob(f"{kind}-*.parquet"), reverse=True)
+
+    def known_ids(self) -> set[int]:
+        ids: set[int] = set()
+        for path in self._files("proposicoes"):
+            ids.update(pq.read_table(path, columns=["id"])["id"].to_pylist())
+        return ids
+
+    def append_batch(self, proposicoes: list[dict], autores: list[dict]):
+        stamp = time.strftime("%Y%m%dT%H%M%S") + f"{time.perf_counter_ns() % 1_000_000:06d}"
+        if autores:
+            df = pd.DataFrame(autores, columns=AUTOR_COLUMNS).astype({"idProposicao": "int64", "idDeputado": "Int64"})
+            _write_parquet(df, self.root / "lotes" / f"autores-{stamp}.parquet")
+        if proposicoes:
+            df = pd.DataFrame([{c: p.get(c) for c in PROPOSICAO_COLUMNS} for p in proposicoes], columns=PROPOSICAO_COLUMNS)
+            _write_parquet(df.astype({"id": "int64"}), self.root / "lotes" / f"proposicoes-{stamp}.parquet")
+
+    def autores(self) -> pd.DataFrame:
+        files = self._files("autores")
+        if not files:
+            return pd.DataFrame(columns=AUTOR_COLUMNS)
+        # keep the newest fetch of each proposição's author list
+        frames, seen = [], set()
+        for path in files:
+            df = pd.read_parquet(path)
+            df = df[~df["idProposicao"].isin(seen)]
+            seen.update(df["idProposicao"].unique().tolist())
+            frames.append(df)
+        return pd.concat(frames, ignore_index=True)
+
+    def build_index(self) -> TextIndex:
+        """
+        Rebuild the ementa index, streaming the batches: the text goes to
+        the index's stored fields on disk, never into one frame.
+        """
+        autores = self.autores().sort_values(["idProposicao", "ordemAssinatura"], kind="stable")
+        nomes = autores.groupby("idProposicao", sort=False)["nome"].agg(lambda s: ", ".join(str(n) for n in s if n))
+
+        writer = self.index_dir.new_writer(stored=("ementa", "autores"))
+        doc_of: dict[int, int] = {}
+        tipos, numeros, anos = [], [], []
+        for path in self._files("proposicoes"):
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=10_000, columns=PROPOSICAO_COLUMNS):
+                for row in batch.to_pylist():
+                    prop_id = int(row["id"])
+                    if prop_id in doc_of:
+                        continue
+                    sigla, numero, ano = row["siglaTipo"] or "", row["numero"] or 0, row["ano"] or 0
+                    ementa = row["ementa"] or ""
+                    doc_of[prop_id] = writer.add(prop_id, f"{sigla} {numero} {ano} {ementa}", ementa=ementa, autores=nomes.get(prop_id, ""))
+                    tipos.append(sigla)
+                    numeros.append(numero)
+                    anos.append(ano)
+
+        deputados = autores.dropna(subset=["idDeputado"])
+        deputados = deputados[deputados["idProposicao"].isin(doc_of)]
+        writer.close(
+            {
+                "siglaTipo": np.asarray(tipos, dtype="U8"),
+                "numero": np.asarray(numeros, dtype=np.int32),
+                "ano": np.asarray(anos, dtype=np.int16),
+                # (document, author deputy) pairs: facets by party / UF and the deputy card
+                "autor_doc": deputados["idProposicao"].map(doc_of).to_numpy(np.int32),
+                "autor_deputado": deputados["idDeputado"].to_numpy(np.int64),
+            }
+        )
+        self.index_dir.publish(writer)
+        return self.index_dir.open()
+
+    def index(self) -> TextIndex | None:
+        return self.index_dir.open()
+
+    def version(self) -> int:
+        """Changes whenever a new index is published; -1 before the first one."""
+        try:
+            return self.index_dir.current_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return -1
+
+
+def _authored_mask(index: TextIndex, dep_ids) -> np.ndarray:
+    allowed = np.zeros(len(index), dtype=bool)
+    hit = np.isin(index.columns["autor_deputado"], np.asarray(list(dep_ids), dtype=np.int64))
+    allowed[index.columns["autor_doc"][hit]] = True
+    return allowed
+
+
+def _results(index: TextIndex, docs: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "id": index.keys[docs],
+            "siglaTipo": index.columns["siglaTipo"][docs],
+            "numero": index.columns["numero"][docs],
+            "ano": index.columns["ano"][docs],
+            "ementa": [index.stored("ementa", int(d)) for d in docs],
+            "autores": [index.stored("autores", int(d)) for d in docs],
+        }
+    )
+
+
+def search_proposicoes(index: TextIndex, query: str, dep_ids=None, tipos=None, limit: int = 50) -> tuple[pd.DataFrame, int]:
+    """
+    (top `limit` matches with ementa and authors, total matches). With
+    `dep_ids`, only proposições authored by one of those deputies count.
+    """
+    allowed = _authored_mask(index, dep_ids) if dep_ids is not None else None
+    if tipos:
+        by_tipo = np.isin(index.columns["siglaTipo"], list(tipos))
+        allowed = by_tipo if allowed is None else allowed & by_tipo
+    docs, scores, total = index.search(query, limit=limit, allowed=allowed)
+    out = _results(index, docs)
+    out["score"] = scores
+    return out, total
+
+
+def proposicoes_by_author(index: TextIndex, dep_id: int) -> pd.DataFrame:
+    """Proposições (co)authored by one deputy, most recent first."""
+    docs = np.unique(index.columns["autor_doc"][index.columns["autor_deputado"] == int(dep_id)])
+    out = _results(index, docs)
+    return out.sort_values(["ano", "numero"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+class PropositionsIngestor:
+    """
+    Background job: lists proposições of the chosen years and types, fetches
+    the authors of the ones not on disk yet (concurrently, checkpointing
+    every `batch` proposições), then rebuilds the full-text index.
+    """
+
+    def __init__(self, client: CamaraClient, store: PropositionsStore | None = None, batch: int = 200):
+        self.client = client
+        self.store = store or PropositionsStore()
+        self.batch = batch
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.status = {"running": False, "done": 0, "total": 0, "errors": 0, "indexed": None, "seconds": None, "last_error": None}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, anos: list[int], tipos: list[str] | None = None) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self.status.update(running=True, done=0, total=0, errors=0, indexed=None, seconds=None, last_error=None)
+            args = (sorted(int(a) for a in anos), list(tipos if tipos is not None else TIPOS_PADRAO))
+            self._thread = threading.Thread(target=self._run, args=args, daemon=True, name="proposicoes-ingest")
+            self._thread.start()
+            return True
+
+    def _run(self, anos: list[int], tipos: list[str]):
+        t0 = time.perf_counter()
+        try:
+            known = self.store.known_ids()
+            todo, seen = [], set()
+            for ano in anos:
+                for p in fetch_proposicoes(self.client, ano, tipos):
+                    prop_id = p.get("id")
+                    if prop_id is not None and prop_id not in known and prop_id not in seen:
+                        seen.add(prop_id)
+                        todo.append(p)
+            self.status["total"] = len(todo)
+
+            with ThreadPoolExecutor(max_workers=self.client.max_workers) as pool:
+                for i in range(0, len(todo), self.batch):
+                    chunk = todo[i : i + self.batch]
+                    done, autores = [], []
+                    for p, result in zip(chunk, pool.map(self._fetch_one, chunk)):
+                        self.status["done"] += 1
+                        if result is None:
+                            self.status["errors"] += 1
+                        else:
+                            done.append(p)
+                            autores.extend(result)
+                    self.store.append_batch(done, autores)
+            current = self.store.index()
+            if todo or current is None or current.stale:
+                index = self.store.build_index()
+                self.status["indexed"] = len(index)
+        except Exception as e:
+            self.status["last_error"] = str(e)
+        finally:
+            self.status.update(running=False, seconds=time.perf_counter() - t0)
+
+    def _fetch_one(self, proposicao: dict):
+        try:
+            return fetch_autores(self.client, proposicao["id"])
+        except Exception as e:
+            # counted in _run, on this thread's None: workers only leave the message
+            self.status["last_error"] = f"{proposicao.get('id')}: {e}"
+            return None
@@ -0,0 +1,86 @@
+import pandas as pd
+
+# URIs are not stored per row: they are derived from the ids on demand
+API_URL = "https://dadosabertos.camara.leg.br/api/v2"
+FOTO_URL = "https://www.camara.leg.br/internet/deputado/bandep/{id}.jpg"
+
+CATEGORY_COLUMNS = ["siglaPartido", "siglaUf"]
+DERIVED_COLUMNS = ["uri", "uriPartido", "urlFoto"]
+
+
+def deputado_uri(dep_id) -> str | None:
+    return None if pd.isna(dep_id) else f"{API_URL}/deputados/{int(dep_id)}"
+
+
+def partido_uri(partido_id) -> str | None:
+    return None if pd.isna(partido_id) else f"{API_URL}/partidos/{int(partido_id)}"
+
+
+def foto_url(dep_id) -> str | None:
+    return None if pd.isna(dep_id) else FOTO_URL.format(id=int(dep_id))
+
+
+def _id_from_uri(uri: pd.Series) -> pd.Series:
+    tail = uri.astype("string").str.rsplit("/", n=1).str[-1]
+    return pd.to_numeric(tail, errors="coerce").astype("Int32")
+
+
+def _compact_int(s: pd.Series) -> pd.Series:
+    s = pd.to_numeric(s, errors="coerce")
+    if s.isna().any():
+        return s.astype("Int32")
+    return s.astype("int32")
+
+
+def bytes_per_row(df: pd.DataFrame) -> float:
+    if len(df) == 0:
+        return 0.0
+    return float(df.memory_usage(index=True, deep=True).sum()) / len(df)
+
+
+def canonicalize(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compact in-memory schema for the deputados table (idempotent):
+    - ids as int32, party id parsed out of `uriPartido`
+    - low-cardinality columns (party, UF) as categoricals
+    - `uri`, `uriPartido`, `urlFoto` dropped (see deputado_uri / foto_url)
+    """
+    out = df.copy()
+
+    if "id" in out.columns:
+        out["id"] = _compact_int(out["id"])
+    if "idPartido" not in out.columns and "uriPartido" in out.columns:
+        out["idPartido"] = _id_from_uri(out["uriPartido"])
+    if "idLegislatura" in out.columns:
+        out["idLegislatura"] = _compact_int(out["idLegislatura"]).astype("Int16")
+
+    for c in CATEGORY_COLUMNS:
+        if c in out.columns and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype(str).astype("category")
+
+    if "nome" in out.columns:
+        out["nome"] = out["nome"].astype(str)
+
+    return out.drop(columns=[c for c in DERIVED_COLUMNS if c in out.columns])
+
+
+def with_uris(df: pd.DataFrame) -> pd.DataFrame:
+    """Re-attach the derived URI columns (exports, external consumers)."""
+    out = df.copy()
+    if "id" in out.columns:
+        out["uri"] = [deputado_uri(i) for i in out["id"]]
+        out["urlFoto"] = [foto_url(i) for i in out["id"]]
+    if "idPartido" in out.columns:
+        out["uriPartido"] = [partido_uri(i) for i in out["idPartido"]]
+    return out
+
+
+def schema_report(raw: pd.DataFrame, compact: pd.DataFrame) -> dict:
+    before = bytes_per_row(raw)
+    after = bytes_per_row(compact)
+    return {
+        "rows": len(compact),
+        "bytes_per_row_before": round(before, 1),
+        "bytes_per_row_after": round(after, 1),
+        "ratio": round(before / after, 2) if after else None,
+    }
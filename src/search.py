@@ -0,0 +1,165 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Text columns that are never worth indexing (links, contacts, dates)
+SKIP_COLUMNS = re.compile(r"uri|url|email|rede|telefone|data|foto", re.IGNORECASE)
+COLUMN_WEIGHTS = {"nome": 3.0, "nomeCivil": 2.0}
+MAX_PREFIX = 12
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text) -> str:
+    """Lowercase, strip accents and punctuation: 'João D'Ávila' -> 'joao d avila'."""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    nfkd = unicodedata.normalize("NFKD", str(text))
+    plain = "".join(ch for ch in nfkd if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", plain.lower()).strip()
+
+
+def tokenize(text) -> list[str]:
+    return fold(text).split()
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diffs) == 2:
+            i, j = diffs
+            return j == i + 1 and a[i] == b[j] and a[j] == b[i]  # transposition
+        return len(diffs) <= 1
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1 :]
+
+
+def text_columns(df: pd.DataFrame) -> list[str]:
+    cols = []
+    for c in df.columns:
+        dtype = df[c].dtype
+        if isinstance(dtype, pd.CategoricalDtype) or SKIP_COLUMNS.search(c):
+            continue
+        if pd.api.types.is_string_dtype(dtype) or dtype == object:
+            cols.append(c)
+    return cols
+
+
+class NameSearchIndex:
+    """
+    Accent-insensitive search over the text columns of a frame, built once
+    per dataset version.
+
+    - vocabulary of folded tokens -> postings (row, column weight)
+    - prefix table (up to MAX_PREFIX chars) for search-as-you-type
+    - trigram table over the vocabulary for typo tolerance (1 edit)
+
+    Matching is literal (no regex); every query token must match. Rows are
+    ranked by exact > prefix > fuzzy, weighted by column (nome first).
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list[str] | None = None, key: str = "id"):
+        self.columns = columns if columns is not None else text_columns(df)
+        self.keys = df[key].to_numpy() if key in df.columns else np.arange(len(df))
+
+        vocab: dict[str, int] = {}
+        postings: list[dict[int, float]] = []
+        for c in self.columns:
+            weight = COLUMN_WEIGHTS.get(c, 1.0)
+            for row, value in enumerate(df[c].to_numpy()):
+                for tok in tokenize(value):
+                    tid = vocab.setdefault(tok, len(vocab))
+                    if tid == len(postings):
+                        postings.append({})
+                    if postings[tid].get(row, 0.0) < weight:
+                        postings[tid][row] = weight
+
+        self.vocab = vocab
+        self.tokens = list(vocab)
+        self.postings = [
+            (np.fromiter(p.keys(), dtype=np.int64, count=len(p)), np.fromiter(p.values(), dtype=np.float64, count=len(p)))
+            for p in postings
+        ]
+
+        prefixes: dict[str, list[int]] = defaultdict(list)
+        trigrams: dict[str, list[int]] = defaultdict(list)
+        for tok, tid in vocab.items():
+            for n in range(1, min(len(tok), MAX_PREFIX) + 1):
+                prefixes[tok[:n]].append(tid)
+            for g in _trigrams(tok):
+                trigrams[g].append(tid)
+        self.prefixes = dict(prefixes)
+        self.trigrams = dict(trigrams)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _matches(self, q: str) -> list[tuple[int, float]]:
+        """(token id, match score) for one query token."""
+        found: dict[int, float] = {}
+        for tid in self.prefixes.get(q[:MAX_PREFIX], []):
+            tok = self.tokens[tid]
+            if tok == q:
+                found[tid] = 1.0
+            elif tok.startswith(q):
+                found[tid] = 0.7
+
+        if len(q) >= 4:
+            counts: dict[int, int] = defaultdict(int)
+            for g in _trigrams(q):
+                for tid in self.trigrams.get(g, []):
+                    counts[tid] += 1
+            need = max(1, len(q) - 2)
+            for tid, shared in counts.items():
+                if tid in found or shared < need:
+                    continue
+                tok = self.tokens[tid]
+                if _within_one_edit(q, tok) or _within_one_edit(q, tok[: len(q)]):
+                    found[tid] = 0.4
+        return list(found.items())
+
+    def search(self, query: str, limit: int | None = None) -> pd.Series:
+        """Ranked matches as a Series of scores indexed by key (best first)."""
+        terms = tokenize(query)
+        if not terms:
+            return pd.Series(dtype="float64")
+
+        rows_acc = None
+        score_acc = None
+        for q in terms:
+            parts = [(self.postings[tid][0], self.postings[tid][1] * match) for tid, match in self._matches(q)]
+            if not parts:
+                return pd.Series(dtype="float64")
+            rows = np.concatenate([r for r, _ in parts])
+            vals = np.concatenate([v for _, v in parts])
+            # best match per row for this term (sparse: only rows that matched)
+            order = np.lexsort((-vals, rows))
+            rows, vals = rows[order], vals[order]
+            first = np.r_[True, rows[1:] != rows[:-1]]
+            rows, vals = rows[first], vals[first]
+
+            if rows_acc is None:
+                rows_acc, score_acc = rows, vals
+            else:
+                common, ia, ib = np.intersect1d(rows_acc, rows, assume_unique=True, return_indices=True)
+                rows_acc, score_acc = common, score_acc[ia] + vals[ib]
+
+        order = np.lexsort((rows_acc, -score_acc))
+        hits, scores = rows_acc[order], score_acc[order]
+        if limit is not None:
+            hits, scores = hits[:limit], scores[:limit]
+        return pd.Series(scores, index=self.keys[hits], name="score")
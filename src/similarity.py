@@ -0,0 +1,194 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.votes import VoteMatrix, VotesStore
+
+
+def _sides(m: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return (m == 1).astype(np.float32), (m == -1).astype(np.float32)
+
+
+def party_majority(vm: VoteMatrix) -> tuple[np.ndarray, np.ndarray]:
+    """(party code per deputy, party x roll call majority: 1 Sim, -1 Não, 0 tie/no votes)."""
+    codes, _ = pd.factorize(vm.deputados["siglaPartido"].astype(str), sort=True)
+    m = np.asarray(vm.votos)
+    sim, nao = _sides(m)
+    onehot = np.zeros((codes.max() + 1 if len(codes) else 0, len(codes)), dtype=np.float32)
+    onehot[codes, np.arange(len(codes))] = 1.0
+    return codes, np.sign(onehot @ sim - onehot @ nao).astype(np.int8)
+
+
+def against_party_mask(vm: VoteMatrix) -> tuple[np.ndarray, np.ndarray]:
+    """(decisive, against): deputy voted Sim/Não where the party had a majority / voted the other way."""
+    codes, majority = party_majority(vm)
+    m = np.asarray(vm.votos)
+    maj = majority[codes]
+    decisive = ((m == 1) | (m == -1)) & (maj != 0)
+    return decisive, decisive & (m != maj)
+
+
+class SimilarityIndex:
+    """
+    Precomputed answers over the vote matrix, so a lookup is an array read:
+
+    - agreement(i, j) = roll calls where both voted the same (Sim/Não) /
+      roll calls where both voted Sim/Não; top-k neighbors per deputy
+    - 2-D embedding: first two principal components of the Sim=+1 / Não=-1
+      matrix
+    - per deputy share of votes against their party majority
+    """
+
+    def __init__(
+        self,
+        deputados: pd.DataFrame,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        overlap: np.ndarray,
+        coords: np.ndarray,
+        against: np.ndarray,
+        decisive: np.ndarray,
+        version: int = -1,
+    ):
+        self.deputados = deputados.reset_index(drop=True)
+        self.neighbors = neighbors
+        self.scores = scores
+        self.overlap = overlap
+        self.coords = coords
+        self.against = against
+        self.decisive = decisive
+        self.version = version
+        self._pos = {int(i): p for p, i in enumerate(self.deputados["id"])}
+
+    @classmethod
+    def build(cls, vm: VoteMatrix, k: int = 20, min_overlap: int = 20, block: int = 512, version: int = -1) -> "SimilarityIndex":
+        m = np.asarray(vm.votos)
+        n = m.shape[0]
+        sim, nao = _sides(m)
+        both = sim + nao
+        k = max(0, min(k, n - 1))
+
+        neighbors = np.zeros((n, k), dtype=np.int32)
+        scores = np.zeros((n, k), dtype=np.float32)
+        overlap = np.zeros((n, k), dtype=np.int32)
+        # Row blocks: memory stays at block x n floats whatever the number of deputies
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            same = sim[start:stop] @ sim.T + nao[start:stop] @ nao.T
+            common = both[start:stop] @ both.T
+            with np.errstate(invalid="ignore", divide="ignore"):
+                agree = np.where(common >= min_overlap, same / common, -1.0)
+            agree[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            if k:
+                top = np.argpartition(-agree, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(agree, top, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind="stable")
+                neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+                scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+                overlap[start:stop] = np.take_along_axis(common, neighbors[start:stop], axis=1)
+
+        x = sim - nao
+        x -= x.mean(axis=0, keepdims=True)
+        if min(x.shape) >= 2:
+            u, s, _ = np.linalg.svd(x, full_matrices=False)
+            coords = (u[:, :2] * s[:2]).astype(np.float32)
+        else:
+            coords = np.zeros((n, 2), dtype=np.float32)
+
+        decisive, against = against_party_mask(vm)
+        return cls(
+            vm.deputados[["id", "nome", "siglaPartido", "siglaUf"]],
+            neighbors,
+            scores,
+            overlap,
+            coords,
+            against.sum(axis=1).astype(np.int32),
+            decisive.sum(axis=1).astype(np.int32),
+            version=version,
+        )
+
+    def __contains__(self, dep_id) -> bool:
+        return dep_id is not None and not pd.isna(dep_id) and int(dep_id) in self._pos
+
+    def similar(self, dep_id: int, k: int = 10) -> pd.DataFrame:
+        """Deputies who vote most like `dep_id`, best first."""
+        p = self._pos[int(dep_id)]
+        valid = self.scores[p] >= 0
+        idx = self.neighbors[p][valid][:k]
+        out = self.deputados.iloc[idx][["nome", "siglaPartido", "siglaUf"]].reset_index(drop=True)
+        out["concordancia_%"] = 100.0 * self.scores[p][valid][:k]
+        out["votacoes_em_comum"] = self.overlap[p][valid][:k]
+        return out
+
+    def against_party(self, dep_id: int) -> tuple[int, int]:
+        """(votes against the party majority, roll calls where the party had one)."""
+        p = self._pos[int(dep_id)]
+        return int(self.against[p]), int(self.decisive[p])
+
+    def rebels(self, min_votes: int = 20) -> pd.DataFrame:
+        """Every deputy with their share of votes against the party majority, highest first."""
+        out = self.deputados.copy()
+        out["votos_contra_partido"] = self.against
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["contra_partido_%"] = np.where(self.decisive >= min_votes, 100.0 * self.against / self.decisive, np.nan)
+        return out.sort_values("contra_partido_%", ascending=False, kind="stable", na_position="last").reset_index(drop=True)
+
+    def embedding(self) -> pd.DataFrame:
+        out = self.deputados.copy()
+        out["x"] = self.coords[:, 0]
+        out["y"] = self.coords[:, 1]
+        return out
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            ids=self.deputados["id"].to_numpy(np.int32),
+            neighbors=self.neighbors,
+            scores=self.scores,
+            overlap=self.overlap,
+            coords=self.coords,
+            against=self.against,
+            decisive=self.decisive,
+            version=np.int64(self.version),
+        )
+        os.replace(tmp, path)
+
+
+def similarity_index(store: VotesStore, k: int = 20) -> SimilarityIndex | None:
+    """Index for the store's current matrix: read from disk, or built and saved once per matrix version."""
+    vm = store.matrix()
+    if vm is None:
+        return None
+    version = store.version()
+    path = store.root / "similaridade.npz"
+    if path.exists():
+        with np.load(path) as z:
+            if int(z["version"]) == version and z["neighbors"].shape[1] >= min(k, len(vm.deputados) - 1):
+                deputados = vm.deputados[["id", "nome", "siglaPartido", "siglaUf"]]
+                if np.array_equal(z["ids"], deputados["id"].to_numpy(np.int32)):
+                    return SimilarityIndex(
+                        deputados, z["neighbors"], z["scores"], z["overlap"], z["coords"], z["against"], z["decisive"], version
+                    )
+    index = SimilarityIndex.build(vm, k=k, version=version)
+    index.save(path)
+    return index
+
+
+def votes_against_party(vm: VoteMatrix, dep_id: int) -> pd.DataFrame:
+    """Roll calls where `dep_id` voted against their party majority, most recent first."""
+    pos = np.flatnonzero(vm.deputados["id"].to_numpy() == int(dep_id))
+    if not len(pos):
+        return pd.DataFrame(columns=["data", "descricao", "voto", "maioria_partido"])
+    codes, majority = party_majority(vm)
+    row = np.asarray(vm.votos[pos[0]])
+    maj = majority[codes[pos[0]]]
+    against = ((row == 1) | (row == -1)) & (maj != 0) & (row != maj)
+    label = {1: "Sim", -1: "Não"}
+    out = vm.votacoes.loc[against, ["data", "descricao"]].copy()
+    out["voto"] = [label[int(v)] for v in row[against]]
+    out["maioria_partido"] = [label[int(v)] for v in maj[against]]
+    return out.iloc[::-1].reset_index(drop=True)
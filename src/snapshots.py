@@ -0,0 +1,77 @@
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DATA_DIR = Path(os.environ.get("DEPUTADOS_DATA_DIR", Path(__file__).resolve().parent.parent / "data"))
+
+# Serve only from local snapshots (no network). Useful offline and for tests.
+OFFLINE = os.environ.get("DEPUTADOS_OFFLINE", "").strip().lower() in {"1", "true", "yes", "on"}
+
+# What a failed disk write raises (disk full, permissions, Parquet encoding); anything else is a bug
+WRITE_ERRORS = (OSError, pa.ArrowException)
+
+
+class SnapshotStore:
+    """
+    Parquet snapshots of a dataset on disk, one file per successful fetch.
+
+    Files are written atomically (tmp + rename) and read memory-mapped, so a
+    cold start only costs a local read instead of an API round trip.
+    """
+
+    def __init__(self, name: str, root: Path | str = DATA_DIR / "snapshots", keep: int = 5):
+        self.name = name
+        self.root = Path(root)
+        self.keep = keep
+        # failed writes since the last successful one (disk full, permissions...)
+        self.write_failures = 0
+        self.last_write_error: str | None = None
+
+    def _paths(self) -> list[Path]:
+        if not self.root.exists():
+            return []
+        return sorted(self.root.glob(f"{self.name}-*.parquet"))
+
+    def write(self, df: pd.DataFrame) -> Path:
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        path = self.root / f"{self.name}-{stamp}.parquet"
+        tmp = path.with_suffix(".parquet.tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+            os.replace(tmp, path)
+        except WRITE_ERRORS as e:
+            self.write_failures += 1
+            self.last_write_error = f"{type(e).__name__}: {e}"
+            if tmp.is_file():
+                tmp.unlink()
+            raise
+        self.write_failures = 0
+        self.last_write_error = None
+
+        for old in self._paths()[: -self.keep]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def latest(self) -> Path | None:
+        paths = self._paths()
+        return paths[-1] if paths else None
+
+    def load_latest(self) -> tuple[pd.DataFrame, float] | None:
+        """Return (df, written_at) for the newest snapshot, or None."""
+        path = self.latest()
+        if path is None:
+            return None
+        table = pq.read_table(path, memory_map=True)
+        return table.to_pandas(), path.stat().st_mtime
+
+    def age_seconds(self) -> float | None:
+        path = self.latest()
+        if path is None:
+            return None
+        return time.time() - path.stat().st_mtime
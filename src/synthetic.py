@@ -0,0 +1,417 @@
+"""
+Synthetic, deputados-shaped data for benchmarks, the local API stand-in and
+load tests. Shapes follow the Dados Abertos API payloads; values are random
+but reproducible (seeded).
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.schema import API_URL, FOTO_URL
+
+REAL_SIZE = 513
+
+PARTIDOS = [
+    ("PL", 37906), ("PT", 36844), ("UNIÃO", 38009), ("PP", 37903), ("PSD", 36834),
+    ("MDB", 36899), ("REPUBLICANOS", 37908), ("PDT", 36786), ("PSB", 36832),
+    ("PSDB", 36835), ("PSOL", 36839), ("PODE", 36896), ("AVANTE", 36898),
+    ("PCdoB", 36779), ("PV", 36851), ("CIDADANIA", 37905), ("NOVO", 37901),
+    ("SOLIDARIEDADE", 37904), ("REDE", 37895), ("PRD", 38010),
+]
+# Seats per UF in the Câmara (sums to 513)
+UFS = {
+    "SP": 70, "MG": 53, "RJ": 46, "BA": 39, "RS": 31, "PR": 30, "PE": 25, "CE": 22,
+    "MA": 18, "GO": 17, "PA": 17, "SC": 16, "PB": 12, "ES": 10, "PI": 10, "AL": 9,
+    "AC": 8, "AM": 8, "AP": 8, "DF": 8, "MS": 8, "MT": 8, "RN": 8, "RO": 8, "RR": 8,
+    "SE": 8, "TO": 8,
+}
+PRIMEIROS = [
+    "João", "José", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas", "Luiz", "Marcos",
+    "Maria", "Ana", "Francisca", "Antônia", "Adriana", "Juliana", "Márcia", "Fernanda", "Patrícia", "Aline",
+    "Sérgio", "Fábio", "Célia", "Lúcia", "Otávio", "Inês", "Caio", "Érika", "Tânia", "Zé",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Ribeiro", "Carvalho", "Araújo", "Conceição", "Magalhães", "Gonçalves", "Guimarães", "D'Ávila", "Simões", "Lúcio",
+]
+ESCOLARIDADE = ["Superior", "Superior Incompleto", "Pós-Graduação", "Mestrado", "Doutorado", "Ensino Médio"]
+CATEGORIAS_DESPESA = [
+    "MANUTENÇÃO DE ESCRITÓRIO DE APOIO À ATIVIDADE PARLAMENTAR",
+    "COMBUSTÍVEIS E LUBRIFICANTES.",
+    "PASSAGEM AÉREA - SIGEPA",
+    "DIVULGAÇÃO DA ATIVIDADE PARLAMENTAR.",
+    "TELEFONIA",
+    "SERVIÇOS POSTAIS",
+    "HOSPEDAGEM ,EXCETO DO PARLAMENTAR NO DISTRITO FEDERAL.",
+    "LOCAÇÃO OU FRETAMENTO DE VEÍCULOS AUTOMOTORES",
+    "CONSULTORIAS, PESQUISAS E TRABALHOS TÉCNICOS.",
+    "FORNECIMENTO DE ALIMENTAÇÃO DO PARLAMENTAR",
+]
+LEGISLATURAS = list(range(50, 58))  # 1995 .. 2027
+
+
+def _uf_pool(rnd: random.Random, n: int) -> list[str]:
+    base = [uf for uf, seats in UFS.items() for _ in range(seats)]
+    return [base[i % len(base)] if i < len(base) else rnd.choice(base) for i in range(n)]
+
+
+def deputado_detail(dep: dict, rnd: random.Random | None = None) -> dict:
+    """Payload of /deputados/{id} for a synthetic list record."""
+    rnd = rnd or random.Random(dep["id"])
+    uf = rnd.choice(list(UFS))
+    nascimento = f"{rnd.randint(1950, 1995)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+    sala = rnd.randint(100, 999)
+    return {
+        "id": dep["id"],
+        "uri": dep["uri"],
+        "nomeCivil": dep["nome"].upper() + " " + rnd.choice(SOBRENOMES).upper(),
+        "cpf": "",
+        "sexo": rnd.choice(["M", "F"]),
+        "urlWebsite": None,
+        "redeSocial": [f"https://x.com/dep{dep['id']}"] if rnd.random() < 0.7 else [],
+        "dataNascimento": nascimento,
+        "dataFalecimento": None,
+        "ufNascimento": uf,
+        "municipioNascimento": rnd.choice(["São Paulo", "Belém", "Maceió", "Goiânia", "Niterói", "Uberlândia"]),
+        "escolaridade": rnd.choice(ESCOLARIDADE),
+        "ultimoStatus": {
+            "id": dep["id"],
+            "nome": dep["nome"],
+            "siglaPartido": dep["siglaPartido"],
+            "siglaUf": dep["siglaUf"],
+            "idLegislatura": dep["idLegislatura"],
+            "urlFoto": dep["urlFoto"],
+            "email": dep.get("email"),
+            "gabinete": {
+                "nome": str(sala),
+                "predio": str(rnd.choice([3, 4])),
+                "sala": str(sala),
+                "andar": str(sala // 100),
+                "telefone": f"3215-{sala:04d}",
+                "email": f"dep.{dep['id']}@camara.leg.br",
+            },
+            "situacao": "Exercício",
+        },
+    }
+
+
+def _nome(dep_id: int) -> str:
+    # fixed per id, so a re-elected deputy keeps the name across legislatures
+    h = (dep_id * 2654435761) & 0xFFFFFFFF
+    nome = f"{PRIMEIROS[h % len(PRIMEIROS)]} {SOBRENOMES[(h >> 8) % len(SOBRENOMES)]}"
+    if (h >> 16) % 10 < 3:
+        nome += f" {SOBRENOMES[(h >> 20) % len(SOBRENOMES)]}"
+    return nome
+
+
+def deputados_records(
+    n: int = REAL_SIZE, seed: int = 0, legislatura: int = 57, id_start: int | None = None
+) -> list[dict]:
+    """
+    List records as returned by /deputados (one page's `dados` items).
+
+    By default ids shift by 200 per legislature, so consecutive legislatures
+    share most of their deputies (re-elected, possibly in another party).
+    """
+    rnd = random.Random(seed * 1000 + legislatura)
+    if id_start is None:
+        id_start = 200_000 - (57 - legislatura) * 200
+    weights = [1 / (i + 1.5) for i in range(len(PARTIDOS))]
+    ufs = _uf_pool(rnd, n)
+    out = []
+    for i in range(n):
+        dep_id = id_start + i
+        sigla, partido_id = rnd.choices(PARTIDOS, weights=weights)[0]
+        nome = _nome(dep_id)
+        out.append(
+            {
+                "id": dep_id,
+                "uri": f"{API_URL}/deputados/{dep_id}",
+                "nome": nome,
+                "siglaPartido": sigla,
+                "uriPartido": f"{API_URL}/partidos/{partido_id}",
+                "siglaUf": ufs[i],
+                "idLegislatura": legislatura,
+                "urlFoto": FOTO_URL.format(id=dep_id),
+                "email": f"dep.{dep_id}@camara.leg.br",
+            }
+        )
+    return out
+
+
+def deputados_frame(scale: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """Canonical deputados frame with `scale` x the real number of rows."""
+    from src.data import build_deputados_df
+
+    return build_deputados_df(deputados_records(max(1, int(REAL_SIZE * scale)), seed=seed))
+
+
+def legislaturas_frame(legislaturas=LEGISLATURAS, per_legislatura: int = 600, seed: int = 0) -> pd.DataFrame:
+    """All legislatures stacked (substitutes make each one larger than 513)."""
+    from src.data import build_deputados_df
+
+    records = []
+    for leg in legislaturas:
+        records.extend(deputados_records(per_legislatura, seed=seed, legislatura=leg))
+    return build_deputados_df(records)
+
+
+def despesas_frame(deputados: pd.DataFrame, anos=(2023,), per_month: int = 30, seed: int = 0) -> pd.DataFrame:
+    """CEAP-shaped expense rows: one row per document."""
+    rng = np.random.default_rng(seed)
+    ids = deputados["id"].to_numpy()
+    frames = []
+    for ano in anos:
+        for mes in range(1, 13):
+            n = len(ids) * per_month
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "idDeputado": np.repeat(ids, per_month),
+                        "ano": np.int16(ano),
+                        "mes": np.int8(mes),
+                        "tipoDespesa": pd.Categorical.from_codes(
+                            rng.integers(0, len(CATEGORIAS_DESPESA), n), CATEGORIAS_DESPESA
+                        ),
+                        "cnpjCpfFornecedor": rng.integers(10**13, 10**14 - 1, n).astype(str),
+                        "nomeFornecedor": pd.Categorical.from_codes(
+                            rng.integers(0, 500, n), [f"FORNECEDOR {i:03d} LTDA" for i in range(500)]
+                        ),
+                        "valorLiquido": np.round(rng.gamma(2.0, 450.0, n), 2),
+                    }
+                )
+            )
+    return pd.concat(frames, ignore_index=True)
+
+
+# ----------------------------
+# Legislaturas, votações, proposições, despesas (API payload shapes)
+# ----------------------------
+def legislaturas_records(legislaturas=LEGISLATURAS) -> list[dict]:
+    out = []
+    for leg in sorted(legislaturas, reverse=True):
+        inicio = 1995 + (leg - 50) * 4
+        out.append(
+            {
+                "id": leg,
+                "uri": f"{API_URL}/legislaturas/{leg}",
+                "dataInicio": f"{inicio}-02-01",
+                "dataFim": f"{inicio + 4}-01-31",
+            }
+        )
+    return out
+
+
+# Parties that follow the government orientation most of the time; the rest
+# lean to the opposition or split
+GOVERNO = {"PT", "PSB", "PDT", "PCdoB", "PV", "PSOL", "REDE", "MDB", "PSD", "AVANTE", "SOLIDARIEDADE"}
+OPOSICAO = {"PL", "NOVO", "REPUBLICANOS", "PP"}
+TIPOS_PROPOSICAO = [("PL", 139, "Projeto de Lei"), ("PEC", 136, "Proposta de Emenda à Constituição"),
+                    ("PLP", 140, "Projeto de Lei Complementar"), ("PDL", 550, "Projeto de Decreto Legislativo"),
+                    ("MPV", 291, "Medida Provisória"), ("REQ", 390, "Requerimento")]
+TEMAS = [
+    "saúde pública", "educação básica", "segurança pública", "meio ambiente", "reforma tributária",
+    "previdência social", "agricultura familiar", "proteção de dados pessoais", "inteligência artificial",
+    "energia elétrica", "mobilidade urbana", "habitação popular", "direitos da criança e do adolescente",
+    "violência contra a mulher", "combustíveis", "saneamento básico", "ciência e tecnologia", "turismo",
+    "defesa do consumidor", "povos indígenas", "mineração", "telecomunicações", "cultura", "esporte",
+]
+ACOES = ["Altera", "Dispõe sobre", "Institui", "Acrescenta dispositivos à", "Revoga dispositivos da", "Regulamenta"]
+OBJETOS = [
+    "a Lei nº 8.069, de 13 de julho de 1990", "a Lei nº 9.394, de 20 de dezembro de 1996",
+    "o Código Penal", "o Código de Defesa do Consumidor", "a Consolidação das Leis do Trabalho",
+    "o Programa Nacional de", "a Política Nacional de", "o Fundo Nacional de",
+]
+
+
+def votacao_id(i: int) -> str:
+    return f"{2_400_000 + i // 7}-{10 + i % 7 * 9}"
+
+
+def votacoes_records(n: int = 400, seed: int = 0, anos=(2023, 2024)) -> list[dict]:
+    """Plenary roll calls (/votacoes items), most recent first."""
+    rnd = random.Random(f"votacoes:{seed}")
+    days = [(ano, mes, dia) for ano in anos for mes in range(2, 13) for dia in (5, 12, 19, 26)]
+    out = []
+    for i in range(n):
+        ano, mes, dia = days[i * len(days) // max(n, 1)]
+        hora = f"{rnd.randint(14, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}"
+        vid = votacao_id(i)
+        tema = rnd.choice(TEMAS)
+        aprovacao = int(rnd.random() < 0.7)
+        out.append(
+            {
+                "id": vid,
+                "uri": f"{API_URL}/votacoes/{vid}",
+                "data": f"{ano}-{mes:02d}-{dia:02d}",
+                "dataHoraRegistro": f"{ano}-{mes:02d}-{dia:02d}T{hora}",
+                "siglaOrgao": "PLEN",
+                "uriOrgao": f"{API_URL}/orgaos/180",
+                "uriEvento": f"{API_URL}/eventos/{70_000 + i}",
+                "proposicaoObjeto": None,
+                "uriProposicaoObjeto": None,
+                "descricao": f"{'Aprovado' if aprovacao else 'Rejeitado'} o texto sobre {tema}.",
+                "aprovacao": aprovacao,
+            }
+        )
+    out.sort(key=lambda v: v["dataHoraRegistro"], reverse=True)
+    return out
+
+
+def votacao_orientacoes(votacao: dict, seed: int = 0) -> list[dict]:
+    """/votacoes/{id}/orientacoes: one orientation per party plus the government's."""
+    rnd = random.Random(f"orientacoes:{seed}:{votacao['id']}")
+    consenso = rnd.random() < 0.25
+    governo = "Sim" if consenso or rnd.random() < 0.65 else "Não"
+    contra = "Não" if governo == "Sim" else "Sim"
+
+    out = [{"orientacaoVoto": governo, "codTipoLideranca": "G", "siglaPartidoBloco": "Governo",
+            "codPartidoBloco": None, "uriPartidoBloco": None}]
+    for sigla, partido_id in PARTIDOS:
+        if consenso:
+            voto = governo
+        elif rnd.random() < 0.05:
+            voto = "Liberado"
+        elif sigla in GOVERNO:
+            voto = governo
+        elif sigla in OPOSICAO:
+            voto = contra
+        else:
+            voto = governo if rnd.random() < 0.55 else contra
+        out.append({"orientacaoVoto": voto, "codTipoLideranca": "P", "siglaPartidoBloco": sigla,
+                    "codPartidoBloco": partido_id, "uriPartidoBloco": f"{API_URL}/partidos/{partido_id}"})
+    return out
+
+
+def votacao_votos(votacao: dict, deputados: list[dict], seed: int = 0, ausencia: float = 0.1) -> list[dict]:
+    """
+    /votacoes/{id}/votos: deputies follow their party orientation most of the
+    time; absent deputies are simply not listed (as in the API).
+    """
+    rnd = random.Random(f"votos:{seed}:{votacao['id']}")
+    orientacao = {o["siglaPartidoBloco"]: o["orientacaoVoto"] for o in votacao_orientacoes(votacao, seed)}
+    registro = votacao["dataHoraRegistro"]
+    out = []
+    for dep in deputados:
+        if rnd.random() < ausencia:
+            continue
+        party_line = orientacao.get(dep["siglaPartido"], "Liberado")
+        if party_line in ("Sim", "Não") and rnd.random() < 0.88:
+            voto = party_line
+        else:
+            voto = rnd.choices(["Sim", "Não", "Abstenção", "Obstrução"], weights=[45, 45, 7, 3])[0]
+        out.append(
+            {
+                "tipoVoto": voto,
+                "dataRegistroVoto": registro,
+                "deputado_": {k: dep.get(k) for k in ("id", "uri", "nome", "siglaPartido", "uriPartido",
+                                                       "siglaUf", "idLegislatura", "urlFoto", "email")},
+            }
+        )
+    return out
+
+
+def _ementa(rnd: random.Random) -> str:
+    tema = rnd.choice(TEMAS)
+    acao, objeto = rnd.choice(ACOES), rnd.choice(OBJETOS)
+    if objeto.endswith(" de"):
+        return f"{acao} {objeto} {tema.title()}."
+    return f"{acao} {objeto}, para dispor sobre {tema} e dá outras providências."
+
+
+def proposicoes_records(n: int = 2000, seed: int = 0, anos=(2023, 2024)) -> list[dict]:
+    """/proposicoes items."""
+    rnd = random.Random(f"proposicoes:{seed}")
+    weights = [60, 4, 6, 10, 3, 17]
+    numero: dict[tuple[str, int], int] = {}
+    out = []
+    for i in range(n):
+        sigla, cod, _ = rnd.choices(TIPOS_PROPOSICAO, weights=weights)[0]
+        ano = anos[i * len(anos) // max(n, 1)]
+        numero[(sigla, ano)] = numero.get((sigla, ano), 0) + rnd.randint(1, 5)
+        prop_id = 2_300_000 + i
+        out.append(
+            {
+                "id": prop_id,
+                "uri": f"{API_URL}/proposicoes/{prop_id}",
+                "siglaTipo": sigla,
+                "codTipo": cod,
+                "numero": numero[(sigla, ano)],
+                "ano": ano,
+                "ementa": _ementa(rnd),
+            }
+        )
+    return out
+
+
+def proposicao_detail(prop: dict, seed: int = 0) -> dict:
+    rnd = random.Random(f"proposicao:{seed}:{prop['id']}")
+    descricao = {sigla: desc for sigla, _, desc in TIPOS_PROPOSICAO}[prop["siglaTipo"]]
+    temas = rnd.sample(TEMAS, 3)
+    data = f"{prop['ano']}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T{rnd.randint(9, 20):02d}:00"
+    return {
+        **prop,
+        "descricaoTipo": descricao,
+        "dataApresentacao": data,
+        "ementaDetalhada": f"Trata de {temas[0]}, com reflexos em {temas[1]} e {temas[2]}.",
+        "keywords": ", ".join(t.title() for t in temas),
+        "uriAutores": f"{prop['uri']}/autores",
+        "urlInteiroTeor": f"https://www.camara.leg.br/proposicoesWeb/prop_mostrarintegra?codteor={prop['id']}",
+        "statusProposicao": {
+            "dataHora": data,
+            "sequencia": rnd.randint(1, 40),
+            "siglaOrgao": rnd.choice(["PLEN", "CCJC", "CFT", "CSAUDE", "CE"]),
+            "regime": rnd.choice(["Ordinário", "Urgência", "Prioridade"]),
+            "descricaoTramitacao": "Recebimento",
+            "descricaoSituacao": rnd.choice(["Aguardando Parecer", "Pronta para Pauta", "Arquivada", "Tramitando em Conjunto"]),
+            "despacho": "",
+            "apreciacao": rnd.choice(["Proposição Sujeita à Apreciação do Plenário", "Proposição Sujeita à Apreciação Conclusiva pelas Comissões"]),
+        },
+    }
+
+
+def proposicao_autores(prop: dict, deputados: list[dict], seed: int = 0) -> list[dict]:
+    rnd = random.Random(f"autores:{seed}:{prop['id']}")
+    if prop["siglaTipo"] == "MPV" or not deputados:
+        return [{"uri": None, "nome": "Poder Executivo", "codTipo": 1, "tipo": "Órgão do Poder Executivo",
+                 "ordemAssinatura": 1, "proponente": 1}]
+    k = min(len(deputados), 1 if rnd.random() < 0.7 else rnd.randint(2, 6))
+    return [
+        {"uri": dep["uri"], "nome": dep["nome"], "codTipo": 10000, "tipo": "Deputado(a)",
+         "ordemAssinatura": i + 1, "proponente": 1}
+        for i, dep in enumerate(rnd.sample(deputados, k))
+    ]
+
+
+def despesas_records(dep_id: int, ano: int, mes: int, per_month: int = 30, seed: int = 0) -> list[dict]:
+    """/deputados/{id}/despesas items for one month."""
+    rnd = random.Random(f"despesas:{seed}:{dep_id}:{ano}:{mes}")
+    out = []
+    for i in range(rnd.randint(per_month // 2, per_month * 3 // 2)):
+        valor = round(rnd.gammavariate(2.0, 450.0), 2)
+        glosa = round(valor * 0.1, 2) if rnd.random() < 0.05 else 0.0
+        fornecedor = rnd.randrange(500)
+        out.append(
+            {
+                "ano": ano,
+                "mes": mes,
+                "tipoDespesa": rnd.choice(CATEGORIAS_DESPESA),
+                "codDocumento": 7_000_000 + (dep_id % 10_000) * 1000 + mes * 60 + i,
+                "tipoDocumento": rnd.choice(["Nota Fiscal", "Nota Fiscal Eletrônica", "Recibos/Outros"]),
+                "codTipoDocumento": rnd.choice([0, 1, 4]),
+                "dataDocumento": f"{ano}-{mes:02d}-{rnd.randint(1, 28):02d}T00:00:00",
+                "numDocumento": str(rnd.randint(1000, 999_999)),
+                "valorDocumento": valor,
+                "urlDocumento": None,
+                "nomeFornecedor": f"FORNECEDOR {fornecedor:03d} LTDA",
+                "cnpjCpfFornecedor": f"{10**13 + fornecedor * 7919:014d}",
+                "valorLiquido": round(valor - glosa, 2),
+                "valorGlosa": glosa,
+                "numRessarcimento": "",
+                "codLote": 1_900_000 + mes,
+                "parcela": 0,
+            }
+        )
+    return out
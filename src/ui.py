@@ -1,6 +1,32 @@
 import streamlit as st
 import pandas as pd
 
+from src.api import get_client
+from src.data import BASE_URL, build_deputados_df
+
+# Streamlit-bound helpers live here, so src/data.py stays importable without Streamlit (tools/)
+
+@st.cache_data(show_spinner=False)
+def fetch_deputados_df(ttl_seconds: int = 3600, force_refresh: bool = False) -> pd.DataFrame:
+    # truque: quando force_refresh muda, o cache invalida
+    _ = force_refresh
+
+    # TTL do cache (Streamlit recomenda ttl p/ chamadas de API)
+    # OBS: o TTL é aplicado pelo decorator via parâmetros de cache do Streamlit,
+    # então usamos st.cache_data e controlamos invalidando com force_refresh.
+    # Se quiser TTL real por tempo, dá pra colocar @st.cache_data(ttl=ttl_seconds),
+    # mas aí ttl_seconds vira parte da assinatura.
+
+    try:
+        records = get_client(BASE_URL).fetch_deputados()
+    except Exception:
+        return pd.DataFrame()
+
+    if not records:
+        return pd.DataFrame()
+
+    return build_deputados_df(records)
+
 def kpi_row(df: pd.DataFrame):
     total = len(df)
     n_partidos = df["siglaPartido"].nunique(dropna=True)
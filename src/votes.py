@@ -0,0 +1,378 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.api import CamaraClient
+from src.history import fetch_legislaturas
+from src.snapshots import DATA_DIR
+
+VOTES_DIR = DATA_DIR / "votes"
+
+# tipoVoto -> int8 code in the matrix; 0 = not listed (absent)
+VOTO_CODES = {"Sim": 1, "Não": -1, "Abstenção": 2, "Obstrução": 3, "Artigo 17": 4}
+AUSENTE = 0
+# orientacaoVoto -> code ("Liberado" and unknown -> 0)
+ORIENTACAO_CODES = {"Sim": 1, "Não": -1, "Obstrução": 3}
+
+# Plenary (PLEN): the roll calls every deputy takes part in
+ID_ORGAO_PLENARIO = 180
+
+VOTACAO_COLUMNS = ["id", "data", "dataHoraRegistro", "descricao", "aprovacao", "nominal"]
+VOTO_COLUMNS = ["idVotacao", "idDeputado", "voto", "nome", "siglaPartido", "siglaUf", "dataRegistroVoto"]
+ORIENTACAO_COLUMNS = ["idVotacao", "sigla", "codTipoLideranca", "orientacao"]
+
+
+def _month_windows(start: date, end: date):
+    # /votacoes only accepts short date ranges: walk month by month
+    y, m = start.year, start.month
+    while (y, m) <= (end.year, end.month):
+        first = date(y, m, 1)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        last = date(y, m, 1) - timedelta(days=1)
+        yield max(first, start), min(last, end)
+
+
+def fetch_votacoes(client: CamaraClient, start: date, end: date) -> list[dict]:
+    out = []
+    for ini, fim in _month_windows(start, end):
+        out.extend(
+            client.get_paginated(
+                "votacoes",
+                {"idOrgao": ID_ORGAO_PLENARIO, "dataInicio": ini.isoformat(), "dataFim": fim.isoformat(), "ordem": "ASC"},
+            )
+        )
+    return out
+
+
+def fetch_votacao(client: CamaraClient, votacao: dict) -> tuple[list[dict], list[dict]]:
+    """(votos, orientacoes) rows of one roll call."""
+    vid = votacao["id"]
+    votos = []
+    for v in client.get_json(f"votacoes/{vid}/votos").get("dados") or []:
+        dep = v.get("deputado_") or {}
+        if dep.get("id") is None:
+            continue
+        votos.append(
+            {
+                "idVotacao": vid,
+                "idDeputado": int(dep["id"]),
+                "voto": VOTO_CODES.get(v.get("tipoVoto"), AUSENTE),
+                "nome": dep.get("nome"),
+                "siglaPartido": dep.get("siglaPartido") or "Sem partido",
+                "siglaUf": dep.get("siglaUf") or "ND",
+                "dataRegistroVoto": v.get("dataRegistroVoto") or votacao.get("dataHoraRegistro"),
+            }
+        )
+    orientacoes = []
+    if votos:
+        for o in client.get_json(f"votacoes/{vid}/orientacoes").get("dados") or []:
+            orientacoes.append(
+                {
+                    "idVotacao": vid,
+                    "sigla": o.get("siglaPartidoBloco"),
+                    "codTipoLideranca": o.get("codTipoLideranca"),
+                    "orientacao": ORIENTACAO_CODES.get(o.get("orientacaoVoto"), 0),
+                }
+            )
+    return votos, orientacoes
+
+
+def _write_parquet(df: pd.DataFrame, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+    os.replace(tmp, path)
+
+
+class VoteMatrix:
+    """
+    Deputies x plenary roll calls as one int8 matrix (see VOTO_CODES; 0 =
+    absent), roll calls in chronological order, plus the government
+    orientation per roll call. Every metric is a handful of vectorized
+    operations over the rows selected by the sidebar filters.
+    """
+
+    def __init__(self, votos: np.ndarray, deputados: pd.DataFrame, votacoes: pd.DataFrame, governo: np.ndarray):
+        self.votos = votos
+        self.deputados = deputados.reset_index(drop=True)
+        self.votacoes = votacoes.reset_index(drop=True)
+        self.governo = governo
+
+    @classmethod
+    def from_long(cls, votos: pd.DataFrame, orientacoes: pd.DataFrame, votacoes: pd.DataFrame) -> "VoteMatrix":
+        votacoes = votacoes[votacoes["id"].isin(votos["idVotacao"].unique())]
+        votacoes = votacoes.sort_values("dataHoraRegistro", kind="stable").reset_index(drop=True)
+        col = pd.Index(votacoes["id"])
+
+        votos = votos.drop_duplicates(["idVotacao", "idDeputado"], keep="last")
+        # Deputy attributes (party, UF) as of their latest vote
+        deputados = (
+            votos.sort_values("dataRegistroVoto", kind="stable")
+            .drop_duplicates("idDeputado", keep="last")[["idDeputado", "nome", "siglaPartido", "siglaUf"]]
+            .rename(columns={"idDeputado": "id"})
+            .sort_values("nome", kind="stable")
+            .reset_index(drop=True)
+        )
+        deputados["id"] = deputados["id"].astype("int32")
+        for c in ("siglaPartido", "siglaUf"):
+            deputados[c] = deputados[c].astype(str).astype("category")
+        row = pd.Index(deputados["id"])
+
+        matrix = np.zeros((len(row), len(col)), dtype=np.int8)
+        # votes of roll calls left out above (orphan batch, not nominal) have no column
+        r, c = row.get_indexer(votos["idDeputado"]), col.get_indexer(votos["idVotacao"])
+        ok = (r >= 0) & (c >= 0)
+        matrix[r[ok], c[ok]] = votos["voto"].to_numpy(np.int8)[ok]
+
+        governo = np.zeros(len(col), dtype=np.int8)
+        gov = orientacoes[(orientacoes["codTipoLideranca"] == "G") | (orientacoes["sigla"] == "Governo")]
+        gov = gov.drop_duplicates("idVotacao", keep="last")
+        pos = col.get_indexer(gov["idVotacao"])
+        governo[pos[pos >= 0]] = gov["orientacao"].to_numpy(np.int8)[pos >= 0]
+        return cls(matrix, deputados, votacoes, governo)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.votos.shape
+
+    def rows(self, partidos_sel=None, ufs_sel=None) -> np.ndarray:
+        mask = np.ones(len(self.deputados), dtype=bool)
+        if partidos_sel:
+            mask &= self.deputados["siglaPartido"].isin(partidos_sel).to_numpy()
+        if ufs_sel:
+            mask &= self.deputados["siglaUf"].isin(ufs_sel).to_numpy()
+        return np.flatnonzero(mask)
+
+    def deputy_metrics(self, rows: np.ndarray | None = None) -> pd.DataFrame:
+        """Per deputy: roll calls present, absenteeism and government alignment."""
+        rows = np.arange(len(self.deputados)) if rows is None else rows
+        out = self.deputados.iloc[rows][["id", "nome", "siglaPartido", "siglaUf"]].reset_index(drop=True)
+        if not len(rows) or not self.votos.shape[1]:
+            return out.assign(**{c: pd.Series(dtype="float64") for c in ("votacoes", "presencas", "ausencia_%", "alinhamento_governo_%")})
+        m = np.asarray(self.votos[rows])
+        present = m != AUSENTE
+        n_present = present.sum(axis=1)
+
+        # Only the roll calls while in office count: first to last vote of each deputy
+        v = m.shape[1]
+        first = present.argmax(axis=1)
+        last = v - 1 - present[:, ::-1].argmax(axis=1)
+        eligible = np.where(n_present > 0, last - first + 1, 0)
+
+        g = self.governo
+        oriented = (g == 1) | (g == -1)
+        decisive = ((m == 1) | (m == -1)) & oriented
+        aligned = decisive & (m == g)
+        n_decisive = decisive.sum(axis=1)
+
+        out["votacoes"] = eligible
+        out["presencas"] = n_present
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["ausencia_%"] = np.where(eligible > 0, 100.0 * (1 - n_present / eligible), np.nan)
+            out["alinhamento_governo_%"] = np.where(n_decisive > 0, 100.0 * aligned.sum(axis=1) / n_decisive, np.nan)
+        return out
+
+    def party_metrics(self, rows: np.ndarray | None = None, dep: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        Per party: Rice index |Sim - Não| / (Sim + Não) averaged over roll calls
+        (one matmul for all parties), government alignment and absenteeism.
+        `dep`: deputy_metrics(rows), when the caller already has it.
+        """
+        rows = np.arange(len(self.deputados)) if rows is None else rows
+        m = np.asarray(self.votos[rows])
+        parties = self.deputados["siglaPartido"].iloc[rows]
+        codes, labels = pd.factorize(parties.astype(str), sort=True)
+        onehot = np.zeros((len(labels), len(rows)), dtype=np.float32)
+        onehot[codes, np.arange(len(rows))] = 1.0
+
+        sim = onehot @ (m == 1).astype(np.float32)
+        nao = onehot @ (m == -1).astype(np.float32)
+        voted = sim + nao
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rice = np.abs(sim - nao) / voted
+        rice_mean = np.nanmean(np.where(voted > 0, rice, np.nan), axis=1) if m.shape[1] else np.full(len(labels), np.nan)
+
+        dep = self.deputy_metrics(rows) if dep is None else dep
+        per = dep.assign(_aligned=dep["alinhamento_governo_%"]).groupby("siglaPartido", observed=True).agg(
+            deputados=("id", "size"),
+            votacoes=("votacoes", "sum"),
+            presencas=("presencas", "sum"),
+            alinhamento_governo_pct=("_aligned", "mean"),
+        )
+        out = pd.DataFrame({"siglaPartido": [str(x) for x in labels], "coesao_rice": rice_mean})
+        out = out.merge(per.reset_index().astype({"siglaPartido": str}), on="siglaPartido", how="left")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["ausencia_%"] = 100.0 * (1 - out["presencas"] / out["votacoes"].where(out["votacoes"] > 0))
+        out = out.rename(columns={"alinhamento_governo_pct": "alinhamento_governo_%"})
+        cols = ["siglaPartido", "deputados", "coesao_rice", "alinhamento_governo_%", "ausencia_%"]
+        return out[cols].sort_values(["deputados", "siglaPartido"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+
+class VotesStore:
+    """
+    Roll calls on disk. Ingestion appends batches (votes/lotes/*.parquet,
+    one checkpoint per batch); compile() folds them into the matrix
+    (matriz.npy, memory-mapped on load) and its row/column tables.
+    """
+
+    def __init__(self, root: Path | str = VOTES_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._matrix: tuple[int, VoteMatrix] | None = None
+
+    @property
+    def votacoes_path(self) -> Path:
+        return self.root / "votacoes.parquet"
+
+    @property
+    def matrix_path(self) -> Path:
+        return self.root / "matriz.npy"
+
+    def version(self) -> int:
+        try:
+            return self.matrix_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return -1
+
+    def votacoes(self) -> pd.DataFrame:
+        if not self.votacoes_path.exists():
+            return pd.DataFrame(columns=VOTACAO_COLUMNS)
+        return pd.read_parquet(self.votacoes_path)
+
+    def append_batch(self, votacoes: list[dict], votos: list[dict], orientacoes: list[dict]):
+        """Checkpoint: votes first, then the roll calls that mark them as done."""
+        stamp = time.strftime("%Y%m%dT%H%M%S") + f"{time.perf_counter_ns() % 1_000_000:06d}"
+        if votos:
+            _write_parquet(pd.DataFrame(votos, columns=VOTO_COLUMNS).astype({"voto": "int8"}), self.root / "lotes" / f"votos-{stamp}.parquet")
+        if orientacoes:
+            _write_parquet(pd.DataFrame(orientacoes, columns=ORIENTACAO_COLUMNS).astype({"orientacao": "int8"}), self.root / "lotes" / f"orientacoes-{stamp}.parquet")
+        new = pd.DataFrame(votacoes, columns=VOTACAO_COLUMNS)
+        with self._lock:
+            old = self.votacoes()
+            merged = pd.concat([old, new], ignore_index=True) if not old.empty else new
+            _write_parquet(merged.drop_duplicates("id", keep="last"), self.votacoes_path)
+
+    def _read_batches(self, kind: str, columns: list[str]) -> pd.DataFrame:
+        paths = sorted((self.root / "lotes").glob(f"{kind}-*.parquet"))
+        if not paths:
+            return pd.DataFrame(columns=columns)
+        return pa.concat_tables([pq.read_table(p) for p in paths]).to_pandas()
+
+    def compile(self) -> VoteMatrix | None:
+        """Fold the batches into the matrix; None (nothing published) without nominal roll calls."""
+        votacoes = self.votacoes()
+        votos = self._read_batches("votos", VOTO_COLUMNS)
+        orientacoes = self._read_batches("orientacoes", ORIENTACAO_COLUMNS)
+        vm = VoteMatrix.from_long(votos, orientacoes, votacoes[votacoes["nominal"].astype(bool)])
+        if not all(vm.shape):
+            return None
+        with self._lock:
+            _write_parquet(vm.deputados, self.root / "matriz_deputados.parquet")
+            _write_parquet(vm.votacoes.assign(governo=vm.governo), self.root / "matriz_votacoes.parquet")
+            tmp = self.root / "matriz.npy.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, vm.votos)
+            os.replace(tmp, self.matrix_path)
+            self._matrix = None
+        return vm
+
+    def matrix(self) -> VoteMatrix | None:
+        version = self.version()
+        if version < 0:
+            return None
+        with self._lock:
+            if self._matrix is not None and self._matrix[0] == version:
+                return self._matrix[1]
+            votacoes = pd.read_parquet(self.root / "matriz_votacoes.parquet")
+            deputados = pd.read_parquet(self.root / "matriz_deputados.parquet")
+            votos = np.load(self.matrix_path, mmap_mode="r")
+            if not all(votos.shape):
+                # published by an older version with no nominal roll calls
+                return None
+            vm = VoteMatrix(votos, deputados, votacoes.drop(columns="governo"), votacoes["governo"].to_numpy(np.int8))
+            self._matrix = (version, vm)
+            return vm
+
+
+class VotesIngestor:
+    """
+    Background job: lists plenary roll calls since the start of the current
+    legislature, fetches votes + orientations of the ones not on disk yet
+    (concurrently, checkpointing every `batch` roll calls), then compiles
+    the matrix.
+    """
+
+    def __init__(self, client: CamaraClient, store: VotesStore | None = None, batch: int = 50):
+        self.client = client
+        self.store = store or VotesStore()
+        self.batch = batch
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.status = {"running": False, "done": 0, "total": 0, "errors": 0, "seconds": None, "last_error": None}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, since: date | None = None) -> bool:
+        with self._lock:
+            if self.running:
+                return False
+            self.status.update(running=True, done=0, total=0, errors=0, seconds=None, last_error=None)
+            self._thread = threading.Thread(target=self._run, args=(since,), daemon=True, name="votes-ingest")
+            self._thread.start()
+            return True
+
+    def _since(self) -> date:
+        legs = fetch_legislaturas(self.client)
+        inicio = str(legs.iloc[-1]["dataInicio"]) if not legs.empty else ""
+        try:
+            return date.fromisoformat(inicio[:10])
+        except ValueError:
+            return date(date.today().year, 1, 1)
+
+    def _run(self, since: date | None):
+        t0 = time.perf_counter()
+        try:
+            start = since or self._since()
+            listed = fetch_votacoes(self.client, start, date.today())
+            known = set(self.store.votacoes()["id"])
+            todo = [v for v in listed if v.get("id") and v["id"] not in known]
+            self.status["total"] = len(todo)
+
+            with ThreadPoolExecutor(max_workers=self.client.max_workers) as pool:
+                for i in range(0, len(todo), self.batch):
+                    chunk = todo[i : i + self.batch]
+                    done, votos, orientacoes = [], [], []
+                    for v, result in zip(chunk, pool.map(self._fetch_one, chunk)):
+                        self.status["done"] += 1
+                        if result is None:
+                            self.status["errors"] += 1
+                            continue
+                        v_votos, v_orient = result
+                        votos.extend(v_votos)
+                        orientacoes.extend(v_orient)
+                        done.append({**{c: v.get(c) for c in VOTACAO_COLUMNS[:-1]}, "nominal": bool(v_votos)})
+                    self.store.append_batch(done, votos, orientacoes)
+            if todo or self.store.version() < 0:
+                self.store.compile()
+        except Exception as e:
+            self.status["last_error"] = str(e)
+        finally:
+            self.status.update(running=False, seconds=time.perf_counter() - t0)
+
+    def _fetch_one(self, votacao: dict):
+        try:
+            return fetch_votacao(self.client, votacao)
+        except Exception as e:
+            # counted in _run, on this thread's None: workers only leave the message
+            self.status["last_error"] = f"{votacao.get('id')}: {e}"
+            return None
@@ -0,0 +1,204 @@
+"""
+Headless benchmarks for the data and render paths, on synthetic data.
+
+    python -m tools.bench                          # 1x, 10x, 100x, 1000x
+    python -m tools.bench --scales 1,10 --cases filter,cube
+    python -m tools.bench --compare data/bench/<older>.json
+
+Results (median/min time and tracemalloc peak per case) are written as JSON
+to data/bench/, named by timestamp and git commit, so runs can be diffed.
+Runs fully offline.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.charts import ChartCache, chart_partidos_bar, figure_bytes, render_chart
+from src.cube import CountCube
+from src.data import apply_filters, build_deputados_df, counts_table
+from src.export import encode
+from src.index import FilterIndex
+from src.search import NameSearchIndex
+from src.snapshots import DATA_DIR
+from src.synthetic import REAL_SIZE, deputados_records, despesas_frame, legislaturas_frame
+
+RESULTS_DIR = DATA_DIR / "bench"
+DEFAULT_SCALES = [1, 10, 100, 1000]
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def measure(fn, repeat: int = 5, min_time: float = 0.2) -> dict:
+    """Median/min wall time over `repeat` runs (more if fast), plus peak traced memory of one run."""
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    t_end = time.perf_counter() + min_time
+    while len(times) < repeat or (time.perf_counter() < t_end and len(times) < 200):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    return {
+        "median_ms": round(statistics.median(times) * 1e3, 4),
+        "min_ms": round(min(times) * 1e3, 4),
+        "runs": len(times),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def _selection(df: pd.DataFrame):
+    parties = df["siglaPartido"].value_counts().index[:3].tolist()
+    ufs = df["siglaUf"].value_counts().index[:5].tolist()
+    return parties, ufs
+
+
+def deputados_cases(df: pd.DataFrame, records: list[dict]) -> dict:
+    parties, ufs = _selection(df)
+    index = FilterIndex(df)
+    cube = CountCube.from_frame(df)
+    search = NameSearchIndex(df)
+    filtered = apply_filters(df, parties, ufs, "nome")
+    chart_cache = ChartCache()
+    render_chart("partidos_bar", cube.by_party(), cache=chart_cache)
+
+    def kpis():
+        c = cube.slice(parties, ufs)
+        return c.total, c.n_partidos, c.n_ufs, c.top(5)
+
+    suite = {
+        "build_df": lambda: build_deputados_df(records),
+        "filter_plain": lambda: apply_filters(df, parties, ufs, "nome"),
+        "filter_index_build": lambda: FilterIndex(df),
+        "filter_index_query": lambda: index.positions(parties, ufs, "nome"),
+        "counts_table": lambda: (counts_table(filtered["siglaPartido"], "siglaPartido"), counts_table(filtered["siglaUf"], "siglaUf")),
+        "cube_build": lambda: CountCube.from_frame(df),
+        "cube_kpis": kpis,
+        "chart_render": lambda: figure_bytes(chart_partidos_bar(cube.by_party())),
+        "chart_cached": lambda: render_chart("partidos_bar", cube.by_party(), cache=chart_cache),
+        "search_build": lambda: NameSearchIndex(df),
+        "search_query": lambda: search.search("joao silv"),
+        "export_csv": lambda: encode(df, "csv"),
+        "export_csv_gz": lambda: encode(df, "csv.gz"),
+        "export_parquet": lambda: encode(df, "parquet"),
+    }
+    if not records:
+        del suite["build_df"]
+    return suite
+
+
+def despesas_cases(desp: pd.DataFrame) -> dict:
+    return {
+        "groupby_deputado_mes_categoria": lambda: desp.groupby(
+            ["idDeputado", "mes", "tipoDespesa"], observed=True
+        )["valorLiquido"].sum(),
+        "export_csv_gz": lambda: encode(desp, "csv.gz"),
+        "export_parquet": lambda: encode(desp, "parquet"),
+    }
+
+
+def _wanted(name: str, cases: list[str] | None) -> bool:
+    return not cases or any(c in name for c in cases)
+
+
+def run(scales: list[float], cases: list[str] | None, repeat: int, extra: bool) -> list[dict]:
+    results = []
+
+    def record(dataset: str, scale, rows: int, suite: dict):
+        for name, fn in suite.items():
+            if not _wanted(name, cases):
+                continue
+            r = measure(fn, repeat=repeat)
+            results.append({"dataset": dataset, "scale": scale, "rows": rows, "case": name, **r})
+            label = f"{scale}x" if isinstance(scale, (int, float)) else str(scale)
+            print(f"{dataset:<14} {label:>6} {rows:>9} {name:<32} {r['median_ms']:>11.3f} ms  {r['peak_mb']:>8.2f} MB")
+
+    for scale in scales:
+        records = deputados_records(max(1, int(REAL_SIZE * scale)))
+        df = build_deputados_df(records)
+        record("deputados", scale, len(df), deputados_cases(df, records))
+
+    if extra:
+        legs = legislaturas_frame()
+        record("legislaturas", "todas", len(legs), deputados_cases(legs, []))
+        desp = despesas_frame(build_deputados_df(deputados_records()), anos=(2023, 2024))
+        record("despesas", "2 anos", len(desp), despesas_cases(desp))
+
+    return results
+
+
+def compare(current: list[dict], previous_path: Path, threshold: float = 1.2):
+    previous = json.loads(previous_path.read_text())["results"]
+    before = {(r["dataset"], str(r["scale"]), r["case"]): r for r in previous}
+    print(f"\nComparação com {previous_path.name} (regressão se > {threshold:.1f}x):")
+    for r in current:
+        old = before.get((r["dataset"], str(r["scale"]), r["case"]))
+        if not old or not old["median_ms"]:
+            continue
+        ratio = r["median_ms"] / old["median_ms"]
+        flag = "  <-- REGRESSÃO" if ratio > threshold else ""
+        print(f"{r['dataset']:<14} {str(r['scale']):>6} {r['case']:<32} {old['median_ms']:>10.3f} -> {r['median_ms']:>10.3f} ms ({ratio:.2f}x){flag}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES), help="multiplicadores do tamanho real (513)")
+    ap.add_argument("--cases", default="", help="filtra casos por substring, separados por vírgula")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-extra", action="store_true", help="pula os conjuntos multi-legislatura e despesas")
+    ap.add_argument("--out", type=Path, default=RESULTS_DIR)
+    ap.add_argument("--compare", type=Path, default=None, help="JSON de uma execução anterior")
+    args = ap.parse_args(argv)
+
+    scales = [float(s) if "." in s else int(s) for s in args.scales.split(",") if s]
+    cases = [c for c in args.cases.split(",") if c] or None
+
+    results = run(scales, cases, args.repeat, extra=not args.no_extra)
+
+    commit = _git_commit()
+    payload = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        "results": results,
+    }
+    args.out.mkdir(parents=True, exist_ok=True)
+    path = args.out / f"bench-{datetime.now():%Y%m%dT%H%M%S}-{commit or 'nogit'}.json"
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False))
+    print(f"\nResultados: {path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
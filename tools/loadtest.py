@@ -0,0 +1,408 @@
+"""
+Concurrent-session load test for the dashboard.
+
+Starts the local mock API (tools/mock_api.py) and a real `streamlit run App.py`
+pointed at it, then drives N headless sessions over the same websocket
+protocol the browser uses. Each session follows a realistic script (filters,
+tab switches, name search, CSV downloads) with think time between steps.
+
+    python -m tools.loadtest --sessions 20
+    python -m tools.loadtest --sessions 10,40 --ttl 5,60 --scope shared,session
+    python -m tools.loadtest --sessions 30 --latency-ms 120 --error-rate 0.02
+
+Reports time-to-first-render, per-interaction latency percentiles, server
+CPU seconds and RSS growth per session, for every configuration in the
+matrix. Results are written as JSON to data/loadtest/.
+
+Interactions are measured as full reruns (widget changes inside fragments
+rerun the whole script here, which is the pessimistic case).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState, WidgetStates
+from websockets.asyncio.client import connect
+
+from src.snapshots import DATA_DIR
+from tools.mock_api import MockConfig, serve
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = DATA_DIR / "loadtest"
+SEARCH_TERMS = ["silva", "joao", "maria", "sant", "oliveira", "ana", "fernanda", "guimaraes"]
+PAGE_SIZE = 4096  # bytes per /proc page (statm)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """`streamlit run App.py` in a subprocess, with CPU/RSS read from /proc."""
+
+    def __init__(self, env: dict, port: int | None = None):
+        self.port = port or _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        cmd = [sys.executable, "-m", "streamlit", "run", str(ROOT / "App.py"),
+               "--server.headless", "true", "--server.port", str(self.port),
+               "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"]
+        self.proc = subprocess.Popen(cmd, cwd=ROOT, env={**os.environ, **env},
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def wait_ready(self, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"streamlit saiu com código {self.proc.returncode}")
+            try:
+                urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=1)
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError("streamlit não respondeu a /_stcore/health")
+
+    def cpu_seconds(self) -> float:
+        fields = Path(f"/proc/{self.proc.pid}/stat").read_text().rsplit(")", 1)[1].split()
+        ticks = os.sysconf("SC_CLK_TCK")
+        return (int(fields[11]) + int(fields[12])) / ticks  # utime + stime
+
+    def rss_bytes(self) -> int:
+        return int(Path(f"/proc/{self.proc.pid}/statm").read_text().split()[1]) * PAGE_SIZE
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+class Session:
+    """One browser-like session: widget state is kept client-side, as the frontend does."""
+
+    def __init__(self, server: AppServer):
+        self.server = server
+        self.ws = None
+        self.session_id = ""
+        self.widgets: dict[str, dict] = {}  # label -> {"id", "type", "proto"}
+        self.tab_id = None
+        self.values: dict[str, WidgetState] = {}  # persistent widget values, by id
+        self.exceptions = 0
+        self._responses: dict[str, ForwardMsg] = {}
+
+    async def open(self):
+        url = self.server.url.replace("http://", "ws://") + "/_stcore/stream"
+        self.ws = await connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=30)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def _recv(self) -> ForwardMsg:
+        msg = ForwardMsg()
+        msg.ParseFromString(await self.ws.recv())
+        return msg
+
+    async def rerun(self, triggers: list[WidgetState] | None = None):
+        """Send the current widget values (+ one-shot triggers) and wait for the run to finish."""
+        states = WidgetStates()
+        states.widgets.extend(list(self.values.values()) + list(triggers or []))
+        back = BackMsg()
+        back.rerun_script.query_string = ""
+        back.rerun_script.widget_states.CopyFrom(states)
+        await self.ws.send(back.SerializeToString())
+
+        widgets = {}
+        while True:
+            msg = await self._recv()
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id or self.session_id
+            elif kind == "delta":
+                self._read_delta(msg.delta, widgets)
+            elif kind == "backend_operation_response":
+                self._responses[msg.backend_operation_response.request_id] = msg
+            elif kind == "script_finished":
+                break
+        self.widgets.update(widgets)
+
+    def _read_delta(self, delta, widgets: dict):
+        if delta.HasField("add_block") and delta.add_block.WhichOneof("type") == "tab_container":
+            if delta.add_block.tab_container.id:
+                self.tab_id = delta.add_block.tab_container.id
+            return
+        if not delta.HasField("new_element"):
+            return
+        kind = delta.new_element.WhichOneof("type")
+        if kind == "exception":
+            self.exceptions += 1
+            return
+        proto = getattr(delta.new_element, kind)
+        if getattr(proto, "id", "") and getattr(proto, "label", ""):
+            widgets[proto.label] = {"id": proto.id, "type": kind, "proto": proto}
+
+    def _widget(self, label: str, prefix: bool = False) -> dict:
+        for name, w in self.widgets.items():
+            if name == label or (prefix and name.startswith(label)):
+                return w
+        raise KeyError(f"widget não encontrado: {label}")
+
+    def options(self, label: str) -> list[str]:
+        return list(self._widget(label)["proto"].options)
+
+    def set_value(self, label: str, value):
+        w = self._widget(label)
+        ws = WidgetState(id=w["id"])
+        if w["type"] == "multiselect":
+            ws.string_array_value.data.extend(value)
+        elif w["type"] == "number_input":
+            ws.double_value = float(value)
+        else:
+            ws.string_value = str(value)
+        self.values[w["id"]] = ws
+
+    async def switch_tab(self, label: str):
+        self.values[self.tab_id] = WidgetState(id=self.tab_id, string_value=label)
+        await self.rerun()
+
+    async def download(self, label_prefix: str) -> int:
+        """Ask the server to run a deferred download and fetch the file; returns its size."""
+        w = self._widget(label_prefix, prefix=True)
+        request_id = uuid.uuid4().hex
+        back = BackMsg()
+        back.backend_operation_request.request_id = request_id
+        back.backend_operation_request.session_id = self.session_id
+        back.backend_operation_request.deferred_file.file_id = w["proto"].deferred_file_id
+        await self.ws.send(back.SerializeToString())
+
+        while request_id not in self._responses:
+            msg = await self._recv()
+            if msg.WhichOneof("type") == "backend_operation_response":
+                self._responses[msg.backend_operation_response.request_id] = msg
+        response = self._responses.pop(request_id).backend_operation_response
+        if response.error_msg:
+            raise RuntimeError(response.error_msg)
+        url = response.deferred_file.url
+        if url.startswith("/"):
+            url = self.server.url + url
+        data = await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=60).read())
+        return len(data)
+
+
+async def browse(session: Session, rnd: random.Random, ttl_minutes: int, iterations: int, think: float, record):
+    """Script of one viewer: filter, look at rankings, search, download."""
+
+    async def step(name: str, action):
+        t0 = time.perf_counter()
+        try:
+            await action()
+            record(name, time.perf_counter() - t0)
+        except Exception as e:
+            record(name, None, error=f"{type(e).__name__}: {e}")
+        if think:
+            await asyncio.sleep(rnd.uniform(0.5, 1.5) * think)
+
+    t0 = time.perf_counter()
+    await session.open()
+    await session.rerun()
+    record("first_render", time.perf_counter() - t0)
+
+    session.set_value("Cache (min)", ttl_minutes)
+    await step("set_ttl", session.rerun)
+
+    for _ in range(iterations):
+        session.set_value("Partidos", rnd.sample(session.options("Partidos"), rnd.randint(1, 3)))
+        await step("filter_partidos", session.rerun)
+        await step("tab_partidos", lambda: session.switch_tab("Partidos"))
+        session.set_value("UFs", rnd.sample(session.options("UFs"), rnd.randint(1, 4)))
+        await step("filter_ufs", session.rerun)
+        await step("tab_estados", lambda: session.switch_tab("Estados"))
+        await step("download_ranking", lambda: session.download("Baixar CSV (ranking UFs)"))
+        await step("tab_deputados", lambda: session.switch_tab("Deputados"))
+        session.set_value("Buscar por nome", rnd.choice(SEARCH_TERMS))
+        await step("search", session.rerun)
+        await step("download_explorados", lambda: session.download("Baixar CSV (resultado atual)"))
+        session.set_value("Buscar por nome", "")
+        session.set_value("Partidos", [])
+        session.set_value("UFs", [])
+        await step("tab_visao_geral", lambda: session.switch_tab("Visão geral"))
+        await step("download_base", lambda: session.download("Baixar CSV (base completa)"))
+
+
+def _percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    arr = np.asarray(values) * 1e3
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"n": len(arr), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1),
+            "max_ms": round(arr.max(), 1)}
+
+
+async def _drive(server: AppServer, sessions: int, ttl: int, iterations: int, think: float, ramp: float, seed: int):
+    timings: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, list[str]] = defaultdict(list)
+    rss_samples = []
+    clients = [Session(server) for _ in range(sessions)]
+
+    def record(name, seconds, error=None):
+        if error:
+            errors[name].append(error)
+        else:
+            timings[name].append(seconds)
+
+    async def sample_rss():
+        while True:
+            rss_samples.append(server.rss_bytes())
+            await asyncio.sleep(0.25)
+
+    async def one(i: int, client: Session):
+        await asyncio.sleep(ramp * i / max(sessions, 1))
+        try:
+            await browse(client, random.Random(seed * 10_000 + i), ttl, iterations, think, record)
+        except Exception as e:
+            record("session", None, error=f"{type(e).__name__}: {e}")
+
+    sampler = asyncio.create_task(sample_rss())
+    await asyncio.gather(*(one(i, c) for i, c in enumerate(clients)))
+    rss_connected = server.rss_bytes()  # all sessions still open
+    sampler.cancel()
+    for c in clients:
+        await c.close()
+    exceptions = sum(c.exceptions for c in clients)
+    return timings, errors, rss_samples, rss_connected, exceptions
+
+
+def run_config(args, sessions: int, ttl: int, scope: str) -> dict:
+    mock_cfg = MockConfig(scale=args.scale, latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+                          error_rate=args.error_rate, rate_limit=args.rate_limit)
+    mock, api_url = serve(mock_cfg)
+    data_dir = tempfile.mkdtemp(prefix="deputados-loadtest-")
+    server = AppServer({"CAMARA_API_URL": api_url, "DEPUTADOS_DATA_DIR": data_dir, "DEPUTADOS_CACHE_SCOPE": scope})
+    try:
+        server.wait_ready()
+        if not args.cold:
+            # one session loads the dataset first, so runs compare steady state
+            asyncio.run(_warmup(server))
+        cpu0, rss0 = server.cpu_seconds(), server.rss_bytes()
+        t0 = time.perf_counter()
+        timings, errors, rss_samples, rss_connected, exceptions = asyncio.run(
+            _drive(server, sessions, ttl, args.iterations, args.think, args.ramp, args.seed)
+        )
+        wall = time.perf_counter() - t0
+        cpu = server.cpu_seconds() - cpu0
+    finally:
+        server.stop()
+        mock.shutdown()
+
+    interactions = [v for name, vals in timings.items() if name != "first_render" for v in vals]
+    return {
+        "config": {"sessions": sessions, "ttl_min": ttl, "scope": scope, "iterations": args.iterations,
+                   "think_s": args.think, "cold": args.cold, "mock": mock_cfg.__dict__},
+        "wall_s": round(wall, 2),
+        "server_cpu_s": round(cpu, 2),
+        "server_cpu_pct": round(100 * cpu / wall, 1) if wall else None,
+        "rss_base_mb": round(rss0 / 2**20, 1),
+        "rss_peak_mb": round(max(rss_samples + [rss_connected]) / 2**20, 1),
+        "rss_per_session_mb": round((rss_connected - rss0) / 2**20 / max(sessions, 1), 2),
+        "ttfr": _percentiles(timings.get("first_render", [])),
+        "interactions": _percentiles(interactions),
+        "steps": {name: _percentiles(vals) for name, vals in sorted(timings.items())},
+        "errors": {name: len(errs) for name, errs in errors.items()},
+        "error_samples": {name: errs[:3] for name, errs in errors.items()},
+        "script_exceptions": exceptions,
+        "api_requests": dict(mock.mock.stats),
+    }
+
+
+async def _warmup(server: AppServer):
+    s = Session(server)
+    await s.open()
+    await s.rerun()
+    await s.close()
+
+
+def print_report(results: list[dict]):
+    for r in results:
+        c = r["config"]
+        print(f"\n== {c['sessions']} sessões · TTL {c['ttl_min']} min · cache {c['scope']} ==")
+        print(f"{'etapa':<22} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+        steps = [("first_render", r["ttfr"])] + [(k, v) for k, v in r["steps"].items() if k != "first_render"]
+        for name, p in steps:
+            if p.get("n"):
+                print(f"{name:<22} {p['n']:>5} {p['p50_ms']:>9.1f} {p['p95_ms']:>9.1f} {p['p99_ms']:>9.1f} {p['max_ms']:>9.1f}")
+        print(f"CPU do servidor: {r['server_cpu_s']} s ({r['server_cpu_pct']}% de {r['wall_s']} s) · "
+              f"RSS {r['rss_base_mb']} -> pico {r['rss_peak_mb']} MB ({r['rss_per_session_mb']} MB/sessão)")
+        if r["errors"] or r["script_exceptions"]:
+            print(f"Erros: {r['errors']} · exceções no script: {r['script_exceptions']}")
+            for name, samples in r["error_samples"].items():
+                print(f"  {name}: {samples[0]}")
+
+    if len(results) > 1:
+        print("\n== Comparação ==")
+        print(f"{'sessões':>7} {'TTL':>4} {'cache':<8} {'TTFR p50':>9} {'TTFR p95':>9} {'int p50':>8} {'int p95':>8} "
+              f"{'int p99':>8} {'CPU s':>7} {'MB/sess':>8} {'erros':>6}")
+        for r in results:
+            c, t, i = r["config"], r["ttfr"], r["interactions"]
+            print(f"{c['sessions']:>7} {c['ttl_min']:>4} {c['scope']:<8} {t.get('p50_ms', 0):>9.1f} {t.get('p95_ms', 0):>9.1f} "
+                  f"{i.get('p50_ms', 0):>8.1f} {i.get('p95_ms', 0):>8.1f} {i.get('p99_ms', 0):>8.1f} "
+                  f"{r['server_cpu_s']:>7.1f} {r['rss_per_session_mb']:>8.2f} {sum(r['errors'].values()):>6}")
+
+
+def _ints(text: str) -> list[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", default="10", help="sessões simultâneas (lista separada por vírgula)")
+    ap.add_argument("--ttl", default="60", help="TTL do cache em minutos (lista)")
+    ap.add_argument("--scope", default="shared", help="escopo do cache: shared, session (lista)")
+    ap.add_argument("--iterations", type=int, default=2, help="repetições do roteiro por sessão")
+    ap.add_argument("--think", type=float, default=0.5, help="pausa média entre interações (s)")
+    ap.add_argument("--ramp", type=float, default=2.0, help="tempo para abrir todas as sessões (s)")
+    ap.add_argument("--cold", action="store_true", help="não aquece o servidor antes de medir")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--scale", type=float, default=1.0, help="(mock) multiplicador do volume de dados")
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="(mock) latência mediana")
+    ap.add_argument("--latency-sigma", type=float, default=0.4, help="(mock) dispersão lognormal")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="(mock) fração de respostas 503")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="(mock) requisições/s antes de 429")
+    ap.add_argument("--out", type=Path, default=RESULTS_DIR)
+    args = ap.parse_args(argv)
+
+    scopes = [s for s in args.scope.split(",") if s]
+    matrix = list(itertools.product(_ints(args.sessions), _ints(args.ttl), scopes))
+    results = []
+    for sessions, ttl, scope in matrix:
+        print(f"-> {sessions} sessões, TTL {ttl} min, cache {scope}...", flush=True)
+        results.append(run_config(args, sessions, ttl, scope))
+
+    print_report(results)
+    args.out.mkdir(parents=True, exist_ok=True)
+    path = args.out / f"loadtest-{datetime.now():%Y%m%dT%H%M%S}.json"
+    path.write_text(json.dumps({"timestamp": datetime.now().isoformat(timespec="seconds"), "results": results},
+                               indent=2, ensure_ascii=False))
+    print(f"\nResultados: {path}")
+
+
+if __name__ == "__main__":
+    main()
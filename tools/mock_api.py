@@ -0,0 +1,455 @@
+"""
+Local stand-in for the Dados Abertos da Câmara API (v2).
+
+    python -m tools.mock_api --port 8765 --scale 10 --latency-ms 80 --error-rate 0.02
+    CAMARA_API_URL=http://127.0.0.1:8765/api/v2 streamlit run App.py
+
+Serves the endpoints the app uses with the API's JSON envelope ({"dados",
+"links"}) and pagination links, from synthetic data (src/synthetic.py) or
+from recorded fixtures:
+
+    python -m tools.mock_api record --out fixtures/ deputados votacoes
+    python -m tools.mock_api --fixtures fixtures/
+
+Knobs: latency (lognormal median/sigma), error rate (503), a global rate
+limit (429 + Retry-After), payload scale and page size limit.
+Control endpoints: GET /_mock/stats, POST /_mock/mutate?n=5 (changes the
+party of n deputies, so the next conditional fetch sees new data).
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from src.search import fold
+from src.synthetic import (
+    LEGISLATURAS,
+    PARTIDOS,
+    REAL_SIZE,
+    deputado_detail,
+    deputados_records,
+    despesas_records,
+    legislaturas_records,
+    proposicao_autores,
+    proposicao_detail,
+    proposicoes_records,
+    votacao_orientacoes,
+    votacao_votos,
+    votacoes_records,
+)
+
+PREFIX = "/api/v2"
+CURRENT_LEGISLATURA = max(LEGISLATURAS)
+
+
+@dataclass
+class MockConfig:
+    scale: float = 1.0
+    seed: int = 0
+    latency_ms: float = 0.0  # median
+    latency_sigma: float = 0.0  # lognormal shape; 0 = fixed latency
+    error_rate: float = 0.0
+    rate_limit: float = 0.0  # requests/s across all clients; 0 = unlimited
+    max_itens: int = 100
+    default_itens: int = 15
+    votacoes: int = 400
+    proposicoes: int = 2000
+    despesas_per_month: int = 30
+    fixtures: str | None = None
+
+
+class MockError(Exception):
+    def __init__(self, status: int, title: str, headers: dict | None = None):
+        super().__init__(title)
+        self.status = status
+        self.title = title
+        self.headers = headers or {}
+
+
+class TokenBucket:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def _ints(values: list[str]) -> list[int]:
+    out = []
+    for v in values:
+        for part in v.split(","):
+            if part.strip():
+                out.append(int(part))
+    return out
+
+
+def _strs(values: list[str]) -> list[str]:
+    return [p.strip() for v in values for p in v.split(",") if p.strip()]
+
+
+class MockCamara:
+    """Request handling, independent of the HTTP server (usable in-process)."""
+
+    def __init__(self, config: MockConfig | None = None):
+        self.config = config or MockConfig()
+        self.stats: Counter = Counter()
+        self.version = 1
+        self._lock = threading.Lock()
+        self._rnd = random.Random(self.config.seed)
+        self._bucket = TokenBucket(self.config.rate_limit) if self.config.rate_limit > 0 else None
+        self._fixtures = Path(self.config.fixtures) if self.config.fixtures else None
+
+        scale = self.config.scale
+        self._deputados: dict[int, list[dict]] = {}
+        self.votacoes = votacoes_records(max(1, int(self.config.votacoes * scale)), seed=self.config.seed)
+        self._votacoes_by_id = {v["id"]: v for v in self.votacoes}
+        self.proposicoes = proposicoes_records(max(1, int(self.config.proposicoes * scale)), seed=self.config.seed)
+        self._proposicoes_by_id = {p["id"]: p for p in self.proposicoes}
+
+    # ---- data ----
+    def deputados(self, legislatura: int = CURRENT_LEGISLATURA) -> list[dict]:
+        with self._lock:
+            records = self._deputados.get(legislatura)
+            if records is None:
+                n = max(1, int(REAL_SIZE * self.config.scale))
+                records = deputados_records(n, seed=self.config.seed, legislatura=legislatura)
+                self._deputados[legislatura] = records
+            return records
+
+    def _deputado(self, dep_id: int) -> dict:
+        for leg in sorted(set(self._deputados) | {CURRENT_LEGISLATURA}, reverse=True):
+            for dep in self.deputados(leg):
+                if dep["id"] == dep_id:
+                    return dep
+        raise MockError(404, f"Deputado {dep_id} não encontrado")
+
+    def mutate(self, n: int = 5) -> int:
+        """Move n random deputies of the current legislature to another party."""
+        records = self.deputados()
+        with self._lock:
+            for dep in self._rnd.sample(records, min(n, len(records))):
+                sigla, partido_id = self._rnd.choice([p for p in PARTIDOS if p[0] != dep["siglaPartido"]])
+                dep["siglaPartido"] = sigla
+                dep["uriPartido"] = dep["uriPartido"].rsplit("/", 1)[0] + f"/{partido_id}"
+            self.version += 1
+            return self.version
+
+    # ---- envelope / pagination ----
+    def _page(self, items: list, query: dict, base: str, path: str) -> tuple[dict, str]:
+        try:
+            itens = int(query.get("itens", [self.config.default_itens])[0])
+            pagina = int(query.get("pagina", [1])[0])
+        except ValueError:
+            raise MockError(400, "Parâmetros 'itens' e 'pagina' devem ser inteiros")
+        if itens < 1 or itens > self.config.max_itens:
+            raise MockError(400, f"O parâmetro 'itens' deve estar entre 1 e {self.config.max_itens}")
+        if pagina < 1:
+            raise MockError(400, "O parâmetro 'pagina' deve ser maior que zero")
+
+        last = max(1, math.ceil(len(items) / itens))
+        dados = items[(pagina - 1) * itens : pagina * itens]
+
+        def href(p: int) -> str:
+            q = {k: v for k, v in query.items() if k != "pagina"}
+            return f"{base}{path}?" + urlencode({**q, "pagina": [str(p)]}, doseq=True)
+
+        links = [{"rel": "self", "href": href(pagina)}, {"rel": "first", "href": href(1)}]
+        if pagina > 1:
+            links.append({"rel": "previous", "href": href(pagina - 1)})
+        if pagina < last:
+            links.append({"rel": "next", "href": href(pagina + 1)})
+        links.append({"rel": "last", "href": href(last)})
+        return {"dados": dados, "links": links}, f'W/"{self.version}-{path}-{itens}-{pagina}"'
+
+    @staticmethod
+    def _single(dados, base: str, path: str) -> dict:
+        return {"dados": dados, "links": [{"rel": "self", "href": f"{base}{path}"}]}
+
+    def _fixture(self, path: str):
+        if self._fixtures is None:
+            return None
+        file = self._fixtures / (path.strip("/") + ".json")
+        if not file.is_file():
+            return None
+        payload = json.loads(file.read_text(encoding="utf-8"))
+        # recorded as {"dados": ...} (see record()) or as the bare payload
+        return payload["dados"] if isinstance(payload, dict) and "dados" in payload else payload
+
+    # ---- endpoints ----
+    def _deputados_list(self, q: dict) -> list[dict]:
+        legs = _ints(q.get("idLegislatura", [])) or [CURRENT_LEGISLATURA]
+        items = [d for leg in legs for d in self.deputados(leg)]
+        if ufs := set(_strs(q.get("siglaUf", []))):
+            items = [d for d in items if d["siglaUf"] in ufs]
+        if partidos := set(_strs(q.get("siglaPartido", []))):
+            items = [d for d in items if d["siglaPartido"] in partidos]
+        if nome := q.get("nome", [""])[0]:
+            needle = fold(nome)
+            items = [d for d in items if needle in fold(d["nome"])]
+        key = q.get("ordenarPor", ["nome"])[0]
+        if key not in ("nome", "id", "siglaUf", "siglaPartido", "idLegislatura"):
+            raise MockError(400, f"Ordenação inválida: {key}")
+        return sorted(items, key=lambda d: d[key], reverse=q.get("ordem", ["ASC"])[0].upper() == "DESC")
+
+    def _despesas(self, dep_id: int, q: dict) -> list[dict]:
+        self._deputado(dep_id)
+        anos = _ints(q.get("ano", [])) or [2024]
+        meses = _ints(q.get("mes", [])) or list(range(1, 13))
+        per_month = self.config.despesas_per_month
+        items = [
+            item
+            for ano in anos
+            for mes in meses
+            for item in despesas_records(dep_id, ano, mes, per_month=per_month, seed=self.config.seed)
+        ]
+        reverse = q.get("ordem", ["ASC"])[0].upper() == "DESC"
+        return sorted(items, key=lambda d: (d["ano"], d["mes"], d["dataDocumento"]), reverse=reverse)
+
+    def _votacoes(self, q: dict) -> list[dict]:
+        items = self.votacoes
+        if inicio := q.get("dataInicio", [""])[0]:
+            items = [v for v in items if v["data"] >= inicio]
+        if fim := q.get("dataFim", [""])[0]:
+            items = [v for v in items if v["data"] <= fim]
+        if q.get("ordem", ["DESC"])[0].upper() == "ASC":
+            items = items[::-1]
+        return items
+
+    def _votacao(self, vid: str) -> dict:
+        v = self._votacoes_by_id.get(vid)
+        if v is None:
+            raise MockError(404, f"Votação {vid} não encontrada")
+        return v
+
+    def _proposicoes(self, q: dict) -> list[dict]:
+        items = self.proposicoes
+        if tipos := set(_strs(q.get("siglaTipo", []))):
+            items = [p for p in items if p["siglaTipo"] in tipos]
+        if anos := set(_ints(q.get("ano", []))):
+            items = [p for p in items if p["ano"] in anos]
+        if kw := q.get("keywords", [""])[0]:
+            words = fold(kw).split()
+            items = [p for p in items if all(w in fold(p["ementa"]) for w in words)]
+        return items
+
+    def _proposicao(self, prop_id: int) -> dict:
+        p = self._proposicoes_by_id.get(prop_id)
+        if p is None:
+            raise MockError(404, f"Proposição {prop_id} não encontrada")
+        return p
+
+    def _route(self, path: str, q: dict, base: str) -> tuple[dict, str | None]:
+        parts = path.strip("/").split("/")
+        seed = self.config.seed
+        fixture = self._fixture(path)
+        if isinstance(fixture, list):
+            return self._page(fixture, q, base, path)
+        if fixture is not None:
+            return self._single(fixture, base, path), None
+
+        try:
+            match parts:
+                case ["deputados"]:
+                    return self._page(self._deputados_list(q), q, base, path)
+                case ["deputados", dep_id]:
+                    return self._single(deputado_detail(self._deputado(int(dep_id))), base, path), None
+                case ["deputados", dep_id, "despesas"]:
+                    return self._page(self._despesas(int(dep_id), q), q, base, path)
+                case ["legislaturas"]:
+                    return self._page(legislaturas_records(), q, base, path)
+                case ["votacoes"]:
+                    return self._page(self._votacoes(q), q, base, path)
+                case ["votacoes", vid]:
+                    return self._single(self._votacao(vid), base, path), None
+                case ["votacoes", vid, "votos"]:
+                    v = self._votacao(vid)
+                    return self._single(votacao_votos(v, self.deputados(), seed=seed), base, path), None
+                case ["votacoes", vid, "orientacoes"]:
+                    return self._single(votacao_orientacoes(self._votacao(vid), seed=seed), base, path), None
+                case ["proposicoes"]:
+                    return self._page(self._proposicoes(q), q, base, path)
+                case ["proposicoes", prop_id]:
+                    return self._single(proposicao_detail(self._proposicao(int(prop_id)), seed=seed), base, path), None
+                case ["proposicoes", prop_id, "autores"]:
+                    p = self._proposicao(int(prop_id))
+                    return self._single(proposicao_autores(p, self.deputados(), seed=seed), base, path), None
+        except ValueError:
+            raise MockError(400, f"Identificador inválido em {path}")
+        raise MockError(404, f"Recurso não encontrado: {path}")
+
+    def handle(self, method: str, target: str, headers: dict, base: str = "") -> tuple[int, dict, bytes]:
+        """(status, headers, body) for one request."""
+        url = urlparse(target)
+        path = url.path[len(PREFIX) :] if url.path.startswith(PREFIX) else url.path
+        q = parse_qs(url.query)
+
+        with self._lock:
+            self.stats["requests"] += 1
+
+        if path.startswith("/_mock/"):
+            return self._control(method, path, q)
+
+        try:
+            if self._bucket is not None and not self._bucket.take():
+                raise MockError(429, "Limite de requisições excedido", {"Retry-After": "1"})
+
+            cfg = self.config
+            with self._lock:
+                factor = self._rnd.lognormvariate(0.0, cfg.latency_sigma) if cfg.latency_sigma > 0 else 1.0
+                fail = self._rnd.random() < cfg.error_rate
+            if cfg.latency_ms > 0:
+                time.sleep(cfg.latency_ms * factor / 1e3)
+            if fail:
+                raise MockError(503, "Serviço temporariamente indisponível")
+            if method != "GET":
+                raise MockError(405, "Método não permitido")
+
+            payload, etag = self._route(path, q, base + PREFIX)
+        except MockError as e:
+            with self._lock:
+                self.stats[f"status_{e.status}"] += 1
+            body = json.dumps({"status": e.status, "title": e.title}, ensure_ascii=False).encode()
+            return e.status, {"Content-Type": "application/json; charset=utf-8", **e.headers}, body
+
+        out_headers = {"Content-Type": "application/json; charset=utf-8"}
+        if etag:
+            out_headers["ETag"] = etag
+            if etag in (headers.get("If-None-Match") or ""):
+                with self._lock:
+                    self.stats["status_304"] += 1
+                return 304, out_headers, b""
+
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        with self._lock:
+            self.stats["status_200"] += 1
+            self.stats["bytes"] += len(body)
+        return 200, out_headers, body
+
+    def _control(self, method: str, path: str, q: dict) -> tuple[int, dict, bytes]:
+        if path == "/_mock/stats":
+            payload = {"version": self.version, "config": asdict(self.config), "stats": dict(self.stats)}
+        elif path == "/_mock/mutate" and method == "POST":
+            payload = {"version": self.mutate(int(q.get("n", ["5"])[0]))}
+        else:
+            return 404, {"Content-Type": "application/json"}, b'{"status": 404}'
+        return 200, {"Content-Type": "application/json"}, json.dumps(payload).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    # headers and body go out in separate writes: without TCP_NODELAY, Nagle +
+    # delayed ACK add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def _respond(self, method: str):
+        host = self.headers.get("Host") or f"{self.server.server_address[0]}:{self.server.server_address[1]}"
+        status, headers, body = self.server.mock.handle(method, self.path, dict(self.headers), base=f"http://{host}")
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(config: MockConfig | None = None, host: str = "127.0.0.1", port: int = 0, verbose: bool = False):
+    """Start the mock on a daemon thread. Returns (server, base_url); server.shutdown() stops it."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.mock = MockCamara(config)
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, name="mock-camara", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{PREFIX}"
+
+
+def record(base_url: str, paths: list[str], out: Path, params: dict | None = None):
+    """Save real API responses as fixtures: list endpoints with every page merged."""
+    from src.api import get_client
+
+    client = get_client(base_url)
+    for path in paths:
+        path = path.strip("/")
+        if path.split("/")[-1].isdigit():
+            payload = client.get_json(path, params)
+        else:
+            payload = {"dados": client.get_paginated(path, params)}
+        file = out / f"{path}.json"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        n = len(payload["dados"]) if isinstance(payload.get("dados"), list) else 1
+        print(f"{path}: {n} registro(s) -> {file}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("command", nargs="?", default="serve", choices=["serve", "record"])
+    ap.add_argument("paths", nargs="*", help="(record) endpoints a gravar, ex.: deputados votacoes")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--scale", type=float, default=1.0, help="multiplicador do volume de dados")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="latência mediana por requisição")
+    ap.add_argument("--latency-sigma", type=float, default=0.0, help="dispersão lognormal (0 = fixa)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 503")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="requisições/s antes de 429 (0 = sem limite)")
+    ap.add_argument("--max-itens", type=int, default=100)
+    ap.add_argument("--fixtures", default=None, help="pasta com respostas gravadas (têm prioridade)")
+    ap.add_argument("--from-url", default="https://dadosabertos.camara.leg.br/api/v2", help="(record) API de origem")
+    ap.add_argument("--out", type=Path, default=Path("fixtures"), help="(record) pasta de saída")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.command == "record":
+        record(args.from_url, args.paths or ["deputados"], args.out)
+        return
+
+    config = MockConfig(
+        scale=args.scale,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        max_itens=args.max_itens,
+        fixtures=args.fixtures,
+    )
+    server, url = serve(config, host=args.host, port=args.port, verbose=args.verbose)
+    print(f"Mock da API da Câmara em {url}")
+    print(f"  CAMARA_API_URL={url} streamlit run App.py")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Report packs per UF and per party, generated headless (no Streamlit).
+
+    python -m tools.reports                         # latest snapshot -> data/reports/
+    python -m tools.reports --source api --workers 8
+    python -m tools.reports --out relatorios/ --force
+
+One folder per combination (todos, uf=SP, partido=PT, ...) with the two
+charts of the "Visão geral" tab (partidos.png, estados.png), the ranking
+tables (ranking_partidos.csv, ranking_ufs.csv) and the filtered deputies
+(deputados.csv). Combinations are rendered in parallel on a process pool.
+
+manifest.json records, per combination, the hash of its input rows and
+the files written. On the next run, combinations whose input hash did not
+change (and whose files are still there) are skipped.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from src.charts import chart_estados_bar, chart_partidos_bar, figure_bytes
+from src.data import BASE_URL, apply_filters, counts_table, fetch_deputados
+from src.export import encode
+from src.schema import with_uris
+from src.snapshots import DATA_DIR, SnapshotStore
+
+REPORTS_DIR = DATA_DIR / "reports"
+# Bump when the report contents change, so every combination is rebuilt once
+# (2: deputados.csv carries uri / uriPartido / urlFoto, like the app's export)
+REPORT_VERSION = 2
+
+
+def combinations(df: pd.DataFrame) -> list[tuple[str, list[str], list[str]]]:
+    """(key, partidos, ufs): the whole dataset, then every UF and every party."""
+    ufs = sorted(df["siglaUf"].dropna().astype(str).unique())
+    partidos = sorted(df["siglaPartido"].dropna().astype(str).unique())
+    return [("todos", [], [])] + [(f"uf={uf}", [], [uf]) for uf in ufs] + [(f"partido={p}", [p], []) for p in partidos]
+
+
+def input_hash(df: pd.DataFrame, dpi: int) -> str:
+    h = hashlib.sha256(f"v{REPORT_VERSION}:dpi={dpi}:{','.join(df.columns)}".encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _write(path: Path, data: bytes) -> dict:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return {"name": path.name, "bytes": len(data)}
+
+
+def render_report(key: str, df: pd.DataFrame, out_dir: str, dpi: int) -> dict:
+    """Write one combination's pack; runs in a worker process."""
+    t0 = time.perf_counter()
+    folder = Path(out_dir) / key
+    folder.mkdir(parents=True, exist_ok=True)
+    files = [
+        _write(folder / "partidos.png", figure_bytes(chart_partidos_bar(df["siglaPartido"].value_counts()), dpi=dpi)),
+        _write(folder / "estados.png", figure_bytes(chart_estados_bar(df["siglaUf"].value_counts()), dpi=dpi)),
+        _write(folder / "ranking_partidos.csv", encode(counts_table(df["siglaPartido"], "siglaPartido"), "csv")),
+        _write(folder / "ranking_ufs.csv", encode(counts_table(df["siglaUf"], "siglaUf"), "csv")),
+        _write(folder / "deputados.csv", encode(with_uris(df), "csv")),
+    ]
+    return {"files": files, "rows": len(df), "seconds": round(time.perf_counter() - t0, 4)}
+
+
+def load_input(source: str) -> tuple[pd.DataFrame, str]:
+    if source == "api":
+        return fetch_deputados(BASE_URL), BASE_URL
+    snap = SnapshotStore("deputados")
+    loaded = snap.load_latest()
+    if loaded is None:
+        raise SystemExit(f"Nenhum snapshot em {snap.root}; rode o app uma vez ou use --source api")
+    return loaded[0], str(snap.latest())
+
+
+def _read_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def run(df: pd.DataFrame, out: Path, workers: int | None = None, dpi: int = 160, force: bool = False, source: str = "") -> dict:
+    t0 = time.perf_counter()
+    out.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / "manifest.json"
+    previous = _read_manifest(manifest_path).get("reports", {})
+
+    reports, todo = {}, []
+    for key, partidos, ufs in combinations(df):
+        sub = apply_filters(df, partidos, ufs, "nome")
+        digest = input_hash(sub, dpi)
+        old = previous.get(key)
+        if not force and old and old.get("hash") == digest and all((out / key / f["name"]).exists() for f in old["files"]):
+            reports[key] = {**old, "skipped": True}
+        else:
+            reports[key] = {"hash": digest, "partidos": partidos, "ufs": ufs}
+            todo.append((key, sub))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render_report, key, sub, str(out), dpi): key for key, sub in todo}
+            for fut in as_completed(futures):
+                key = futures[fut]
+                try:
+                    reports[key].update(fut.result(), skipped=False)
+                except Exception as e:
+                    # no hash: the next run retries this combination
+                    reports[key] = {
+                        "partidos": reports[key]["partidos"],
+                        "ufs": reports[key]["ufs"],
+                        "error": f"{type(e).__name__}: {e}",
+                        "skipped": False,
+                    }
+
+    # combinations that no longer exist (e.g. a party left the dataset)
+    for key in set(previous) - set(reports):
+        shutil.rmtree(out / key, ignore_errors=True)
+
+    seconds = time.perf_counter() - t0
+    failed = sorted(k for k, r in reports.items() if "error" in r)
+    written = [r for r in reports.values() if not r["skipped"] and "error" not in r]
+    stats = {
+        "combinations": len(reports),
+        "rendered": len(written),
+        "skipped": sum(r["skipped"] for r in reports.values()),
+        "failed": failed,
+        "files": sum(len(r["files"]) for r in written),
+        "bytes": sum(f["bytes"] for r in written for f in r["files"]),
+        "seconds": round(seconds, 3),
+        "reports_per_s": round(len(written) / seconds, 2) if seconds else None,
+        "workers": workers or os.cpu_count(),
+    }
+    manifest = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "source": source,
+        "rows": len(df),
+        "report_version": REPORT_VERSION,
+        "run": stats,
+        "reports": dict(sorted(reports.items())),
+    }
+    tmp = manifest_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    os.replace(tmp, manifest_path)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--source", choices=["snapshot", "api"], default="snapshot", help="último snapshot local ou a API")
+    ap.add_argument("--out", type=Path, default=REPORTS_DIR)
+    ap.add_argument("--workers", type=int, default=None, help="processos (padrão: número de CPUs)")
+    ap.add_argument("--dpi", type=int, default=160)
+    ap.add_argument("--force", action="store_true", help="regera tudo, mesmo sem mudanças")
+    args = ap.parse_args(argv)
+
+    df, source = load_input(args.source)
+    if df.empty:
+        raise SystemExit("Base de deputados vazia")
+    stats = run(df, args.out, workers=args.workers, dpi=args.dpi, force=args.force, source=source)
+
+    print(
+        f"{stats['combinations']} combinações: {stats['rendered']} geradas, {stats['skipped']} sem mudanças "
+        f"· {stats['files']} arquivos, {stats['bytes'] / 1e6:.1f} MB em {stats['seconds']:.2f}s "
+        f"({stats['reports_per_s'] or 0:.1f} relatórios/s, {stats['workers']} processos)"
+    )
+    print(f"Manifesto: {args.out / 'manifest.json'}")
+    if stats["failed"]:
+        raise SystemExit(f"{len(stats['failed'])} combinações falharam (detalhes no manifesto): {', '.join(stats['failed'])}")
+
+
+if __name__ == "__main__":
+    main()